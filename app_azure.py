@@ -3,11 +3,15 @@ LDS Teaching Agent - FastAPI Backend
 Azure Table Storage를 사용한 영구 데이터 저장
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
+import asyncio
+import json
 import os
 import sys
 import tempfile
@@ -16,9 +20,50 @@ import tempfile
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from dotenv import load_dotenv
-from openai import AzureOpenAI
-from azure.data.tables import TableServiceClient, TableClient
+from openai import AsyncAzureOpenAI
+from azure.data.tables import TableClient, UpdateMode
 from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure_table_pool import get_table_client as get_pooled_table_client, get_service_client
+from lesson_prefetch import prefetch_year_once
+
+try:
+    from single_flight import SingleFlight, LeaderAbandoned
+    from cache_keys import artifact_row_key, artifact_key_fields, MATERIAL_TEMPLATE, PRESENTATION_TEMPLATE
+    from table_store import AsyncTableStore
+    from llm_service import GenerationService, QueueFullError
+    from llm_metrics import LLMMetrics
+    from pregeneration import PregenerationJob, TABLE_PREGENERATION, WEEKS_AHEAD
+    from presentation_skeleton import render_presentation, SKELETON_VERSION
+    from memory_cache import MemoryCache, DEFAULT_TTLS
+    from shared_cache import SharedCache, TieredCache
+    from week_calendar import WeekCalendar
+    from response_compression import CompressionMiddleware
+    from qa_cache import ChatAnswerCache
+    from prompt_budget import budget_chat_context, estimate_tokens
+    from lesson_store import LessonStore
+    from http_cache import (
+        FastJSONResponse, conditional_json, conditional_body, uncached_json, dumps, body_etag, json_etag, text_etag,
+        CACHE_WEEKS, CACHE_CURRENT_WEEK, CACHE_ARTIFACT, CACHE_REVALIDATE
+    )
+except ImportError:
+    from backend.single_flight import SingleFlight, LeaderAbandoned
+    from backend.cache_keys import artifact_row_key, artifact_key_fields, MATERIAL_TEMPLATE, PRESENTATION_TEMPLATE
+    from backend.table_store import AsyncTableStore
+    from backend.llm_service import GenerationService, QueueFullError
+    from backend.llm_metrics import LLMMetrics
+    from backend.pregeneration import PregenerationJob, TABLE_PREGENERATION, WEEKS_AHEAD
+    from backend.presentation_skeleton import render_presentation, SKELETON_VERSION
+    from backend.memory_cache import MemoryCache, DEFAULT_TTLS
+    from backend.shared_cache import SharedCache, TieredCache
+    from backend.week_calendar import WeekCalendar
+    from backend.response_compression import CompressionMiddleware
+    from backend.qa_cache import ChatAnswerCache
+    from backend.prompt_budget import budget_chat_context, estimate_tokens
+    from backend.lesson_store import LessonStore
+    from backend.http_cache import (
+        FastJSONResponse, conditional_json, conditional_body, uncached_json, dumps, body_etag, json_etag, text_etag,
+        CACHE_WEEKS, CACHE_CURRENT_WEEK, CACHE_ARTIFACT, CACHE_REVALIDATE
+    )
 
 # 환경변수 로드
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
@@ -27,7 +72,8 @@ load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
 app = FastAPI(
     title="LDS Teaching Agent API",
     description="후기성도 예수그리스도 교회 공과 준비 도우미 API (Azure Storage)",
-    version="2.5"
+    version="2.5",
+    default_response_class=FastJSONResponse
 )
 
 # CORS 설정
@@ -39,13 +85,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Azure OpenAI 클라이언트
-client = AzureOpenAI(
+# 응답 압축 (br/gzip, COMPRESSION_MIN_BYTES 이상인 JSON/HTML 본문)
+app.add_middleware(CompressionMiddleware)
+
+# Azure OpenAI 클라이언트 (비동기 - 생성 대기 중에도 이벤트 루프/스레드풀을 막지 않음)
+client = AsyncAzureOpenAI(
     azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
     api_key=os.getenv("AZURE_OPENAI_API_KEY"),
     api_version="2024-02-15-preview"
 )
 
+# LLM 호출별 토큰 사용량/지연 시간 계측 (/api/metrics)
+llm_metrics = LLMMetrics()
+
+# 배포별 동시 실행 한도 + 제한된 대기열 (초과 시 429/503 + Retry-After)
+generation_service = GenerationService(
+    client, default_deployment=os.getenv("AZURE_OPENAI_DEPLOY_CURRICULUM"), metrics=llm_metrics
+)
+
 # Azure Table Storage 설정
 AZURE_STORAGE_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
 TABLE_MATERIALS = "CurriculumMaterials"
@@ -54,11 +111,57 @@ TABLE_CONFIG = "SystemConfig"
 TABLE_BOARD = "CommunityBoard"
 TABLE_PRESENTATION = "CurriculumPresentation"
 
+# 대상 그룹 (/api/target-audiences 및 미리 생성 대상)
+TARGET_AUDIENCES = ["성인", "초등회"]
+
+# 동일 자료 동시 생성 합치기 (워커 내부 + 같은 호스트의 gunicorn 워커 간 잠금 파일)
+generation_flight = SingleFlight(lock_dir=os.getenv("GENERATION_LOCK_DIR"))
+
 def get_table_client(table_name: str) -> TableClient:
-    """테이블 클라이언트 반환"""
+    """테이블 클라이언트 반환 (프로세스 공용 풀에서 재사용)"""
+    if not AZURE_STORAGE_CONNECTION_STRING:
+        raise HTTPException(status_code=500, detail="Azure Storage 연결 문자열이 설정되지 않았습니다.")
+    return get_pooled_table_client(table_name, AZURE_STORAGE_CONNECTION_STRING)
+
+# async 엔드포인트용 비동기 데이터 접근 계층 (이벤트 루프를 막지 않음)
+table_store = AsyncTableStore(AZURE_STORAGE_CONNECTION_STRING)
+
+# 자주 읽고 거의 바뀌지 않는 조회용 캐시
+# L1: 프로세스 내 LRU + 종류별 TTL, L2: 같은 호스트 워커들이 공유하는 SQLite(WAL) 파일
+memory_cache = MemoryCache()
+shared_cache = SharedCache(ttls=DEFAULT_TTLS)
+# 공과 본문(lesson)은 내용 해시가 키라 바뀌지 않으므로 L1에 오래 둠
+cache = TieredCache(
+    memory_cache, shared_cache,
+    shared_namespaces={"material", "presentation", "lesson"}, immutable_namespaces={"lesson"}
+)
+
+# 주차 데이터 (연도별로 한 번 읽어 날짜 인덱스로 조회, 백그라운드 갱신)
+# 읽은 목록은 L2에 올려 같은 호스트의 워커들이 저장소 조회를 나눠 씀
+week_calendar = WeekCalendar(shared=shared_cache)
+
+# 공과 본문 내용 주소 저장소 (클라이언트는 본문 대신 lesson_id를 보냄)
+lesson_store = LessonStore(cache, week_calendar)
+
+# 시작 시 비어 있는 공과 본문을 한 해치 미리 가져옴 (LESSON_PREFETCH_ON_STARTUP=0이면 사용 안 함)
+LESSON_PREFETCH_ON_STARTUP = os.getenv("LESSON_PREFETCH_ON_STARTUP", "1") != "0"
+lesson_prefetch_task = None
+
+
+async def prefetch_lessons(year: int):
+    """공과 본문 일괄 미리 가져오기 후 주차 달력을 다시 읽음"""
+    try:
+        summary = await prefetch_year_once(year, await week_calendar.ensure_scraper())
+        if summary and summary["persisted"]:
+            await asyncio.to_thread(week_calendar.load, year, True)
+    except Exception as e:
+        print(f"⚠️ 공과 본문 미리 가져오기 실패: {e}")
+
+def get_table_store() -> AsyncTableStore:
+    """비동기 테이블 저장소 반환"""
     if not AZURE_STORAGE_CONNECTION_STRING:
         raise HTTPException(status_code=500, detail="Azure Storage 연결 문자열이 설정되지 않았습니다.")
-    return TableClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING, table_name)
+    return table_store
 
 def init_azure_tables():
     """앱 시작 시 필요한 테이블들을 초기화합니다."""
@@ -67,8 +170,8 @@ def init_azure_tables():
         return
     
     try:
-        service_client = TableServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
-        for table_name in [TABLE_MATERIALS, TABLE_QA, "WeeklyCurriculum", "CurriculumStatus", TABLE_CONFIG, TABLE_BOARD, TABLE_PRESENTATION]:
+        service_client = get_service_client(AZURE_STORAGE_CONNECTION_STRING)
+        for table_name in [TABLE_MATERIALS, TABLE_QA, "WeeklyCurriculum", "CurriculumStatus", TABLE_CONFIG, TABLE_BOARD, TABLE_PRESENTATION, TABLE_PREGENERATION]:
             try:
                 service_client.create_table(table_name)
                 print(f"✅ Azure 테이블 확인됨: {table_name}")
@@ -113,17 +216,20 @@ class LessonData(BaseModel):
     content: str
     url: str
     week_info: Optional[dict] = None
+    lesson_id: Optional[str] = None
 
 class GenerateMaterialRequest(BaseModel):
     lesson_title: str
-    lesson_content: str
+    lesson_content: Optional[str] = None  # lesson_id를 보내면 생략
+    lesson_id: Optional[str] = None
     target_audience: str
     week_range: str
 
 class ChatRequest(BaseModel):
     lesson_title: str
-    lesson_content: str
-    reference_material: str
+    lesson_content: Optional[str] = None  # lesson_id를 보내면 생략
+    lesson_id: Optional[str] = None
+    reference_material: Optional[str] = None  # 생략 - 서버가 캐시된 교재를 직접 조회
     user_question: str
     week_range: str
     target_audience: str
@@ -171,10 +277,16 @@ class VerifyPostPasswordRequest(BaseModel):
 
 class GeneratePresentationRequest(BaseModel):
     lesson_title: str
-    lesson_content: str
+    lesson_content: Optional[str] = None  # lesson_id를 보내면 생략
+    lesson_id: Optional[str] = None
     target_audience: str
     week_range: str
 
+class PregenerateRequest(BaseModel):
+    password: str
+    weeks_ahead: Optional[int] = None
+    resume: bool = True
+
 
 # === 유틸리티 함수들 ===
 def load_prompt_template(filename):
@@ -191,20 +303,18 @@ async def startup_event():
     print("🚀 LDS Teaching Agent API 시작 중 (Azure Mode)")
     init_azure_tables()
     
-    def background_init():
-        try:
-            from weekly_curriculum_manager import WeeklyCurriculumManager
-            current_year = datetime.now().year
-            manager = WeeklyCurriculumManager()
-            if not manager.check_year_data_exists(current_year):
-                print(f"🔄 {current_year}년 커리큘럼 데이터 보충 중 (백그라운드)...")
-                manager.ensure_year_data(current_year)
-        except Exception as e:
-            print(f"❌ 초기 데이터 로딩 실패: {e}")
-            
-    import threading
-    t = threading.Thread(target=background_init, daemon=True)
-    t.start()
+    # 올해 주차 데이터 확인/보충과 달력 로드는 백그라운드에서 (이후 주기적으로 갱신)
+    week_calendar.start_refresh()
+    # 웹사이트 주차 목록 증분 동기화 (새 주차가 생기면 본문도 미리 가져옴)
+    week_calendar.start_sync(on_change=prefetch_lessons)
+
+    global lesson_prefetch_task
+    if LESSON_PREFETCH_ON_STARTUP:
+        lesson_prefetch_task = asyncio.create_task(prefetch_lessons(datetime.now().year))
+
+    # 다가오는 주차 미리 생성 예약 (PREGENERATE_SCHEDULE_HOURS=0이면 사용 안 함)
+    if AZURE_STORAGE_CONNECTION_STRING and pregeneration_job.schedule():
+        print("🗓️ 다가오는 주차 미리 생성 예약됨")
 
 
 
@@ -217,39 +327,60 @@ async def health_check():
         "status": "healthy", 
         "message": "LDS Teaching Agent API v2.5",
         "storage": "azure_table_storage",
-        "azure_configured": bool(AZURE_STORAGE_CONNECTION_STRING)
+        "azure_configured": bool(AZURE_STORAGE_CONNECTION_STRING),
+        "llm": generation_service.stats(),
+        "cache": cache.stats(),
+        "chat_cache": chat_cache.stats()
     }
 
 
+@app.get("/api/metrics")
+async def metrics():
+    """LLM 토큰 사용량, 지연 시간 히스토그램, 캐시 적중 (Prometheus 텍스트 형식, 워커별 pid 라벨)"""
+    return PlainTextResponse(
+        llm_metrics.render(generation_service.stats()),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """앱 종료 시 비동기 저장소 연결 정리"""
+    await pregeneration_job.stop()
+    await week_calendar.stop()
+    if lesson_prefetch_task is not None:
+        lesson_prefetch_task.cancel()
+    await table_store.close()
+    await client.close()
+
+
 @app.get("/api/weeks", response_model=List[WeekInfo])
-async def get_available_weeks():
-    """사용 가능한 주차 목록 반환"""
+async def get_available_weeks(request: Request):
+    """사용 가능한 주차 목록 반환 (ETag - 바뀌지 않았으면 304)"""
     try:
-        from curriculum_scraper import CurriculumScraper
-        scraper = CurriculumScraper()
-        return scraper.get_available_weeks()
+        year = datetime.now().year
+        await week_calendar.ensure(year)
+        # 스냅샷당 한 번 직렬화한 바이트를 그대로 전송 (검증/인코딩 생략)
+        body, etag = week_calendar.available_weeks_body(year)
+        return conditional_body(request, body, etag, CACHE_WEEKS)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/weeks/current")
-async def get_current_week():
+async def get_current_week(request: Request):
     """현재 주차 정보 반환"""
     try:
-        from curriculum_scraper import CurriculumScraper
-        scraper = CurriculumScraper()
-        weeks = scraper.get_available_weeks()
-        
-        current_date = datetime.now()
-        current_date_only = current_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        for i, week in enumerate(weeks):
-            start_date = datetime.strptime(week['start_date'], '%Y-%m-%d')
-            end_date = datetime.strptime(week['end_date'], '%Y-%m-%d')
-            if start_date <= current_date_only <= end_date:
-                return {"index": i, "week": week}
-        
-        return {"index": 0, "week": weeks[0] if weeks else None}
+        today = datetime.now().date()
+        await week_calendar.ensure(today.year)
+        weeks = week_calendar.available_weeks(today.year)
+
+        found = week_calendar.find(today)
+        if found is not None:
+            result = {"index": found[0], "week": weeks[found[0]]}
+        else:
+            result = {"index": 0, "week": weeks[0] if weeks else None}
+        return conditional_json(request, result, json_etag(result), CACHE_CURRENT_WEEK)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -258,108 +389,336 @@ async def get_current_week():
 async def get_curriculum_by_week(week_data: dict):
     """특정 주차의 공과 정보 반환"""
     try:
-        from curriculum_scraper import CurriculumScraper
-        scraper = CurriculumScraper()
-        start_date = datetime.strptime(week_data['start_date'], '%Y-%m-%d')
-        return scraper.get_curriculum_by_date(start_date)
+        start_date = datetime.strptime(week_data['start_date'], '%Y-%m-%d').date()
+        await week_calendar.ensure(start_date.year)
+        result = await run_in_threadpool(week_calendar.get_curriculum, start_date)
+        if result.get("week_info") is not None:
+            # 본문은 content 한 번만 보내고, 이후 요청은 lesson_id로 참조
+            result = dict(result, lesson_id=await run_in_threadpool(lesson_store.put, result["content"]))
+            result["week_info"] = {k: v for k, v in result["week_info"].items() if k != "lesson_content"}
+        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def resolve_lesson_content(request) -> str:
+    """요청의 공과 본문 - 본문을 보냈으면 그대로, lesson_id면 서버 저장소에서 찾음
+
+    찾은 본문은 request.lesson_content에 채워 둡니다.
+    (저장소 조회는 L2 SQLite와 본문 해시 계산이 있어 스레드풀에서 실행)
+    """
+    if request.lesson_content:
+        return request.lesson_content
+    if request.lesson_id:
+        content = await run_in_threadpool(lesson_store.get, request.lesson_id)
+        if content is None:
+            raise HTTPException(status_code=404, detail="공과 내용을 찾을 수 없습니다. 공과를 다시 불러와 주세요.")
+        request.lesson_content = content
+        return content
+    raise HTTPException(status_code=422, detail="lesson_id 또는 lesson_content가 필요합니다.")
+
+
+async def find_cached_material(partition_key: str, lesson_title: str) -> Optional[str]:
+    """캐시된 교재 조회 (메모리 캐시 → Azure RowKey 단건 조회)"""
+    row_key = artifact_row_key(lesson_title, MATERIAL_TEMPLATE)
+    content = await cache.aget("material", (partition_key, row_key))
+    if content is not None:
+        return content
+    try:
+        entity = await get_table_store().get_entity(TABLE_MATERIALS, partition_key, row_key)
+        if entity is not None:
+            await cache.aset("material", (partition_key, row_key), entity['Content'])
+            return entity['Content']
+    except Exception as e:
+        print(f"⚠️ Azure 캐시 조회 실패: {e}")
+    return None
+
+
+def build_material_messages(request: GenerateMaterialRequest) -> list:
+    """공과 자료 생성용 프롬프트 메시지 구성"""
+    template = load_prompt_template('curriculum_template.txt')
+    prompt = template.format(
+        target_audience=request.target_audience,
+        lesson_title=request.lesson_title,
+        lesson_content=request.lesson_content
+    )
+    return [
+        {"role": "system", "content": "당신은 후기성도 예수그리스도 교회의 공과 준비 전문가입니다. 상세하고 깊이 있는 공과 자료를 작성해주세요."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+async def save_material(request: GenerateMaterialRequest, partition_key: str, generated_material: str):
+    """생성된 교재를 Azure Table Storage에 저장"""
+    try:
+        entity = {
+            "PartitionKey": partition_key,
+            "RowKey": artifact_row_key(request.lesson_title, MATERIAL_TEMPLATE),
+            "WeekRange": request.week_range,
+            "TargetAudience": request.target_audience,
+            "LessonTitle": request.lesson_title,
+            "Content": generated_material,
+            "CreatedAt": datetime.utcnow().isoformat(),
+            **artifact_key_fields(MATERIAL_TEMPLATE)
+        }
+        await get_table_store().upsert_entity(TABLE_MATERIALS, entity)
+        await cache.aset("material", (partition_key, entity["RowKey"]), generated_material)
+        print(f"✅ Azure 교재 저장 완료: {request.lesson_title}")
+    except Exception as e:
+        print(f"❌ Azure 저장 실패: {e}")
+
+
+def material_flight_key(partition_key: str, lesson_title: str) -> str:
+    """동시 생성 합치기용 키"""
+    return f"material|{partition_key}|{lesson_title}"
+
+
+def queue_full_exception(e: QueueFullError) -> HTTPException:
+    """생성 대기열 초과를 429/503 + Retry-After 응답으로 변환"""
+    return HTTPException(
+        status_code=e.status_code,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
 @app.post("/api/generate-material")
-def generate_curriculum_material(request: GenerateMaterialRequest):
-    """공과 자료 생성 (Azure 캐시 지원)"""
+async def generate_curriculum_material(request: GenerateMaterialRequest):
+    """공과 자료 생성 (Azure 캐시 지원, 동시 요청 합치기)"""
+    return await generate_material(request, endpoint="generate-material")
+
+
+async def generate_material(request: GenerateMaterialRequest, endpoint: str) -> dict:
+    """공과 자료 생성 - endpoint는 LLM 지표 라벨 (사용자 요청과 미리 생성을 구분)"""
     try:
         partition_key = create_partition_key(request.week_range, request.target_audience)
-        
+
         # 1. Azure Table Storage에서 캐시 확인
-        try:
-            table_client = get_table_client(TABLE_MATERIALS)
-            filter_query = f"PartitionKey eq '{partition_key}' and LessonTitle eq '{request.lesson_title}'"
-            entities = list(table_client.query_entities(filter_query))
-            if entities:
-                print(f"📦 Azure 캐시된 교재 사용: {request.lesson_title}")
-                return {"material": entities[0]['Content'], "is_cached": True}
-        except Exception as e:
-            print(f"⚠️ Azure 캐시 조회 실패: {e}")
-        
-        # 2. 새로운 자료 생성
-        template = load_prompt_template('curriculum_template.txt')
-        prompt = template.format(
-            target_audience=request.target_audience,
-            lesson_title=request.lesson_title,
-            lesson_content=request.lesson_content
-        )
-        
-        response = client.chat.completions.create(
-            model=os.getenv("AZURE_OPENAI_DEPLOY_CURRICULUM"),
-            messages=[
-                {"role": "system", "content": "당신은 후기성도 예수그리스도 교회의 공과 준비 전문가입니다. 상세하고 깊이 있는 공과 자료를 작성해주세요."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=8000
+        cached = await find_cached_material(partition_key, request.lesson_title)
+        llm_metrics.record_cache(endpoint, cached is not None)
+        if cached is not None:
+            print(f"📦 Azure 캐시된 교재 사용: {request.lesson_title}")
+            return {"material": cached, "is_cached": True}
+
+        async def produce():
+            # 잠금을 기다리는 동안 다른 워커가 저장했을 수 있으므로 다시 확인
+            cached = await find_cached_material(partition_key, request.lesson_title)
+            if cached is not None:
+                return cached, True
+
+            # 2. 새로운 자료 생성 (배포별 동시 실행 한도 안에서)
+            await resolve_lesson_content(request)
+            response = await generation_service.complete(
+                build_material_messages(request),
+                endpoint=endpoint,
+                temperature=0.7,
+                max_tokens=8000
+            )
+            generated_material = response.choices[0].message.content
+
+            # 3. Azure Table Storage에 저장
+            await save_material(request, partition_key, generated_material)
+            return generated_material, False
+
+        (material, is_cached), shared = await generation_flight.do(
+            material_flight_key(partition_key, request.lesson_title), produce
         )
-        generated_material = response.choices[0].message.content
-        
-        # 3. Azure Table Storage에 저장
-        try:
-            table_client = get_table_client(TABLE_MATERIALS)
-            import uuid
-            entity = {
-                "PartitionKey": partition_key,
-                "RowKey": str(uuid.uuid4()),
-                "WeekRange": request.week_range,
-                "TargetAudience": request.target_audience,
-                "LessonTitle": request.lesson_title,
-                "Content": generated_material,
-                "CreatedAt": datetime.utcnow().isoformat()
-            }
-            table_client.create_entity(entity)
-            print(f"✅ Azure 교재 저장 완료: {request.lesson_title}")
-        except Exception as e:
-            print(f"❌ Azure 저장 실패: {e}")
-        
-        return {"material": generated_material, "is_cached": False}
+        if shared:
+            print(f"🔗 진행 중인 동일 생성 결과 공유: {request.lesson_title}")
+        return {"material": material, "is_cached": is_cached or shared}
+    except QueueFullError as e:
+        raise queue_full_exception(e)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def sse_event(payload: dict) -> str:
+    """Server-Sent Events 한 건을 직렬화"""
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+async def stream_material_from_llm(request: GenerateMaterialRequest):
+    """LLM 스트리밍 응답을 (조각, finish_reason) 쌍으로 yield"""
+    async for chunk in generation_service.stream(
+        build_material_messages(request),
+        endpoint="generate-material-stream",
+        temperature=0.7,
+        max_tokens=8000
+    ):
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        yield (choice.delta.content if choice.delta else None), choice.finish_reason
+
+
+@app.post("/api/generate-material/stream")
+async def generate_curriculum_material_stream(request: GenerateMaterialRequest):
+    """공과 자료 생성 - SSE 스트리밍 버전
+
+    이벤트 형식: {"type": "delta", "content": ...} 를 반복한 뒤
+    {"type": "done", "is_cached": ...} 또는 {"type": "error", "detail": ...} 로 끝납니다.
+    전체 응답을 끝까지 받은 경우에만 Azure에 저장하므로,
+    클라이언트가 중간에 연결을 끊으면 캐시 행이 만들어지지 않습니다.
+    같은 자료가 이미 생성 중이면 그 결과를 기다렸다가 한 번에 보냅니다.
+    생성 대기열이 가득 차 있으면 스트림을 열기 전에 429로 응답합니다.
+    """
+    partition_key = create_partition_key(request.week_range, request.target_audience)
+    flight_key = material_flight_key(partition_key, request.lesson_title)
+
+    cached = await find_cached_material(partition_key, request.lesson_title)
+    llm_metrics.record_cache("generate-material-stream", cached is not None)
+    if cached is None:
+        await resolve_lesson_content(request)  # 본문을 찾지 못하면 스트림을 열기 전에 404
+        try:
+            generation_service.check_capacity()
+        except QueueFullError as e:
+            raise queue_full_exception(e)
+
+    async def event_stream():
+        if cached is not None:
+            print(f"📦 Azure 캐시된 교재 사용 (스트리밍): {request.lesson_title}")
+            yield sse_event({"type": "delta", "content": cached})
+            yield sse_event({"type": "done", "is_cached": True})
+            return
+
+        # 다른 요청이 생성 중이면 결과를 기다림 (리더가 중단되면 재시도)
+        while True:
+            call, is_leader = generation_flight.acquire(flight_key)
+            if is_leader:
+                break
+            try:
+                material, _ = await generation_flight.wait(call)
+            except LeaderAbandoned:
+                continue
+            except Exception as e:
+                yield sse_event({"type": "error", "detail": str(e)})
+                return
+            print(f"🔗 진행 중인 동일 생성 결과 공유 (스트리밍): {request.lesson_title}")
+            yield sse_event({"type": "delta", "content": material})
+            yield sse_event({"type": "done", "is_cached": True})
+            return
+
+        result = None
+        try:
+            async with generation_flight.process_lock(flight_key):
+                cached_now = await find_cached_material(partition_key, request.lesson_title)
+                if cached_now is not None:
+                    result = (cached_now, True)
+                    yield sse_event({"type": "delta", "content": cached_now})
+                    yield sse_event({"type": "done", "is_cached": True})
+                    return
+
+                parts = []
+                finished = False
+                try:
+                    async for delta, finish_reason in stream_material_from_llm(request):
+                        if delta:
+                            parts.append(delta)
+                            yield sse_event({"type": "delta", "content": delta})
+                        if finish_reason:
+                            finished = True
+                except (GeneratorExit, asyncio.CancelledError):
+                    # 클라이언트 연결 끊김 - 불완전한 자료는 저장하지 않음
+                    print(f"⚠️ 스트리밍 중 클라이언트 연결 끊김, 저장 생략: {request.lesson_title}")
+                    raise
+                except QueueFullError as e:
+                    yield sse_event({"type": "error", "detail": str(e), "retry_after": e.retry_after})
+                    return
+                except Exception as e:
+                    print(f"❌ 스트리밍 생성 실패: {e}")
+                    yield sse_event({"type": "error", "detail": str(e)})
+                    return
+
+                generated_material = "".join(parts)
+                if finished and generated_material:
+                    await save_material(request, partition_key, generated_material)
+                    result = (generated_material, False)
+                yield sse_event({"type": "done", "is_cached": False})
+        finally:
+            if result is not None:
+                generation_flight.finish(flight_key, call, result)
+            else:
+                generation_flight.fail(flight_key, call, LeaderAbandoned())
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/api/cached-material/{week_range}/{target_audience}/{lesson_title}")
-async def get_cached_material(week_range: str, target_audience: str, lesson_title: str):
-    """캐시된 자료 반환"""
+async def get_cached_material(request: Request, week_range: str, target_audience: str, lesson_title: str):
+    """캐시된 자료 반환 (ETag - 메모리 캐시 적중 시 저장소 조회 없이 304)"""
     try:
         partition_key = create_partition_key(week_range, target_audience)
-        table_client = get_table_client(TABLE_MATERIALS)
-        filter_query = f"PartitionKey eq '{partition_key}' and LessonTitle eq '{lesson_title}'"
-        entities = list(table_client.query_entities(filter_query))
-        
-        if entities:
-            return {"material": entities[0]['Content'], "is_cached": True}
-        return {"material": None, "is_cached": False}
+        material = await find_cached_material(partition_key, lesson_title)
+        if material is not None:
+            return conditional_json(
+                request, {"material": material, "is_cached": True}, text_etag(material), CACHE_ARTIFACT
+            )
+        return uncached_json({"material": None, "is_cached": False})
     except Exception as e:
         print(f"캐시 조회 실패: {e}")
-        return {"material": None, "is_cached": False}
+        return uncached_json({"material": None, "is_cached": False})
+
+
+async def load_qa_partition(partition_key: str) -> list:
+    """파티션의 Q&A 엔티티 전체 (채팅 답변 캐시 색인용)"""
+    return await get_table_store().query_entities(
+        TABLE_QA, "PartitionKey eq @pk", parameters={"pk": partition_key}
+    )
+
+
+# 이전 Q&A에서 같은(또는 거의 같은) 질문의 답을 찾는 캐시
+chat_cache = ChatAnswerCache(load_qa_partition)
 
 
 @app.post("/api/chat")
-def chat_response(request: ChatRequest):
-    """채팅 응답 생성 및 저장"""
+async def chat_response(request: ChatRequest):
+    """채팅 응답 생성 및 저장 (같은 질문의 이전 답변이 있으면 LLM 호출 생략)"""
     try:
+        partition_key = create_partition_key(request.week_range, request.target_audience)
+        cached = await chat_cache.lookup(partition_key, request.user_question)
+        llm_metrics.record_cache("chat", cached is not None)
+        if cached is not None:
+            print(f"📦 Q&A 캐시 히트 (유사도 {cached['similarity']}): {cached['question']}")
+            return {
+                "answer": cached["answer"],
+                "is_cached": True,
+                "matched_question": cached["question"],
+                "similarity": cached["similarity"]
+            }
+
+        await resolve_lesson_content(request)
+
+        # 참고자료는 서버에 저장된 교재를 사용 (아직 저장 전이면 클라이언트가 보낸 값)
+        reference_material = await find_cached_material(partition_key, request.lesson_title)
+        if reference_material is None:
+            reference_material = request.reference_material or ""
+
+        # 질문과 관련 있는 섹션만 토큰 예산 안에서 선택
+        lesson_content, reference_material = budget_chat_context(
+            request.lesson_content, reference_material, request.user_question
+        )
+
         template = load_prompt_template('chat_template.txt')
         prompt = template.format(
             lesson_title=request.lesson_title,
-            lesson_content=request.lesson_content,
-            reference_material=request.reference_material,
+            lesson_content=lesson_content,
+            reference_material=reference_material,
             user_question=request.user_question
         )
+        print(f"💬 채팅 프롬프트 약 {estimate_tokens(prompt)} 토큰")
         
-        response = client.chat.completions.create(
-            model=os.getenv("AZURE_OPENAI_DEPLOY_CURRICULUM"),
-            messages=[
+        response = await generation_service.complete(
+            [
                 {"role": "system", "content": "당신은 후기성도 예수그리스도 교회의 공과 준비 도우미입니다."},
                 {"role": "user", "content": prompt}
             ],
+            endpoint="chat",
             temperature=0.7,
             max_tokens=1000
         )
@@ -368,8 +727,6 @@ def chat_response(request: ChatRequest):
         # Azure에 저장
         try:
             import uuid
-            table_client = get_table_client(TABLE_QA)
-            partition_key = create_partition_key(request.week_range, request.target_audience)
             entity = {
                 "PartitionKey": partition_key,
                 "RowKey": str(uuid.uuid4()),
@@ -379,29 +736,39 @@ def chat_response(request: ChatRequest):
                 "Answer": response_text,
                 "CreatedAt": datetime.utcnow().isoformat()
             }
-            table_client.create_entity(entity)
+            await get_table_store().upsert_entity(TABLE_QA, entity)
+            cache.invalidate("qa", partition_key)
+            chat_cache.add(partition_key, request.user_question, response_text, entity["RowKey"])
             print(f"✅ Q&A 저장 완료")
         except Exception as e:
             print(f"❌ Q&A 저장 실패: {e}")
         
-        return {"answer": response_text}
+        return {"answer": response_text, "is_cached": False}
+    except QueueFullError as e:
+        raise queue_full_exception(e)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/qa/{week_range}/{target_audience}", response_model=List[QAItem])
-async def get_qa_list(week_range: str, target_audience: str):
-    """Q&A 목록 반환 (Azure 전용)"""
+async def get_qa_list(request: Request, week_range: str, target_audience: str):
+    """Q&A 목록 반환 (Azure 전용, ETag - 매번 재검증)"""
     try:
         partition_key = create_partition_key(week_range, target_audience)
-        table_client = get_table_client(TABLE_QA)
-        filter_query = f"PartitionKey eq '{partition_key}'"
-        entities = list(table_client.query_entities(filter_query))
-        
+        cached = cache.get("qa", partition_key)
+        if cached is not None:
+            return conditional_body(request, cached["body"], cached["etag"], CACHE_REVALIDATE)
+
+        entities = await get_table_store().query_entities(
+            TABLE_QA, "PartitionKey eq @pk", parameters={"pk": partition_key}
+        )
+
         # 최신순 정렬
         entities.sort(key=lambda x: x.get('CreatedAt', ''), reverse=True)
         
-        return [
+        qa_list = [
             {
                 "question": e.get('Question', ''),
                 "answer": e.get('Answer', ''),
@@ -410,51 +777,60 @@ async def get_qa_list(week_range: str, target_audience: str):
             }
             for e in entities
         ]
+        body = dumps(qa_list)
+        etag = body_etag(body)
+        cache.set("qa", partition_key, {"body": body, "etag": etag})
+        return conditional_body(request, body, etag, CACHE_REVALIDATE)
     except Exception as e:
         print(f"Q&A 조회 실패: {e}")
-        return []
+        return uncached_json([])
 
 
 @app.get("/api/target-audiences")
 async def get_target_audiences():
     """대상 그룹 목록 반환"""
-    return ["성인", "초등회"]
+    return TARGET_AUDIENCES
 
 
 # === 관리자 기능 API ===
+async def verify_admin_password(password: str):
+    """관리자 비밀번호 확인 - 틀리면 401"""
+    expected = cache.get("config", "admin_password")
+    if expected is None:
+        try:
+            entity = await get_table_store().get_entity(TABLE_CONFIG, "admin", "password")
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+        # 설정이 없는 경우 환경변수 확인
+        expected = entity.get("Value") if entity is not None else os.getenv("ADMIN_PASSWORD", "8838")
+        cache.set("config", "admin_password", expected)
+    if password != expected:
+        raise HTTPException(status_code=401, detail="비밀번호가 올바르지 않습니다.")
+
 @app.post("/api/admin/login")
 async def admin_login(request: AdminLoginRequest):
     """관리자 로그인"""
-    try:
-        config_client = get_table_client(TABLE_CONFIG)
-        entity = config_client.get_entity(partition_key="admin", row_key="password")
-        if entity.get("Value") == request.password:
-            return {"success": True, "message": "로그인 성공"}
-        else:
-            raise HTTPException(status_code=401, detail="비밀번호가 올바르지 않습니다.")
-    except ResourceNotFoundError:
-        # 설정이 없는 경우 환경변수 확인
-        if request.password == os.getenv("ADMIN_PASSWORD", "8838"):
-            return {"success": True, "message": "로그인 성공"}
-        raise HTTPException(status_code=401, detail="비밀번호가 올바르지 않습니다.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    await verify_admin_password(request.password)
+    return {"success": True, "message": "로그인 성공"}
 
 @app.post("/api/admin/delete-material")
 async def delete_material(request: DeleteMaterialRequest):
     """공과 자료 삭제"""
     try:
         partition_key = create_partition_key(request.week_range, request.target_audience)
-        table_client = get_table_client(TABLE_MATERIALS)
-        
-        # 해당 제목의 모든 엔티티 찾기
-        filter_query = f"PartitionKey eq '{partition_key}' and LessonTitle eq '{request.lesson_title}'"
-        entities = list(table_client.query_entities(filter_query))
-        
-        for entity in entities:
-            table_client.delete_entity(partition_key=entity['PartitionKey'], row_key=entity['RowKey'])
-            
-        return {"success": True, "message": f"{len(entities)}개의 자료가 삭제되었습니다."}
+        row_key = artifact_row_key(request.lesson_title, MATERIAL_TEMPLATE)
+        store = get_table_store()
+        await cache.ainvalidate("material", (partition_key, row_key))
+
+        deleted = 0
+        if await store.get_entity(TABLE_MATERIALS, partition_key, row_key) is not None:
+            await store.delete_entity(TABLE_MATERIALS, partition_key, row_key)
+            deleted = 1
+
+        return {"success": True, "message": f"{deleted}개의 자료가 삭제되었습니다."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -463,8 +839,9 @@ async def delete_qa(request: DeleteQARequest):
     """Q&A 항목 삭제"""
     try:
         partition_key = create_partition_key(request.week_range, request.target_audience)
-        table_client = get_table_client(TABLE_QA)
-        table_client.delete_entity(partition_key=partition_key, row_key=request.row_key)
+        await get_table_store().delete_entity(TABLE_QA, partition_key, request.row_key)
+        cache.invalidate("qa", partition_key)
+        chat_cache.remove(partition_key, request.row_key)
         return {"success": True, "message": "질문이 삭제되었습니다."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -472,24 +849,102 @@ async def delete_qa(request: DeleteQARequest):
 
 # === 프리젠테이션 API ===
 
+# Azure Table 제한: 바이너리 속성 하나 64KiB, 엔티티 전체 1MiB
+PRESENTATION_CHUNK_BYTES = 64 * 1024
+PRESENTATION_MAX_CHUNKS = 15  # 키/메타데이터 여유를 남긴 960KiB
+
+
+def encode_presentation_properties(text: str, prefix: str = "Slides") -> Optional[dict]:
+    """텍스트를 gzip 원본 바이트로 압축해 64KiB 바이너리 속성 여러 개로 분할
+
+    base64 문자열(약 33% 증가) 대신 Edm.Binary로 저장하므로,
+    한 엔티티(1MiB) 안에 들어가면 단건 조회 한 번으로 복원할 수 있습니다.
+    너무 커서 엔티티 하나에 들어가지 않으면 None.
+    """
+    import gzip
+    compressed = gzip.compress(text.encode('utf-8'))
+    chunks = [
+        compressed[i:i + PRESENTATION_CHUNK_BYTES]
+        for i in range(0, len(compressed), PRESENTATION_CHUNK_BYTES)
+    ]
+    if len(chunks) > PRESENTATION_MAX_CHUNKS:
+        return None
+    properties = {f"{prefix}Gz{i}": chunk for i, chunk in enumerate(chunks)}
+    properties[f"{prefix}Chunks"] = len(chunks)
+    properties[f"{prefix}Bytes"] = len(compressed)
+    return properties
+
+
+def decode_chunked_property(entity, prefix: str) -> str:
+    """encode_presentation_properties로 나눈 조각을 합쳐 텍스트 복원"""
+    import gzip
+    compressed = b"".join(bytes(entity[f"{prefix}Gz{i}"]) for i in range(entity[f"{prefix}Chunks"]))
+    return gzip.decompress(compressed).decode('utf-8')
+
+
+def decode_presentation_entity(entity) -> Optional[str]:
+    """저장된 프리젠테이션 엔티티에서 HTML 복원
+
+    현재 포맷은 LLM 슬라이드 출력만 저장하고, 응답할 때 최신 뼈대로 렌더링합니다.
+    뼈대 호환 버전이 다르면 None을 돌려 재생성되게 합니다.
+    """
+    if 'SlidesChunks' in entity:
+        if entity.get('SkeletonVersion') != SKELETON_VERSION:
+            return None
+        return render_presentation(entity.get('LessonTitle', ''), decode_chunked_property(entity, "Slides"))
+    if 'HtmlChunks' in entity:
+        # 뼈대 포함 전체 HTML 포맷 폴백
+        return decode_chunked_property(entity, "Html")
+    if 'HtmlCompressed' in entity:
+        # gzip+base64 단일 속성 포맷 폴백
+        import gzip, base64
+        return gzip.decompress(base64.b64decode(entity['HtmlCompressed'])).decode('utf-8')
+    if 'HtmlContent' in entity:
+        # 구 포맷 폴백
+        return entity['HtmlContent']
+    return None
+
+
+async def find_cached_presentation(partition_key: str, lesson_title: str) -> Optional[str]:
+    """캐시된 프리젠테이션 HTML 조회 (메모리 캐시 → Azure RowKey 단건 조회)
+
+    메모리 캐시에는 렌더링이 끝난 HTML을 두므로 적중 시 gzip 해제를 하지 않습니다.
+    """
+    row_key = artifact_row_key(lesson_title, PRESENTATION_TEMPLATE)
+    html = await cache.aget("presentation", (partition_key, row_key))
+    if html is not None:
+        return html
+    try:
+        entity = await get_table_store().get_entity(TABLE_PRESENTATION, partition_key, row_key)
+        html = decode_presentation_entity(entity) if entity is not None else None
+        if html is not None:
+            await cache.aset("presentation", (partition_key, row_key), html)
+        return html
+    except Exception as e:
+        print(f"⚠️ 프리젠테이션 캐시 조회 실패: {e}")
+    return None
+
+
 @app.post("/api/generate-presentation")
-def generate_presentation(request: GeneratePresentationRequest):
+async def generate_presentation(request: GeneratePresentationRequest):
     """공과 프리젠테이션 HTML 생성 (캐시 우선)"""
+    return await generate_presentation_html(request, endpoint="generate-presentation")
+
+
+async def generate_presentation_html(request: GeneratePresentationRequest, endpoint: str) -> dict:
+    """프리젠테이션 생성 - endpoint는 LLM 지표 라벨 (사용자 요청과 미리 생성을 구분)"""
     try:
         partition_key = create_partition_key(request.week_range, request.target_audience)
 
         # 1. 캐시 확인
-        try:
-            table_client = get_table_client(TABLE_PRESENTATION)
-            filter_query = f"PartitionKey eq '{partition_key}' and LessonTitle eq '{request.lesson_title}'"
-            entities = list(table_client.query_entities(filter_query))
-            if entities:
-                print(f"📦 프리젠테이션 캐시 히트: {request.lesson_title}")
-                return {"html": entities[0]['HtmlContent'], "is_cached": True}
-        except Exception as e:
-            print(f"⚠️ 프리젠테이션 캐시 조회 실패: {e}")
+        cached = await find_cached_presentation(partition_key, request.lesson_title)
+        llm_metrics.record_cache(endpoint, cached is not None)
+        if cached is not None:
+            print(f"📦 프리젠테이션 캐시 히트: {request.lesson_title}")
+            return {"html": cached, "is_cached": True}
 
         # 2. LLM으로 생성
+        await resolve_lesson_content(request)
         template = load_prompt_template('presentation_template.txt')
         prompt = (
             template.replace("{target_audience}", request.target_audience)
@@ -497,76 +952,131 @@ def generate_presentation(request: GeneratePresentationRequest):
             .replace("{lesson_content}", request.lesson_content)
         )
 
-        response = client.chat.completions.create(
-            model=os.getenv("AZURE_OPENAI_DEPLOY_CURRICULUM"),
-            messages=[
+        response = await generation_service.complete(
+            [
                 {"role": "system", "content": "당신은 아름다운 HTML 프리젠테이션 슬라이드를 만드는 전문가입니다. 요청된 내용을 바탕으로 완전하고 독립적인 HTML 파일을 생성해주세요. HTML 코드만 출력하고 마크다운 코드블록은 사용하지 마세요."},
                 {"role": "user", "content": prompt}
             ],
+            endpoint=endpoint,
             temperature=0.7,
             max_tokens=4000
         )
         html_content = response.choices[0].message.content.strip()
 
-        try:
-            from presentation_skeleton import HTML_SKELETON
-        except ImportError:
-            from backend.presentation_skeleton import HTML_SKELETON
+        # 슬라이드 뼈대에 LLM 출력과 제목을 삽입
+        final_html = render_presentation(request.lesson_title, html_content)
 
-        # 슬라이드 뼈대에 LLM 출력을 삽입하고, 제목 치환
-        final_html = HTML_SKELETON.replace("{llm_slides_output}", html_content)
-        final_html = final_html.replace("{lesson_title}", request.lesson_title)
+        await cache.aset(
+            "presentation",
+            (partition_key, artifact_row_key(request.lesson_title, PRESENTATION_TEMPLATE)),
+            final_html
+        )
 
-        # 3. Azure에 저장 (gzip+base64 압축으로 1MB 제한 우회)
+        # 3. Azure에 저장 - 뼈대는 빼고 LLM 슬라이드 출력만
+        #    (gzip 바이트를 64KiB 바이너리 속성들로 분할, 엔티티 하나에 보관)
         try:
-            import uuid, gzip, base64
-            compressed = base64.b64encode(gzip.compress(final_html.encode('utf-8'))).decode('ascii')
-            print(f"📦 압축률: {len(final_html)} → {len(compressed)} bytes")
-
-            # 압축 후에도 64KB(Azure 단일 속성 최대) 초과 시 저장 건너뜀 - 메모리 캐시만 사용
-            if len(compressed) <= 65536:
-                table_client = get_table_client(TABLE_PRESENTATION)
+            html_properties = encode_presentation_properties(html_content)
+            if html_properties is not None:
+                print(f"📦 압축률: {len(html_content)} → {html_properties['SlidesBytes']} bytes ({html_properties['SlidesChunks']}개 조각)")
                 entity = {
                     "PartitionKey": partition_key,
-                    "RowKey": str(uuid.uuid4()),
+                    "RowKey": artifact_row_key(request.lesson_title, PRESENTATION_TEMPLATE),
                     "WeekRange": request.week_range,
                     "TargetAudience": request.target_audience,
                     "LessonTitle": request.lesson_title,
-                    "HtmlCompressed": compressed,
-                    "CreatedAt": datetime.utcnow().isoformat()
+                    "CreatedAt": datetime.utcnow().isoformat(),
+                    "SkeletonVersion": SKELETON_VERSION,
+                    **html_properties,
+                    **artifact_key_fields(PRESENTATION_TEMPLATE)
                 }
-                table_client.create_entity(entity)
+                # REPLACE - 이전 포맷/조각 수가 다른 행의 속성이 남지 않도록
+                await get_table_store().upsert_entity(TABLE_PRESENTATION, entity, mode=UpdateMode.REPLACE)
                 print(f"✅ 프리젠테이션 저장 완료: {request.lesson_title}")
             else:
-                print(f"⚠️ 압축 후에도 64KB 초과({len(compressed)}bytes), 이 세션에서만 사용")
+                print(f"⚠️ 압축 후에도 엔티티 한도(1MB) 초과, 이 세션에서만 사용")
         except Exception as e:
             print(f"❌ 프리젠테이션 저장 실패: {e}")
 
         return {"html": final_html, "is_cached": False}
+    except QueueFullError as e:
+        raise queue_full_exception(e)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/cached-presentation/{week_range}/{target_audience}/{lesson_title}")
-async def get_cached_presentation(week_range: str, target_audience: str, lesson_title: str):
-    """캐시된 프리젠테이션 반환"""
+async def get_cached_presentation(request: Request, week_range: str, target_audience: str, lesson_title: str):
+    """캐시된 프리젠테이션 반환 (ETag - 메모리 캐시 적중 시 저장소 조회 없이 304)"""
     try:
         partition_key = create_partition_key(week_range, target_audience)
-        table_client = get_table_client(TABLE_PRESENTATION)
-        filter_query = f"PartitionKey eq '{partition_key}' and LessonTitle eq '{lesson_title}'"
-        entities = list(table_client.query_entities(filter_query))
-        if entities:
-            e = entities[0]
-            if 'HtmlCompressed' in e:
-                import gzip, base64
-                html = gzip.decompress(base64.b64decode(e['HtmlCompressed'])).decode('utf-8')
-                return {"html": html, "is_cached": True}
-            elif 'HtmlContent' in e:
-                # 구 포맷 폴백
-                return {"html": e['HtmlContent'], "is_cached": True}
-        return {"html": None, "is_cached": False}
+        html = await find_cached_presentation(partition_key, lesson_title)
+        if html is not None:
+            return conditional_json(request, {"html": html, "is_cached": True}, text_etag(html), CACHE_ARTIFACT)
+        return uncached_json({"html": None, "is_cached": False})
     except Exception as e:
-        return {"html": None, "is_cached": False}
+        return uncached_json({"html": None, "is_cached": False})
+
+
+# === 미리 생성 (다가오는 주차 pre-warm) ===
+
+def load_weeks_for_pregeneration(year: int) -> list:
+    """미리 생성 대상 주차 목록 (주차 달력)"""
+    return week_calendar.weeks_for_year(year)
+
+
+def load_lesson_for_pregeneration(week: dict) -> dict:
+    """/api/curriculum과 같은 경로로 공과 제목/내용 조회 - 캐시 키가 프론트엔드와 일치하도록"""
+    start_date = datetime.strptime(week['start_date'], '%Y-%m-%d').date()
+    return week_calendar.get_curriculum(start_date)
+
+
+async def pregenerate_material(**fields) -> bool:
+    result = await generate_material(GenerateMaterialRequest(**fields), endpoint="pregenerate-material")
+    return result["is_cached"]
+
+
+async def pregenerate_presentation(**fields) -> bool:
+    result = await generate_presentation_html(GeneratePresentationRequest(**fields), endpoint="pregenerate-presentation")
+    return result["is_cached"]
+
+
+pregeneration_job = PregenerationJob(
+    get_store=get_table_store,
+    load_weeks=load_weeks_for_pregeneration,
+    load_lesson=load_lesson_for_pregeneration,
+    tasks={"material": pregenerate_material, "presentation": pregenerate_presentation},
+    audiences=TARGET_AUDIENCES,
+    partition_key=create_partition_key,
+)
+
+
+@app.post("/api/admin/pregenerate")
+async def trigger_pregeneration(request: PregenerateRequest):
+    """다가오는 주차 자료/프리젠테이션 미리 생성 시작 (백그라운드)"""
+    await verify_admin_password(request.password)
+    get_table_store()
+    weeks_ahead = request.weeks_ahead or WEEKS_AHEAD
+    if weeks_ahead < 1 or weeks_ahead > 8:
+        raise HTTPException(status_code=400, detail="weeks_ahead는 1~8 사이여야 합니다.")
+
+    started = pregeneration_job.start(weeks_ahead=weeks_ahead, resume=request.resume)
+    message = f"다음 {weeks_ahead}주 미리 생성을 시작했습니다." if started else "이미 미리 생성이 진행 중입니다."
+    return {"success": True, "started": started, "message": message}
+
+
+@app.get("/api/admin/pregenerate/status")
+async def get_pregeneration_status():
+    """미리 생성 진행 상황"""
+    try:
+        status = await pregeneration_job.get_status()
+        status["running_here"] = pregeneration_job.is_running()
+        return status
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 # === 게시판 API ===
@@ -577,11 +1087,14 @@ def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode('utf-8')).hexdigest()
 
 @app.get("/api/board")
-async def get_board_posts():
-    """게시판 글 목록 조회 (최신순)"""
+async def get_board_posts(request: Request):
+    """게시판 글 목록 조회 (최신순, 직렬화된 바이트 캐시 + ETag)"""
     try:
-        table_client = get_table_client(TABLE_BOARD)
-        entities = list(table_client.query_entities("PartitionKey eq 'post'"))
+        cached = cache.get("board", "posts")
+        if cached is not None:
+            return conditional_body(request, cached["body"], cached["etag"], CACHE_REVALIDATE)
+
+        entities = await get_table_store().query_entities(TABLE_BOARD, "PartitionKey eq 'post'")
         posts = []
         for e in entities:
             posts.append({
@@ -594,7 +1107,10 @@ async def get_board_posts():
                 "updated_at": e.get("UpdatedAt", ""),
             })
         posts.sort(key=lambda x: x["created_at"], reverse=True)
-        return posts
+        body = dumps(posts)
+        etag = body_etag(body)
+        cache.set("board", "posts", {"body": body, "etag": etag})
+        return conditional_body(request, body, etag, CACHE_REVALIDATE)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -602,10 +1118,9 @@ async def get_board_posts():
 async def create_board_post(request: CreatePostRequest):
     """게시판 글 작성"""
     try:
-        table_client = get_table_client(TABLE_BOARD)
         row_key = str(_uuid.uuid4())
         now = datetime.utcnow().isoformat()
-        table_client.upsert_entity({
+        await get_table_store().upsert_entity(TABLE_BOARD, {
             "PartitionKey": "post",
             "RowKey": row_key,
             "Author": request.author,
@@ -616,6 +1131,7 @@ async def create_board_post(request: CreatePostRequest):
             "CreatedAt": now,
             "UpdatedAt": now,
         })
+        cache.invalidate("board")
         return {"success": True, "row_key": row_key}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -624,8 +1140,8 @@ async def create_board_post(request: CreatePostRequest):
 async def verify_post_password(request: VerifyPostPasswordRequest):
     """게시글 비밀번호 확인"""
     try:
-        table_client = get_table_client(TABLE_BOARD)
-        entity = table_client.get_entity(partition_key="post", row_key=request.row_key)
+        table_client = get_table_store().client(TABLE_BOARD)
+        entity = await table_client.get_entity(partition_key="post", row_key=request.row_key)
         if entity.get("PasswordHash") == hash_password(request.password):
             return {"success": True}
         return {"success": False}
@@ -638,15 +1154,16 @@ async def verify_post_password(request: VerifyPostPasswordRequest):
 async def update_board_post(row_key: str, request: UpdatePostRequest):
     """게시판 글 수정"""
     try:
-        table_client = get_table_client(TABLE_BOARD)
-        entity = table_client.get_entity(partition_key="post", row_key=row_key)
+        table_client = get_table_store().client(TABLE_BOARD)
+        entity = await table_client.get_entity(partition_key="post", row_key=row_key)
         if entity.get("PasswordHash") != hash_password(request.password):
             raise HTTPException(status_code=403, detail="비밀번호가 올바르지 않습니다.")
         entity["Title"] = request.title
         entity["Category"] = request.category
         entity["Content"] = request.content
         entity["UpdatedAt"] = datetime.utcnow().isoformat()
-        table_client.upsert_entity(entity)
+        await table_client.upsert_entity(entity)
+        cache.invalidate("board")
         return {"success": True}
     except HTTPException:
         raise
@@ -659,11 +1176,12 @@ async def update_board_post(row_key: str, request: UpdatePostRequest):
 async def delete_board_post(row_key: str, password: str):
     """게시판 글 삭제"""
     try:
-        table_client = get_table_client(TABLE_BOARD)
-        entity = table_client.get_entity(partition_key="post", row_key=row_key)
+        table_client = get_table_store().client(TABLE_BOARD)
+        entity = await table_client.get_entity(partition_key="post", row_key=row_key)
         if entity.get("PasswordHash") != hash_password(password):
             raise HTTPException(status_code=403, detail="비밀번호가 올바르지 않습니다.")
-        table_client.delete_entity(partition_key="post", row_key=row_key)
+        await table_client.delete_entity(partition_key="post", row_key=row_key)
+        cache.invalidate("board")
         return {"success": True}
     except HTTPException:
         raise
@@ -677,24 +1195,30 @@ async def delete_board_post(row_key: str, password: str):
 # Vue.js 정적 파일 서빙 (프로덕션)
 static_dir = os.path.join(os.path.dirname(__file__), 'frontend', 'dist')
 if os.path.exists(static_dir):
-    from fastapi.staticfiles import StaticFiles
-    from fastapi.responses import FileResponse
-    from fastapi import Request
-    
-    app.mount("/assets", StaticFiles(directory=os.path.join(static_dir, "assets")), name="assets")
-    
+    try:
+        from spa_files import SpaFiles
+    except ImportError:
+        from backend.spa_files import SpaFiles
+
+    # 시작 시 한 번 만든 색인으로 조회 (/assets 포함, .br/.gz 형제 파일 우선)
+    spa_files = SpaFiles(static_dir)
+
     @app.get("/{full_path:path}")
     async def serve_spa(request: Request, full_path: str):
         """SPA 라우팅을 위한 catch-all"""
         if full_path.startswith("api/"):
-            from fastapi import HTTPException
             raise HTTPException(status_code=404, detail="API endpoint not found")
-        
-        file_path = os.path.join(static_dir, full_path)
-        if os.path.exists(file_path) and os.path.isfile(file_path):
-            return FileResponse(file_path)
-        
-        return FileResponse(os.path.join(static_dir, "index.html"))
+
+        static_file = spa_files.lookup(full_path)
+        if static_file is None:
+            if full_path.startswith(spa_files.assets_prefix):
+                raise HTTPException(status_code=404, detail="Not found")
+            static_file = spa_files.lookup("index.html")
+        return spa_files.response(
+            static_file,
+            request.headers.get("accept-encoding", ""),
+            request.headers.get("if-none-match", "")
+        )
 
 # 앱 실행
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+"""
+Azure Table Storage 클라이언트 풀
+
+테이블마다 프로세스당 하나의 TableClient를 만들어 재사용합니다.
+모든 클라이언트는 keep-alive가 켜진 requests 연결 풀 하나를 공유하므로
+요청마다 연결 문자열 파싱, HTTP 파이프라인 생성, TLS 핸드셰이크를 반복하지 않습니다.
+
+gunicorn이 워커를 fork하면 자식 프로세스는 부모의 소켓을 물려받지 않도록
+풀을 비우고 처음부터 다시 만듭니다.
+"""
+
+import os
+import socket
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from azure.core.pipeline.transport import RequestsTransport
+from azure.data.tables import TableClient, TableServiceClient
+
+POOL_MAXSIZE = int(os.getenv("AZURE_TABLE_POOL_MAXSIZE", "32"))
+CONNECTION_TIMEOUT = int(os.getenv("AZURE_TABLE_CONNECTION_TIMEOUT", "10"))
+READ_TIMEOUT = int(os.getenv("AZURE_TABLE_READ_TIMEOUT", "30"))
+
+_lock = threading.Lock()
+_pid = None
+_session = None
+_clients = {}
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """유휴 연결이 중간 장비에서 끊기지 않도록 TCP keep-alive를 켠 어댑터"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        options = list(HTTPConnection.default_socket_options)
+        options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60))
+            options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 30))
+        kwargs["socket_options"] = options
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _reset():
+    """풀 초기화 - fork 직후 자식 프로세스에서 호출"""
+    global _pid, _session, _clients
+    _pid = os.getpid()
+    _session = None
+    _clients = {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset)
+
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        session = requests.Session()
+        adapter = KeepAliveAdapter(pool_connections=8, pool_maxsize=POOL_MAXSIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _session = session
+    return _session
+
+
+def _transport() -> RequestsTransport:
+    # 세션은 풀이 소유 - 개별 클라이언트가 닫아도 공유 연결은 유지
+    return RequestsTransport(
+        session=_get_session(),
+        session_owner=False,
+        connection_timeout=CONNECTION_TIMEOUT,
+        read_timeout=READ_TIMEOUT,
+    )
+
+
+def _resolve_connection_string(connection_string=None) -> str:
+    conn = connection_string or os.getenv("AZURE_STORAGE_CONNECTION_STRING")
+    if not conn:
+        raise ValueError("AZURE_STORAGE_CONNECTION_STRING이 설정되지 않았습니다.")
+    return conn
+
+
+def get_table_client(table_name: str, connection_string=None) -> TableClient:
+    """테이블별로 프로세스당 하나의 장수명 TableClient 반환"""
+    conn = _resolve_connection_string(connection_string)
+    key = (conn, table_name)
+    with _lock:
+        if _pid != os.getpid():
+            _reset()
+        client = _clients.get(key)
+        if client is None:
+            client = TableClient.from_connection_string(conn, table_name, transport=_transport())
+            _clients[key] = client
+        return client
+
+
+def get_service_client(connection_string=None) -> TableServiceClient:
+    """풀 연결을 공유하는 TableServiceClient 반환 (테이블 생성 등 관리 작업용)"""
+    conn = _resolve_connection_string(connection_string)
+    key = (conn, None)
+    with _lock:
+        if _pid != os.getpid():
+            _reset()
+        client = _clients.get(key)
+        if client is None:
+            client = TableServiceClient.from_connection_string(conn, transport=_transport())
+            _clients[key] = client
+        return client
@@ -0,0 +1,43 @@
+"""
+캐시 엔티티 키 규칙
+
+생성 자료(CurriculumMaterials, CurriculumPresentation)의 RowKey는
+공과 제목 + 프롬프트 템플릿 버전 + 모델 배포 이름의 안정적인 해시입니다.
+같은 입력이면 항상 같은 RowKey가 나오므로 조회는 get_entity 한 번,
+저장은 upsert 한 번으로 끝나고 중복 행이 생기지 않습니다.
+템플릿이나 배포 모델이 바뀌면 키가 달라져 자연스럽게 새로 생성됩니다.
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+
+PROMPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'prompts')
+
+MATERIAL_TEMPLATE = 'curriculum_template.txt'
+PRESENTATION_TEMPLATE = 'presentation_template.txt'
+
+
+@lru_cache(maxsize=None)
+def template_version(template_name: str) -> str:
+    """프롬프트 템플릿 내용의 짧은 해시 (프로세스당 한 번 계산)"""
+    with open(os.path.join(PROMPTS_DIR, template_name), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def model_deployment() -> str:
+    return os.getenv("AZURE_OPENAI_DEPLOY_CURRICULUM", "")
+
+
+def artifact_row_key(lesson_title: str, template_name: str) -> str:
+    """생성 자료 RowKey: 공과 제목, 템플릿 버전, 모델 배포 이름의 해시"""
+    raw = "\n".join([lesson_title, template_version(template_name), model_deployment()])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:40]
+
+
+def artifact_key_fields(template_name: str) -> dict:
+    """저장 시 함께 기록하는 키 구성 요소 (마이그레이션/디버깅용)"""
+    return {
+        "TemplateVersion": template_version(template_name),
+        "Deployment": model_deployment(),
+    }
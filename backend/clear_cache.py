@@ -1,7 +1,11 @@
 import os
+import sys
 from azure.data.tables import TableServiceClient
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from table_batches import submit_batches
+
 def clear_presentations():
     load_dotenv()
     conn_str = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
@@ -18,9 +22,11 @@ def clear_presentations():
                 entities = list(table_client.query_entities(""))
                 print(f"[{table_name}] 총 {len(entities)}개의 캐시를 삭제합니다...")
                 
-                for e in entities:
-                    table_client.delete_entity(e['PartitionKey'], e['RowKey'])
-                print(f"[{table_name}] 삭제 완료!")
+                # 파티션별 트랜잭션 배치로 삭제
+                result = submit_batches(table_client, [
+                    ("delete", {"PartitionKey": e['PartitionKey'], "RowKey": e['RowKey']}) for e in entities
+                ])
+                print(f"[{table_name}] 삭제 완료! (트랜잭션 {result['batches']}번, 실패 {result['failed']}건)")
             except Exception as e:
                 print(f"[{table_name}] 에러 발생: {e}")
                 
@@ -0,0 +1,112 @@
+"""
+HTTP 조건부 요청 (ETag / If-None-Match / Cache-Control)
+
+SPA는 화면을 옮길 때마다 주차 목록, 캐시된 교재/프리젠테이션, Q&A를 다시 요청합니다.
+응답마다 내용 해시로 만든 강한 ETag를 붙이고, 브라우저가 보낸 If-None-Match가
+같으면 본문 없이 304를 돌려줍니다. 값은 메모리/공유 캐시에서 찾으므로
+캐시 적중 시에는 Table Storage를 건드리지 않고 304가 나갑니다.
+
+Cache-Control로 브라우저/리버스 프록시가 max-age 동안은 요청 자체를 보내지 않게 합니다.
+
+JSON 직렬화는 orjson이 있으면 orjson으로 합니다. 주차 목록처럼 바뀌지 않는 자료는
+직렬화한 바이트를 캐시에 두고 그대로 보내므로, 반복 요청은 Pydantic 검증과
+JSON 인코딩을 모두 건너뜁니다.
+"""
+
+import hashlib
+import json
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # orjson 미설치 - 표준 json 사용
+    orjson = None
+
+# 엔드포인트 종류별 Cache-Control
+CACHE_WEEKS = "public, max-age=3600, stale-while-revalidate=86400"  # 1년에 한 번 바뀜
+CACHE_CURRENT_WEEK = "public, max-age=300"  # 날짜가 바뀌면 달라짐
+CACHE_ARTIFACT = "public, max-age=300, stale-while-revalidate=3600"  # 관리자 삭제 시에만 바뀜
+CACHE_REVALIDATE = "no-cache"  # 매번 ETag로 확인 (Q&A처럼 곧바로 보여야 하는 목록)
+CACHE_NONE = "no-store"  # 캐시 미스 응답 - 곧 생성될 수 있음
+
+
+def dumps(payload, sort_keys: bool = False) -> bytes:
+    """JSON 직렬화 (UTF-8 바이트, 공백 없음 - starlette JSONResponse와 같은 형식)"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(
+        payload, ensure_ascii=False, allow_nan=False, sort_keys=sort_keys, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson 기반 JSON 응답 (앱 기본 응답 클래스)"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """이미 직렬화된 JSON 바이트를 그대로 보내는 응답"""
+
+    media_type = "application/json"
+
+
+def _etag(data: bytes) -> str:
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+
+def body_etag(body: bytes) -> str:
+    """직렬화된 본문의 ETag"""
+    return _etag(body)
+
+
+def text_etag(text: str) -> str:
+    """문자열 본문의 ETag
+
+    교재/프리젠테이션 본문(수십~백여 KB)의 SHA-256은 1ms 미만으로, 저장소 왕복보다 훨씬 쌉니다.
+    결과를 문자열 키로 메모이즈하면 본문이 메모리 캐시 상한 밖에 붙잡히므로 매번 계산합니다.
+    """
+    return _etag(text.encode("utf-8"))
+
+
+def json_etag(payload) -> str:
+    """JSON 직렬화 결과의 ETag"""
+    return _etag(dumps(payload, sort_keys=True))
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 헤더가 etag와 일치하는지 (약한 비교, 목록/* 지원)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def conditional_json(request, payload, etag: str, cache_control: str) -> Response:
+    """If-None-Match가 맞으면 304, 아니면 ETag/Cache-Control을 붙인 JSON 응답"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(payload, headers=headers)
+
+
+def conditional_body(request, body: bytes, etag: str, cache_control: str) -> Response:
+    """conditional_json과 같지만 미리 직렬화된 JSON 바이트를 그대로 전송"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return RawJSONResponse(body, headers=headers)
+
+
+def uncached_json(payload) -> Response:
+    """저장하지 않을 응답 (캐시 미스/오류)"""
+    return FastJSONResponse(payload, headers={"Cache-Control": CACHE_NONE})
@@ -0,0 +1,44 @@
+"""
+내용 주소 기반 공과 본문 저장소
+
+/api/curriculum이 만든 공과 본문(수십 KB)을 브라우저가 생성/채팅/프리젠테이션
+요청마다 다시 올려보내지 않도록, 본문의 해시(lesson_id)를 돌려주고
+서버는 그 id로 본문을 찾습니다.
+
+- 같은 본문은 언제나 같은 id가 됩니다. (sha256 앞 32자리)
+- 본문은 캐시의 "lesson" 네임스페이스(L1 + 호스트 공유 L2)에 둡니다.
+- 캐시에 없으면(만료, 다른 호스트) 주차 달력에 읽혀 있는 공과 본문에서 찾습니다.
+"""
+
+import hashlib
+from typing import Optional
+
+
+def lesson_id_for(content: str) -> str:
+    """공과 본문의 내용 주소"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+
+
+class LessonStore:
+    """lesson_id → 공과 본문"""
+
+    def __init__(self, cache, calendar=None):
+        self.cache = cache
+        self.calendar = calendar
+
+    def put(self, content: str) -> str:
+        lesson_id = lesson_id_for(content)
+        if self.cache.get("lesson", lesson_id) is None:
+            self.cache.set("lesson", lesson_id, content)
+        return lesson_id
+
+    def get(self, lesson_id: str) -> Optional[str]:
+        content = self.cache.get("lesson", lesson_id)
+        if content is not None:
+            return content
+        if self.calendar is not None:
+            for content in self.calendar.lesson_contents():
+                if lesson_id_for(content) == lesson_id:
+                    self.cache.set("lesson", lesson_id, content)
+                    return content
+        return None
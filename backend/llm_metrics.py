@@ -0,0 +1,144 @@
+"""
+LLM 호출 계측 (토큰 사용량, 지연 시간 히스토그램, 캐시 적중)
+
+GenerationService를 거치는 모든 chat.completions 호출마다
+배포, 엔드포인트, 입력/출력 토큰(response.usage), 대기열 대기 시간,
+첫 토큰까지의 시간(스트리밍), 전체 지연 시간을 기록하고,
+생성 엔드포인트의 캐시 적중/미스를 함께 셉니다.
+
+/api/metrics가 Prometheus 텍스트 형식으로 내보냅니다.
+값은 워커 프로세스별로 모이므로, 스크레이프 대상마다 pid 라벨로 구분됩니다.
+
+스트리밍 응답에 usage가 없으면(API 버전에 따라 제공되지 않음) 입력 토큰은
+프롬프트 길이로, 출력 토큰은 받은 조각 수로 추정하고 usage="estimated" 라벨을 붙입니다.
+"""
+
+import os
+import threading
+
+QUEUE_WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120)
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 45, 60, 90, 120, 180, 300)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+
+class Histogram:
+    """라벨 조합별 누적 버킷 히스토그램"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.series = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels: tuple, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, *extra) -> str:
+    """{name="value",...} - extra는 뒤에 붙일 (name, value) 쌍들"""
+    pairs = list(zip(names, values)) + list(extra)
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class LLMMetrics:
+    """LLM 호출/캐시 지표 집계와 Prometheus 텍스트 출력"""
+
+    CALL_LABELS = ("deployment", "endpoint")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}  # (deployment, endpoint, status) -> count
+        self.tokens = {}  # (deployment, endpoint, kind, usage) -> count
+        self.cache = {}  # (endpoint, result) -> count
+        self.queue_wait = Histogram(QUEUE_WAIT_BUCKETS)
+        self.ttft = Histogram(LATENCY_BUCKETS)
+        self.duration = Histogram(LATENCY_BUCKETS)
+        self.completion_size = Histogram(TOKEN_BUCKETS)
+
+    @staticmethod
+    def _inc(counter: dict, key: tuple, amount=1):
+        counter[key] = counter.get(key, 0) + amount
+
+    def observe_call(self, deployment, endpoint, status="ok", queue_wait=None, ttft=None, duration=None,
+                     prompt_tokens=None, completion_tokens=None, estimated=False):
+        """LLM 호출 한 건 기록"""
+        key = (deployment or "", endpoint or "")
+        usage = "estimated" if estimated else "reported"
+        with self._lock:
+            self._inc(self.requests, key + (status,))
+            if queue_wait is not None:
+                self.queue_wait.observe(key, queue_wait)
+            if ttft is not None:
+                self.ttft.observe(key, ttft)
+            if duration is not None:
+                self.duration.observe(key, duration)
+            if prompt_tokens:
+                self._inc(self.tokens, key + ("prompt", usage), prompt_tokens)
+            if completion_tokens:
+                self._inc(self.tokens, key + ("completion", usage), completion_tokens)
+                self.completion_size.observe(key, completion_tokens)
+
+    def record_cache(self, endpoint: str, hit: bool):
+        """생성 엔드포인트의 캐시 적중/미스"""
+        with self._lock:
+            self._inc(self.cache, (endpoint, "hit" if hit else "miss"))
+
+    def render(self, lanes=None) -> str:
+        """Prometheus 텍스트 형식 (lanes: GenerationService.stats())"""
+        pid = ("pid", os.getpid())
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, help_text, hist):
+            header(name, "histogram", help_text)
+            for labels, series in sorted(hist.series.items()):
+                for bound, count in zip(hist.buckets, series):
+                    lines.append(f"{name}_bucket{_labels(self.CALL_LABELS, labels, pid, ('le', _number(float(bound))))} {count}")
+                lines.append(f"{name}_bucket{_labels(self.CALL_LABELS, labels, pid, ('le', '+Inf'))} {series[-1]}")
+                lines.append(f"{name}_sum{_labels(self.CALL_LABELS, labels, pid)} {_number(series[-2])}")
+                lines.append(f"{name}_count{_labels(self.CALL_LABELS, labels, pid)} {series[-1]}")
+
+        with self._lock:
+            header("llm_requests_total", "counter", "LLM calls by outcome (ok, error, rejected, cancelled)")
+            for key, count in sorted(self.requests.items()):
+                lines.append(f"llm_requests_total{_labels(self.CALL_LABELS + ('status',), key, pid)} {count}")
+
+            header("llm_tokens_total", "counter", "LLM tokens by kind (prompt, completion); usage=estimated when the API did not report usage")
+            for key, count in sorted(self.tokens.items()):
+                lines.append(f"llm_tokens_total{_labels(self.CALL_LABELS + ('kind', 'usage'), key, pid)} {count}")
+
+            histogram("llm_queue_wait_seconds", "Time spent waiting for a generation slot", self.queue_wait)
+            histogram("llm_time_to_first_token_seconds", "Time from request to the first streamed token, including queue wait", self.ttft)
+            histogram("llm_request_duration_seconds", "Total LLM call latency including queue wait", self.duration)
+            histogram("llm_completion_tokens", "Completion tokens per call", self.completion_size)
+
+            header("generation_cache_requests_total", "counter", "Generation endpoint cache lookups by result (hit, miss)")
+            for key, count in sorted(self.cache.items()):
+                lines.append(f"generation_cache_requests_total{_labels(('endpoint', 'result'), key, pid)} {count}")
+
+        if lanes:
+            for name, field, help_text in (
+                ("llm_in_flight", "in_flight", "LLM calls currently running"),
+                ("llm_queue_depth", "queue_depth", "LLM calls waiting for a slot"),
+            ):
+                header(name, "gauge", help_text)
+                for deployment, stats in sorted(lanes.items()):
+                    lines.append(f"{name}{_labels(('deployment',), (deployment or '',), pid)} {stats[field]}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,203 @@
+"""
+Azure OpenAI 생성 서비스
+
+AsyncAzureOpenAI 호출을 배포(deployment)별 동시 실행 한도(세마포어)와
+제한된 대기열 뒤에 둡니다. 생성 요청이 몰려도 이벤트 루프와 스레드풀은
+막히지 않고, 대기열이 가득 차면 곧바로 QueueFullError를 던져
+호출 측이 429/503 + Retry-After로 응답할 수 있게 합니다.
+
+호출마다 대기 시간, 첫 토큰까지의 시간, 전체 지연 시간, 토큰 사용량을
+metrics(LLMMetrics)에 기록합니다.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+try:
+    from prompt_budget import estimate_tokens
+except ImportError:
+    from backend.prompt_budget import estimate_tokens
+
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "32"))
+QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "120"))
+
+
+class QueueFullError(Exception):
+    """생성 대기열이 가득 찼거나 대기 시간이 초과됨"""
+
+    def __init__(self, deployment, retry_after, status_code=429):
+        self.deployment = deployment
+        self.retry_after = retry_after
+        self.status_code = status_code
+        super().__init__("요청이 많아 잠시 후 다시 시도해주세요.")
+
+
+class _Lane:
+    """배포 하나의 동시 실행 한도와 대기열 상태"""
+
+    def __init__(self, max_concurrency):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.avg_seconds = 30.0  # 호출 시간 지수이동평균 (Retry-After 추정용)
+
+
+class GenerationService:
+    """배포별 세마포어와 제한된 대기열을 가진 AsyncAzureOpenAI 래퍼"""
+
+    def __init__(self, client, default_deployment=None, max_concurrency=MAX_CONCURRENCY,
+                 max_queue=MAX_QUEUE, queue_timeout=QUEUE_TIMEOUT, metrics=None):
+        self.client = client
+        self.default_deployment = default_deployment
+        self.metrics = metrics
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._lanes = {}
+
+    def _lane(self, deployment):
+        lane = self._lanes.get(deployment)
+        if lane is None:
+            lane = _Lane(self.max_concurrency)
+            self._lanes[deployment] = lane
+        return lane
+
+    def _retry_after(self, lane):
+        # 앞선 대기열이 빠지는 데 걸릴 대략적인 시간
+        rounds = (lane.waiting + lane.in_flight) / self.max_concurrency
+        return max(1, int(lane.avg_seconds * max(rounds, 1)))
+
+    def check_capacity(self, deployment=None):
+        """대기열이 가득 찼으면 QueueFullError(429) - 스트림을 열기 전 확인용"""
+        deployment = deployment or self.default_deployment
+        lane = self._lane(deployment)
+        if lane.semaphore.locked() and lane.waiting >= self.max_queue:
+            lane.rejected += 1
+            raise QueueFullError(deployment, self._retry_after(lane), status_code=429)
+
+    @asynccontextmanager
+    async def slot(self, deployment=None):
+        """실행 슬롯 하나를 얻을 때까지 대기 (대기열이 가득 차면 즉시 실패) - 대기한 초를 yield"""
+        deployment = deployment or self.default_deployment
+        self.check_capacity(deployment)
+        lane = self._lane(deployment)
+
+        lane.waiting += 1
+        queued = time.monotonic()
+        try:
+            await asyncio.wait_for(lane.semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            lane.rejected += 1
+            raise QueueFullError(deployment, self._retry_after(lane), status_code=503)
+        finally:
+            lane.waiting -= 1
+
+        lane.in_flight += 1
+        started = time.monotonic()
+        try:
+            yield started - queued
+        finally:
+            elapsed = time.monotonic() - started
+            lane.avg_seconds = lane.avg_seconds * 0.8 + elapsed * 0.2
+            lane.in_flight -= 1
+            lane.completed += 1
+            lane.semaphore.release()
+
+    def _observe(self, deployment, endpoint, status, started, **fields):
+        if self.metrics is not None:
+            self.metrics.observe_call(
+                deployment, endpoint, status, duration=time.monotonic() - started, **fields
+            )
+
+    async def complete(self, messages, deployment=None, endpoint=None, **kwargs):
+        """chat.completions.create 호출 (슬롯 확보 후)"""
+        deployment = deployment or self.default_deployment
+        started = time.monotonic()
+        queue_wait = None
+        try:
+            async with self.slot(deployment) as queue_wait:
+                response = await self.client.chat.completions.create(
+                    model=deployment, messages=messages, **kwargs
+                )
+        except QueueFullError:
+            self._observe(deployment, endpoint, "rejected", started)
+            raise
+        except Exception:
+            self._observe(deployment, endpoint, "error", started, queue_wait=queue_wait)
+            raise
+
+        usage = getattr(response, "usage", None)
+        self._observe(
+            deployment, endpoint, "ok", started,
+            queue_wait=queue_wait,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+        )
+        return response
+
+    async def stream(self, messages, deployment=None, endpoint=None, **kwargs):
+        """스트리밍 호출 - 청크를 async로 yield하며, 끝날 때까지 슬롯을 점유"""
+        deployment = deployment or self.default_deployment
+        started = time.monotonic()
+        queue_wait = None
+        ttft = None
+        pieces = 0
+        usage = None
+        status = "error"
+        try:
+            async with self.slot(deployment) as queue_wait:
+                stream = await self.client.chat.completions.create(
+                    model=deployment, messages=messages, stream=True, **kwargs
+                )
+                try:
+                    async for chunk in stream:
+                        usage = getattr(chunk, "usage", None) or usage
+                        if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                            if ttft is None:
+                                ttft = time.monotonic() - started
+                            pieces += 1
+                        yield chunk
+                finally:
+                    await stream.close()
+            status = "ok"
+        except QueueFullError:
+            status = "rejected"
+            raise
+        except (GeneratorExit, asyncio.CancelledError):
+            status = "cancelled"
+            raise
+        finally:
+            if status == "rejected":
+                self._observe(deployment, endpoint, status, started)
+            elif usage is not None:
+                self._observe(
+                    deployment, endpoint, status, started, queue_wait=queue_wait, ttft=ttft,
+                    prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens,
+                )
+            else:
+                # usage 미제공 - 프롬프트 길이와 받은 조각 수로 추정
+                self._observe(
+                    deployment, endpoint, status, started, queue_wait=queue_wait, ttft=ttft,
+                    prompt_tokens=sum(estimate_tokens(m.get("content") or "") for m in messages),
+                    completion_tokens=pieces, estimated=True,
+                )
+
+    def stats(self):
+        """배포별 대기열 지표"""
+        return {
+            deployment: {
+                "in_flight": lane.in_flight,
+                "queue_depth": lane.waiting,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "completed": lane.completed,
+                "rejected": lane.rejected,
+                "avg_seconds": round(lane.avg_seconds, 2),
+            }
+            for deployment, lane in self._lanes.items()
+        }
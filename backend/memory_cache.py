@@ -0,0 +1,140 @@
+"""
+프로세스 내 LRU + TTL 캐시
+
+한 번 저장되면 거의 바뀌지 않는 조회(생성된 교재/프리젠테이션, 공과 본문,
+관리자 비밀번호 등)를 Table Storage 왕복 없이 메모리에서 돌려줍니다.
+
+- 전체 크기(바이트 추정치) 상한을 넘으면 가장 오래 안 쓴 항목부터 제거합니다.
+- 네임스페이스(자료 종류)마다 TTL이 다릅니다.
+- 쓰기/삭제 엔드포인트는 invalidate()로 해당 항목을 직접 비웁니다.
+  다른 워커 프로세스의 캐시는 비워지지 않으므로, 워커 간 일관성은 TTL로 제한합니다.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+MAX_BYTES = int(float(os.getenv("MEMORY_CACHE_MAX_MB", "64")) * 1024 * 1024)
+
+# 네임스페이스별 TTL(초)
+DEFAULT_TTLS = {
+    "material": 3600,
+    "presentation": 3600,
+    "lesson": 86400,
+    "weeks": 3600,
+    "config": 300,
+    "qa": 60,
+    "board": 30,
+}
+
+
+def estimate_size(value) -> int:
+    """값이 차지하는 메모리의 대략적인 바이트 수"""
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class _Counter:
+    __slots__ = ("hits", "misses")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+
+class MemoryCache:
+    """바이트 크기 기반 LRU + 네임스페이스별 TTL 캐시 (스레드 안전)"""
+
+    def __init__(self, max_bytes=MAX_BYTES, ttls=None, default_ttl=300):
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # (namespace, key) -> (value, expires_at, size)
+        self._bytes = 0
+        self._evictions = 0
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _counter(self, namespace) -> _Counter:
+        counter = self._counters.get(namespace)
+        if counter is None:
+            counter = self._counters[namespace] = _Counter()
+        return counter
+
+    def get(self, namespace: str, key, default=None):
+        """캐시된 값 (없거나 만료되면 default)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            counter = self._counter(namespace)
+            if entry is None:
+                counter.misses += 1
+                return default
+            value, expires_at, size = entry
+            if expires_at <= now:
+                del self._entries[(namespace, key)]
+                self._bytes -= size
+                counter.misses += 1
+                return default
+            self._entries.move_to_end((namespace, key))
+            counter.hits += 1
+            return value
+
+    def set(self, namespace: str, key, value, ttl=None):
+        """값 저장 - 한 항목이 상한보다 크면 저장하지 않음"""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        ttl = ttl if ttl is not None else self.ttls.get(namespace, self.default_ttl)
+        with self._lock:
+            old = self._entries.pop((namespace, key), None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[(namespace, key)] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def invalidate(self, namespace: str, key=None):
+        """항목 하나(key 지정) 또는 네임스페이스 전체 제거"""
+        with self._lock:
+            if key is not None:
+                old = self._entries.pop((namespace, key), None)
+                if old is not None:
+                    self._bytes -= old[2]
+                return
+            for entry_key in [k for k in self._entries if k[0] == namespace]:
+                self._bytes -= self._entries.pop(entry_key)[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """적중/실패 카운터와 사용량"""
+        with self._lock:
+            namespaces = {}
+            for namespace, counter in self._counters.items():
+                total = counter.hits + counter.misses
+                namespaces[namespace] = {
+                    "hits": counter.hits,
+                    "misses": counter.misses,
+                    "hit_rate": round(counter.hits / total, 3) if total else 0.0,
+                }
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+                "namespaces": namespaces,
+            }
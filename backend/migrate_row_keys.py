@@ -0,0 +1,101 @@
+"""
+생성 자료 RowKey 마이그레이션 (1회 실행용)
+
+uuid4 RowKey로 저장된 CurriculumMaterials / CurriculumPresentation 행을
+cache_keys.artifact_row_key 규칙의 결정적 RowKey로 옮기고,
+같은 (PartitionKey, LessonTitle)의 중복 행은 가장 최근 것만 남기고 삭제합니다.
+
+기존 행은 현재 템플릿/배포 모델로 생성된 것으로 간주합니다.
+쓰기/삭제는 파티션별 트랜잭션 배치(table_batches)로 보내며, 한 공과의 새 행 쓰기가
+실패하면 그 파티션의 이후 삭제는 실행하지 않습니다.
+
+사용법:
+    python backend/migrate_row_keys.py            # 실제 실행
+    python backend/migrate_row_keys.py --dry-run  # 변경 내용만 출력
+"""
+
+import os
+import sys
+from collections import defaultdict
+
+from azure.data.tables import TableServiceClient
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cache_keys import artifact_row_key, artifact_key_fields, MATERIAL_TEMPLATE, PRESENTATION_TEMPLATE
+from table_batches import submit_batches
+
+TABLES = {
+    "CurriculumMaterials": MATERIAL_TEMPLATE,
+    "CurriculumPresentation": PRESENTATION_TEMPLATE,
+}
+
+# Azure가 엔티티에 붙이는 메타데이터 - 새 엔티티로 복사하지 않음
+SYSTEM_PROPERTIES = {"PartitionKey", "RowKey", "Timestamp", "etag"}
+
+
+def migrate_table(table_client, template_name, dry_run=False):
+    groups = defaultdict(list)
+    # 목록을 먼저 모두 읽은 뒤 쓰기 - 페이지 조회 도중 새 행이 섞이지 않도록
+    for entity in list(table_client.list_entities()):
+        title = entity.get("LessonTitle")
+        if title is None:
+            continue
+        groups[(entity["PartitionKey"], title)].append(entity)
+
+    moved = deleted = 0
+    operations = []
+    for (partition_key, title), entities in groups.items():
+        new_row_key = artifact_row_key(title, template_name)
+        entities.sort(key=lambda e: e.get("CreatedAt", ""), reverse=True)
+        keep = next((e for e in entities if e["RowKey"] == new_row_key), entities[0])
+
+        if keep["RowKey"] != new_row_key:
+            entity = {k: v for k, v in keep.items() if k not in SYSTEM_PROPERTIES}
+            entity.update({
+                "PartitionKey": partition_key,
+                "RowKey": new_row_key,
+                **artifact_key_fields(template_name),
+            })
+            print(f"  ↪ {partition_key} / {title}: {keep['RowKey']} → {new_row_key}")
+            operations.append(("upsert", entity))
+            moved += 1
+
+        for e in entities:
+            if e["RowKey"] == new_row_key:
+                continue
+            operations.append(("delete", {"PartitionKey": e["PartitionKey"], "RowKey": e["RowKey"]}))
+            deleted += 1
+
+    if operations and not dry_run:
+        result = submit_batches(table_client, operations)
+        print(f"  📦 작업 {result['operations']}건, 트랜잭션 {result['batches']}번, 실패 {result['failed']}건")
+
+    return len(groups), moved, deleted
+
+
+def main():
+    load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+    conn_str = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
+    if not conn_str:
+        print("연결 문자열이 없습니다.")
+        return
+
+    dry_run = "--dry-run" in sys.argv
+    if dry_run:
+        print("🔍 dry-run 모드: 실제로 쓰거나 지우지 않습니다.")
+
+    service_client = TableServiceClient.from_connection_string(conn_str)
+    for table_name, template_name in TABLES.items():
+        try:
+            table_client = service_client.get_table_client(table_name)
+            print(f"[{table_name}] 마이그레이션 시작...")
+            lessons, moved, deleted = migrate_table(table_client, template_name, dry_run)
+            print(f"[{table_name}] 공과 {lessons}개, 키 변경 {moved}건, 중복/구 행 삭제 {deleted}건")
+        except Exception as e:
+            print(f"[{table_name}] 에러 발생: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+다가오는 주차 공과 자료 미리 생성 (pre-warm)
+
+첫 교사가 클릭할 때 LLM 대기 시간을 모두 떠안지 않도록, 다음 N주의
+공과 자료(CurriculumMaterials)와 프리젠테이션(CurriculumPresentation)을
+대상 그룹별로 미리 생성해 저장합니다.
+
+- 생성은 한 번에 하나씩, 실제 LLM 호출 사이에 간격을 두어 사용자 요청과
+  Azure OpenAI 할당량을 나눠 씁니다. 429/503이면 Retry-After만큼 쉬고 재시도합니다.
+- 진행 상황은 PregenerationStatus 테이블에 기록합니다.
+  (job/current 행 = 실행 요약, <RunId>/<종류>_<PartitionKey> 행 = 항목별 상태)
+  중단된 실행을 다시 시작하면 같은 RunId로 이어서 완료된 항목은 건너뜁니다.
+- 여러 워커/인스턴스가 동시에 돌지 않도록 job 행을 ETag 조건부 갱신으로 임대(lease)합니다.
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceModifiedError
+from azure.data.tables import UpdateMode
+from fastapi import HTTPException
+
+TABLE_PREGENERATION = "PregenerationStatus"
+WEEKS_AHEAD = int(os.getenv("PREGENERATE_WEEKS", "2"))
+REQUEST_INTERVAL = float(os.getenv("PREGENERATE_INTERVAL_SECONDS", "10"))
+SCHEDULE_HOURS = float(os.getenv("PREGENERATE_SCHEDULE_HOURS", "12"))  # 0이면 예약 실행 안 함
+LEASE_SECONDS = 600
+MAX_RETRIES = 3
+
+# 공과 내용을 가져오지 못했을 때의 안내 문구 - 이런 내용으로는 생성하지 않음
+UNAVAILABLE_MARKERS = ("가져올 수 없습니다", "찾을 수 없습니다", "오류가 발생했습니다")
+
+
+def utcnow() -> str:
+    return datetime.utcnow().isoformat()
+
+
+class PregenerationJob:
+    """다음 N주 x 대상 그룹의 자료/프리젠테이션을 미리 생성하는 작업
+
+    load_weeks(year) -> 주차 목록, load_lesson(week) -> {"title", "content"} 는 동기 함수이고,
+    tasks는 {종류: async fn(lesson_title, lesson_content, target_audience, week_range) -> is_cached} 입니다.
+    """
+
+    def __init__(self, get_store, load_weeks, load_lesson, tasks, audiences, partition_key):
+        self.get_store = get_store
+        self.load_weeks = load_weeks
+        self.load_lesson = load_lesson
+        self.tasks = tasks
+        self.audiences = audiences
+        self.partition_key = partition_key
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._task = None
+        self._schedule_task = None
+
+    # === 계획 ===
+
+    def upcoming_weeks(self, weeks_ahead: int, today=None) -> list:
+        """오늘 이후로 끝나는 주차 중 앞에서부터 weeks_ahead개 (연말이면 다음 해까지)"""
+        today = (today or datetime.now()).strftime('%Y-%m-%d')
+        year = int(today[:4])
+        upcoming = []
+        for y in (year, year + 1):
+            weeks = sorted(self.load_weeks(y), key=lambda w: w['end_date'])
+            upcoming.extend(w for w in weeks if w['end_date'] >= today)
+            if len(upcoming) >= weeks_ahead:
+                break
+        return upcoming[:weeks_ahead]
+
+    # === 상태 테이블 ===
+
+    async def get_status(self) -> dict:
+        """현재(또는 마지막) 실행 요약과 항목별 상태"""
+        store = self.get_store()
+        job = await store.get_entity(TABLE_PREGENERATION, "job", "current")
+        if job is None:
+            return {"state": "idle", "items": []}
+        items = await store.query_entities(
+            TABLE_PREGENERATION, "PartitionKey eq @run", parameters={"run": job.get("RunId", "")}
+        )
+        return {
+            "state": job.get("State"),
+            "run_id": job.get("RunId"),
+            "started_at": job.get("StartedAt"),
+            "updated_at": job.get("UpdatedAt"),
+            "weeks": job.get("Weeks"),
+            "total": job.get("Total", 0),
+            "done": job.get("Done", 0),
+            "generated": job.get("Generated", 0),
+            "failed": job.get("Failed", 0),
+            "current_item": job.get("CurrentItem", ""),
+            "last_error": job.get("LastError", ""),
+            "items": sorted(
+                (
+                    {
+                        "kind": e.get("Kind"),
+                        "week_range": e.get("WeekRange"),
+                        "target_audience": e.get("TargetAudience"),
+                        "status": e.get("Status"),
+                        "is_cached": e.get("IsCached"),
+                        "error": e.get("Error", ""),
+                        "updated_at": e.get("UpdatedAt"),
+                    }
+                    for e in items
+                ),
+                key=lambda i: (i["week_range"] or "", i["target_audience"] or "", i["kind"] or ""),
+            ),
+        }
+
+    async def _acquire_lease(self, resume: bool) -> dict:
+        """job 행을 임대 - 다른 워커가 실행 중이면 None"""
+        store = self.get_store()
+        client = store.client(TABLE_PREGENERATION)
+        now = datetime.utcnow()
+        job = await store.get_entity(TABLE_PREGENERATION, "job", "current")
+
+        if job is not None and job.get("State") == "running":
+            heartbeat = job.get("HeartbeatAt") or ""
+            if heartbeat >= (now - timedelta(seconds=LEASE_SECONDS)).isoformat() and job.get("Owner") != self.worker_id:
+                return None
+
+        run_id = uuid.uuid4().hex[:12]
+        if resume and job is not None and job.get("State") in ("running", "interrupted", "failed"):
+            run_id = job.get("RunId") or run_id  # 중단된 실행 이어가기
+
+        entity = {
+            "PartitionKey": "job",
+            "RowKey": "current",
+            "RunId": run_id,
+            "State": "running",
+            "Owner": self.worker_id,
+            "StartedAt": job.get("StartedAt") if job is not None and run_id == job.get("RunId") else now.isoformat(),
+            "UpdatedAt": now.isoformat(),
+            "HeartbeatAt": now.isoformat(),
+            "Total": 0, "Done": 0, "Generated": 0, "Failed": 0,
+            "CurrentItem": "", "LastError": "", "Weeks": "",
+        }
+        try:
+            if job is None:
+                await client.create_entity(entity)
+            else:
+                await client.update_entity(
+                    entity, mode=UpdateMode.REPLACE,
+                    etag=job.metadata["etag"], match_condition=MatchConditions.IfNotModified
+                )
+        except (ResourceExistsError, ResourceModifiedError):
+            return None  # 다른 워커가 먼저 임대함
+        return entity
+
+    async def _save_job(self, job: dict, **fields):
+        now = utcnow()
+        job.update(fields, UpdatedAt=now, HeartbeatAt=now)
+        await self.get_store().upsert_entity(TABLE_PREGENERATION, job)
+
+    # === 실행 ===
+
+    def start(self, weeks_ahead: int = WEEKS_AHEAD, resume: bool = True) -> bool:
+        """백그라운드 실행 시작 - 이 워커에서 이미 실행 중이면 False"""
+        if self.is_running():
+            return False
+        self._task = asyncio.create_task(self.run(weeks_ahead, resume))
+        return True
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def run(self, weeks_ahead: int = WEEKS_AHEAD, resume: bool = True):
+        """다음 weeks_ahead주 x 대상 그룹 x 생성 종류를 차례로 미리 생성"""
+        job = await self._acquire_lease(resume)
+        if job is None:
+            print("⏭️ 미리 생성: 다른 워커가 실행 중이라 건너뜀")
+            return None
+
+        run_id = job["RunId"]
+        store = self.get_store()
+        try:
+            weeks = await asyncio.to_thread(self.upcoming_weeks, weeks_ahead)
+            # 이어가는 실행이면 항목별 상태에서 완료/생성/실패 수를 이어받음
+            items = await store.query_entities(
+                TABLE_PREGENERATION, "PartitionKey eq @run", parameters={"run": run_id}
+            )
+            done_keys = {e["RowKey"] for e in items if e.get("Status") == "done"}
+            failed_keys = {e["RowKey"] for e in items if e.get("Status") == "failed"}
+            total = len(weeks) * len(self.audiences) * len(self.tasks)
+            await self._save_job(
+                job, Total=total, Done=len(done_keys),
+                Generated=sum(1 for e in items if e.get("Status") == "done" and not e.get("IsCached")),
+                Failed=len(failed_keys),
+                Weeks=", ".join(w['week_range'] for w in weeks)
+            )
+            print(f"🔥 미리 생성 시작 ({run_id}): {job['Weeks']} / 항목 {total}개, 완료 {len(done_keys)}개")
+
+            for week in weeks:
+                lesson = None
+                for audience in self.audiences:
+                    partition_key = self.partition_key(week['week_range'], audience)
+                    for kind, generate in self.tasks.items():
+                        row_key = f"{kind}_{partition_key}"
+                        if row_key in done_keys:
+                            continue
+                        if lesson is None:
+                            lesson = await asyncio.to_thread(self.load_lesson, week)
+                        if row_key in failed_keys:
+                            job["Failed"] -= 1  # 다시 시도 - 결과에 따라 다시 셈
+                        await self._save_job(job, CurrentItem=f"{week['week_range']} / {audience} / {kind}")
+                        await self._run_item(job, run_id, row_key, kind, generate, week, audience, lesson)
+
+            await self._save_job(job, State="completed", CurrentItem="")
+            print(f"✅ 미리 생성 완료 ({run_id}): 생성 {job['Generated']}건, 실패 {job['Failed']}건")
+        except asyncio.CancelledError:
+            await self._save_job(job, State="interrupted")
+            raise
+        except Exception as e:
+            print(f"❌ 미리 생성 실패: {e}")
+            await self._save_job(job, State="failed", LastError=str(e))
+        return job
+
+    async def _run_item(self, job, run_id, row_key, kind, generate, week, audience, lesson):
+        """항목 하나 생성 (429/503이면 Retry-After만큼 쉬고 재시도)"""
+        item = {
+            "PartitionKey": run_id,
+            "RowKey": row_key,
+            "Kind": kind,
+            "WeekRange": week['week_range'],
+            "TargetAudience": audience,
+            "LessonTitle": lesson.get('title', ''),
+        }
+        content = lesson.get('content') or ""
+        if not content or any(marker in content for marker in UNAVAILABLE_MARKERS):
+            item.update(Status="failed", Error="공과 내용을 가져오지 못함", UpdatedAt=utcnow())
+            await self.get_store().upsert_entity(TABLE_PREGENERATION, item)
+            await self._save_job(job, Failed=job["Failed"] + 1, LastError=f"{row_key}: 공과 내용 없음")
+            return
+
+        error = ""
+        for attempt in range(MAX_RETRIES):
+            try:
+                is_cached = await generate(
+                    lesson_title=lesson['title'],
+                    lesson_content=content,
+                    target_audience=audience,
+                    week_range=week['week_range'],
+                )
+            except HTTPException as e:
+                error = str(e.detail)
+                if e.status_code in (429, 503) and attempt + 1 < MAX_RETRIES:
+                    retry_after = float((e.headers or {}).get("Retry-After", REQUEST_INTERVAL))
+                    print(f"⏳ 미리 생성 대기열 포화, {retry_after:.0f}초 후 재시도: {row_key}")
+                    await asyncio.sleep(retry_after)
+                    continue
+                break
+            except Exception as e:
+                error = str(e)
+                break
+
+            item.update(Status="done", IsCached=bool(is_cached), UpdatedAt=utcnow())
+            await self.get_store().upsert_entity(TABLE_PREGENERATION, item)
+            await self._save_job(
+                job, Done=job["Done"] + 1, Generated=job["Generated"] + (0 if is_cached else 1)
+            )
+            if not is_cached:
+                print(f"✅ 미리 생성됨: {row_key}")
+                # 실제로 LLM을 호출한 경우에만 간격을 둠 (캐시 히트는 바로 다음 항목으로)
+                await asyncio.sleep(REQUEST_INTERVAL)
+            return
+
+        print(f"❌ 미리 생성 항목 실패: {row_key} - {error}")
+        item.update(Status="failed", Error=error[:1000], UpdatedAt=utcnow())
+        await self.get_store().upsert_entity(TABLE_PREGENERATION, item)
+        await self._save_job(job, Failed=job["Failed"] + 1, LastError=f"{row_key}: {error[:500]}")
+
+    def schedule(self, interval_hours: float = SCHEDULE_HOURS) -> bool:
+        """예약 실행 시작 (interval_hours가 0이면 사용 안 함)"""
+        if interval_hours <= 0 or self._schedule_task is not None:
+            return False
+        self._schedule_task = asyncio.create_task(self.run_forever(interval_hours))
+        return True
+
+    async def stop(self):
+        """앱 종료 시 예약/실행 중인 작업 취소 - 진행 상황은 interrupted로 남아 다음에 이어감"""
+        for task in (self._schedule_task, self._task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._schedule_task = None
+        self._task = None
+
+    async def run_forever(self, interval_hours: float = SCHEDULE_HOURS):
+        """예약 실행 - interval_hours마다 run() (임대 덕분에 워커 여러 개 중 하나만 실행)"""
+        await asyncio.sleep(60)  # 앱 시작 직후의 부하를 피함
+        while True:
+            try:
+                await self.run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ 예약된 미리 생성 실패: {e}")
+            await asyncio.sleep(interval_hours * 3600)
@@ -1,3 +1,5 @@
+import re
+
 HTML_SKELETON = """<!DOCTYPE html>
 <html lang="ko" class="theme-light">
 <head>
@@ -182,3 +184,36 @@ HTML_SKELETON = """<!DOCTYPE html>
 </body>
 </html>
 """
+
+
+# 슬라이드 마크업 규칙(클래스 이름, reveal.js 구조 등)이 바뀌어 기존 LLM 출력과
+# 호환되지 않을 때만 올립니다. CSS/JS만 고친 경우에는 그대로 두면
+# 저장된 슬라이드가 재생성 없이 새 뼈대로 렌더링됩니다.
+SKELETON_VERSION = "1"
+
+_PLACEHOLDER = re.compile(r"\{(lesson_title|llm_slides_output)\}")
+
+
+def _split_skeleton(skeleton):
+    """뼈대를 (고정 문자열, 자리표시자 이름) 조각 목록으로 미리 분할"""
+    parts = []
+    pos = 0
+    for match in _PLACEHOLDER.finditer(skeleton):
+        parts.append((skeleton[pos:match.start()], match.group(1)))
+        pos = match.end()
+    parts.append((skeleton[pos:], None))
+    return parts
+
+
+_SKELETON_PARTS = _split_skeleton(HTML_SKELETON)
+
+
+def render_presentation(lesson_title, slides_html):
+    """저장된 LLM 슬라이드 출력을 뼈대에 끼워 완전한 HTML 문서를 만듦"""
+    values = {"lesson_title": lesson_title, "llm_slides_output": slides_html}
+    out = []
+    for literal, name in _SKELETON_PARTS:
+        out.append(literal)
+        if name is not None:
+            out.append(values[name])
+    return "".join(out)
@@ -0,0 +1,161 @@
+"""
+채팅 프롬프트 크기 제한 (BM25 섹션 선택)
+
+채팅마다 공과 내용과 생성된 교재 전체(약 8000토큰)를 프롬프트에 넣으면
+입력 토큰 비용과 첫 토큰까지의 시간이 커집니다. 교재/공과 내용을 제목(#)과
+문단 단위 섹션으로 나누고, 질문과 BM25 점수가 높은 섹션부터 토큰 예산
+(CHAT_PROMPT_TOKEN_BUDGET) 안에서 골라 원래 순서대로 이어 붙입니다.
+
+- 토큰화: 단어 + 한글 글자 2-gram (조사가 붙은 어절도 맞도록)
+- 토큰 수는 tokenizer 없이 보수적으로 추정합니다. (한글 1자 ≈ 1토큰, 그 외 4자 ≈ 1토큰)
+"""
+
+import math
+import os
+import re
+from collections import Counter
+
+TOKEN_BUDGET = int(os.getenv("CHAT_PROMPT_TOKEN_BUDGET", "3000"))
+LESSON_SHARE = 0.4  # 예산 중 공과 내용 몫 (나머지는 생성된 교재)
+SECTION_MAX_TOKENS = 400  # 이보다 긴 섹션은 문단 단위로 나눔
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_WORD = re.compile(r"\w+")
+_HANGUL = re.compile(r"[가-힣]")
+_PARAGRAPH = re.compile(r"\n\s*\n")
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (한글 1자 ≈ 1토큰, 나머지 4자 ≈ 1토큰)"""
+    if not text:
+        return 0
+    hangul = len(_HANGUL.findall(text))
+    return hangul + (len(text) - hangul) // 4 + 1
+
+
+def tokenize(text: str) -> list:
+    """BM25용 토큰: 소문자 단어 + 한글 단어의 글자 2-gram"""
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        tokens.append(word)
+        if len(word) > 2 and _HANGUL.match(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def _pieces(body: str) -> list:
+    """문단 → 줄 → 글자 수 순으로, SECTION_MAX_TOKENS 이하 조각들로 나눔"""
+    pieces = []
+    for paragraph in _PARAGRAPH.split(body):
+        paragraph = paragraph.strip()
+        if estimate_tokens(paragraph) <= SECTION_MAX_TOKENS:
+            pieces.append(paragraph)
+            continue
+        for line in paragraph.splitlines():
+            while estimate_tokens(line) > SECTION_MAX_TOKENS:
+                pieces.append(line[:SECTION_MAX_TOKENS])
+                line = line[SECTION_MAX_TOKENS:]
+            pieces.append(line)
+    return [piece for piece in pieces if piece.strip()]
+
+
+def split_sections(text: str) -> list:
+    """마크다운 제목 기준 섹션 목록 - 긴 섹션은 제목을 붙인 문단 묶음으로 나눔"""
+    sections = []
+    heading = ""
+    lines = []
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if not body and not heading:
+            return
+        if estimate_tokens(body) <= SECTION_MAX_TOKENS:
+            sections.append(f"{heading}\n{body}".strip())
+            return
+        chunk = []
+        for piece in _pieces(body):
+            if chunk and estimate_tokens("\n\n".join(chunk + [piece])) > SECTION_MAX_TOKENS:
+                sections.append(f"{heading}\n" + "\n\n".join(chunk))
+                chunk = []
+            chunk.append(piece)
+        if chunk:
+            sections.append(f"{heading}\n" + "\n\n".join(chunk))
+
+    for line in (text or "").splitlines():
+        if _HEADING.match(line):
+            flush()
+            heading = line.strip()
+            lines = []
+        else:
+            lines.append(line)
+    flush()
+    return [section.strip() for section in sections if section.strip()]
+
+
+def bm25_scores(query_tokens: list, documents: list) -> list:
+    """documents(토큰 목록들)의 query에 대한 BM25 점수"""
+    n = len(documents)
+    if n == 0:
+        return []
+    avg_length = sum(len(doc) for doc in documents) / n or 1
+    df = Counter()
+    for doc in documents:
+        df.update(set(doc))
+    query = Counter(query_tokens)
+
+    scores = []
+    for doc in documents:
+        tf = Counter(doc)
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * len(doc) / avg_length)
+        score = 0.0
+        for token in query:
+            if token not in tf:
+                continue
+            idf = math.log(1 + (n - df[token] + 0.5) / (df[token] + 0.5))
+            score += idf * tf[token] * (BM25_K1 + 1) / (tf[token] + length_norm)
+        scores.append(score)
+    return scores
+
+
+def select_sections(text: str, question: str, budget_tokens: int) -> str:
+    """질문과 관련 높은 섹션을 예산 안에서 골라 원래 순서로 이어 붙임"""
+    if not text or estimate_tokens(text) <= budget_tokens:
+        return text or ""
+    sections = split_sections(text)
+    scores = bm25_scores(tokenize(question), [tokenize(section) for section in sections])
+
+    # 점수 높은 순 (같으면 앞쪽 섹션 - 개요/도입이 먼저 채워짐)
+    order = sorted(range(len(sections)), key=lambda i: (-scores[i], i))
+    chosen = []
+    used = 0
+    for i in order:
+        cost = estimate_tokens(sections[i])
+        if used + cost > budget_tokens:
+            continue
+        chosen.append(i)
+        used += cost
+    return "\n\n".join(sections[i] for i in sorted(chosen))
+
+
+def budget_chat_context(lesson_content: str, reference_material: str, question: str,
+                        budget_tokens: int = TOKEN_BUDGET):
+    """(공과 내용, 참고자료)를 합쳐 budget_tokens 안으로 줄임
+
+    한쪽이 몫보다 짧으면 남는 예산은 다른 쪽이 씁니다.
+    """
+    lesson_budget = int(budget_tokens * LESSON_SHARE)
+    lesson_tokens = estimate_tokens(lesson_content)
+    if lesson_tokens < lesson_budget:
+        lesson_budget = lesson_tokens
+    material_budget = budget_tokens - lesson_budget
+    material_tokens = estimate_tokens(reference_material)
+    if material_tokens < material_budget:
+        lesson_budget += material_budget - material_tokens
+        material_budget = material_tokens
+
+    return (
+        select_sections(lesson_content, question, lesson_budget),
+        select_sections(reference_material, question, material_budget),
+    )
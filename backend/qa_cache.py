@@ -0,0 +1,246 @@
+"""
+채팅 답변 캐시 (정규화된 질문 조회)
+
+같은 공과를 준비하는 교사들은 거의 같은 질문("이 공과의 핵심 원리는?")을 반복합니다.
+/api/chat은 LLM을 부르기 전에 같은 파티션(주차 + 대상)의 이전 Q&A(CurriculumQA)에서
+답을 먼저 찾습니다.
+
+- 질문 정규화: NFKC(분해된 한글 자모 결합, 전각 문자 정리) → 소문자 →
+  문장부호/기호 제거 → 공백 제거(띄어쓰기 차이는 같은 질문으로 봄)
+- 정규화 결과의 해시 색인으로 완전 일치를 O(1)에 찾습니다.
+- CHAT_CACHE_SIMILARITY를 1보다 낮추면 표현만 바꾼 질문도 찾습니다. (기본값 1.0 = 완전 일치만)
+  글자 2~3-gram을 해싱 트릭으로 고정 차원(CHAT_CACHE_DIMENSIONS)에 모은
+  TF-IDF 벡터를 파티션마다 float32 행렬 하나로 두고, NumPy 코사인 유사도가
+  기준 이상인 가장 가까운 질문의 답을 돌려줍니다. (0이면 캐시 끔)
+  글자 n-gram은 뜻을 모릅니다. "아이들에게"/"어른들에게", "원리"/"교리", "24장"/"25장"처럼
+  한 단어만 다른 질문이 0.7~0.85로 나오고, 같은 뜻의 "무엇인가요"/"뭔가요"는 0.6으로 나옵니다.
+  그래서 기본값은 완전 일치이고, 낮추더라도 0.9 이상을 쓰며 질문 속 숫자(장, 절)가
+  다르면 비슷해도 같은 질문으로 보지 않습니다. 외부 모델/네트워크 없이 CPU만 씁니다.
+
+파티션 색인은 처음 조회할 때 만들고, 이 워커에서 저장한 Q&A는 행렬에 바로 한 행씩
+추가합니다. 다른 워커가 저장한 Q&A는 CHAT_CACHE_TTL_SECONDS 뒤 색인을 다시 만들 때 반영됩니다.
+"""
+
+import hashlib
+import os
+import re
+import time
+import unicodedata
+import zlib
+from collections import deque
+
+import numpy as np
+
+SIMILARITY = float(os.getenv("CHAT_CACHE_SIMILARITY", "1.0"))
+INDEX_TTL = float(os.getenv("CHAT_CACHE_TTL_SECONDS", "300"))
+DIMENSIONS = int(os.getenv("CHAT_CACHE_DIMENSIONS", "2048"))
+NGRAM_MIN, NGRAM_MAX = 2, 3
+
+_SPACES = re.compile(r"\s+")
+_NUMBERS = re.compile(r"\d+")
+
+
+def normalize_question(text: str) -> str:
+    """비교용 질문 정규화"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = "".join(" " if unicodedata.category(ch)[0] in "PS" else ch for ch in text)
+    return _SPACES.sub("", text)
+
+
+def question_hash(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def char_ngrams(normalized: str):
+    """글자 n-gram (NGRAM_MIN~NGRAM_MAX) - 한 글자 질문은 그 글자 하나"""
+    if len(normalized) < NGRAM_MIN:
+        return [normalized] if normalized else []
+    return [
+        normalized[i:i + n]
+        for n in range(NGRAM_MIN, NGRAM_MAX + 1)
+        for i in range(len(normalized) - n + 1)
+    ]
+
+
+def ngram_counts(normalized: str, dimensions: int) -> np.ndarray:
+    """해싱 트릭으로 고정 차원에 모은 n-gram 빈도 (sublinear tf, float32)"""
+    buckets = [zlib.crc32(gram.encode("utf-8")) % dimensions for gram in char_ngrams(normalized)]
+    counts = np.bincount(buckets, minlength=dimensions).astype(np.float32) if buckets \
+        else np.zeros(dimensions, dtype=np.float32)
+    nonzero = counts > 0
+    counts[nonzero] = 1 + np.log(counts[nonzero])
+    return counts
+
+
+class _PartitionIndex:
+    """한 파티션의 이전 Q&A 색인 (정규화 해시 + 글자 n-gram TF-IDF 행렬)"""
+
+    def __init__(self, dimensions=DIMENSIONS):
+        self.built_at = time.monotonic()
+        self.dimensions = dimensions
+        self.by_hash = {}  # 정규화 질문 해시 -> entry
+        self.keys = []  # 행 번호 -> 해시
+        self.tf = np.zeros((16, dimensions), dtype=np.float32)  # 앞의 len(keys)행만 사용
+        self.df = np.zeros(dimensions, dtype=np.float32)
+        self._weighted = None  # 정규화된 TF-IDF 행렬 (추가/삭제 후 다음 조회 때 재계산)
+
+    @property
+    def size(self) -> int:
+        return len(self.keys)
+
+    @property
+    def nbytes(self) -> int:
+        weighted = self._weighted.nbytes if self._weighted is not None else 0
+        return self.tf.nbytes + self.df.nbytes + weighted
+
+    def add(self, question: str, answer: str, row_key: str = ""):
+        normalized = normalize_question(question)
+        if not normalized or not answer:
+            return
+        key = question_hash(normalized)
+        if key not in self.by_hash:
+            vector = ngram_counts(normalized, self.dimensions)
+            n = len(self.keys)
+            if n == self.tf.shape[0]:
+                grown = np.zeros((n * 2, self.dimensions), dtype=np.float32)
+                grown[:n] = self.tf
+                self.tf = grown
+            self.tf[n] = vector
+            self.df += vector > 0
+            self.keys.append(key)
+            self._weighted = None
+        self.by_hash[key] = {  # 같은 질문은 최신 답변으로
+            "question": question, "answer": answer, "row_key": row_key,
+            "numbers": _NUMBERS.findall(normalized),
+        }
+
+    def remove(self, row_key: str):
+        self.by_hash = {k: e for k, e in self.by_hash.items() if e["row_key"] != row_key}
+        keep = [i for i, key in enumerate(self.keys) if key in self.by_hash]
+        if len(keep) == len(self.keys):
+            return
+        tf = np.zeros((max(16, len(keep)), self.dimensions), dtype=np.float32)
+        tf[:len(keep)] = self.tf[keep]
+        self.tf = tf
+        self.keys = [self.keys[i] for i in keep]
+        self.df = (self.tf[:len(keep)] > 0).sum(axis=0).astype(np.float32)
+        self._weighted = None
+
+    def _idf(self) -> np.ndarray:
+        return np.log((1 + len(self.keys)) / (1 + self.df)) + 1
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1
+        return matrix / norms
+
+    def lookup(self, question: str, threshold: float):
+        normalized = normalize_question(question)
+        if not normalized:
+            return None
+        entry = self.by_hash.get(question_hash(normalized))
+        if entry is not None:
+            return dict(entry, similarity=1.0, exact=True)
+        if threshold >= 1 or not self.keys:
+            return None
+
+        idf = self._idf()
+        if self._weighted is None:
+            self._weighted = self._normalize_rows(self.tf[:len(self.keys)] * idf)
+        query = self._normalize_rows(ngram_counts(normalized, self.dimensions) * idf)
+        scores = self._weighted @ query
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+        entry = self.by_hash[self.keys[best]]
+        # 장/절 번호가 다르면 다른 질문 ("창세기 24장" vs "25장")
+        if score >= threshold and entry["numbers"] == _NUMBERS.findall(normalized):
+            return dict(entry, similarity=round(score, 3), exact=False)
+        return None
+
+
+class ChatAnswerCache:
+    """파티션별 이전 Q&A 색인으로 채팅 답변을 찾는 캐시"""
+
+    def __init__(self, load_partition, threshold=SIMILARITY, ttl=INDEX_TTL):
+        self.load_partition = load_partition  # async (partition_key) -> [CurriculumQA 엔티티]
+        self.threshold = threshold
+        self.ttl = ttl
+        self._indexes = {}
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._lookup_seconds = deque(maxlen=1000)  # 최근 조회 시간 (색인 로드 제외)
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    async def _index(self, partition_key: str) -> _PartitionIndex:
+        index = self._indexes.get(partition_key)
+        if index is not None and time.monotonic() - index.built_at < self.ttl:
+            return index
+        index = _PartitionIndex()
+        entities = await self.load_partition(partition_key)
+        # 오래된 것부터 넣어 같은 질문은 최신 답변이 남도록
+        for e in sorted(entities, key=lambda x: x.get("CreatedAt", "")):
+            index.add(e.get("Question", ""), e.get("Answer", ""), e.get("RowKey", ""))
+        self._indexes[partition_key] = index
+        return index
+
+    async def lookup(self, partition_key: str, question: str):
+        """이전 답변 {question, answer, row_key, similarity} - 없으면 None"""
+        if not self.enabled:
+            return None
+        try:
+            index = await self._index(partition_key)
+            started = time.perf_counter()
+            match = index.lookup(question, self.threshold)
+            self._lookup_seconds.append(time.perf_counter() - started)
+        except Exception as e:
+            print(f"⚠️ Q&A 캐시 조회 실패: {e}")
+            return None
+        if match is None:
+            self.misses += 1
+        elif match["exact"]:
+            self.hits += 1
+        else:
+            self.near_hits += 1
+        return match
+
+    def add(self, partition_key: str, question: str, answer: str, row_key: str = ""):
+        """새로 저장한 Q&A를 색인에 추가 (색인이 아직 없으면 다음 조회 때 로드)"""
+        index = self._indexes.get(partition_key)
+        if index is not None:
+            index.add(question, answer, row_key)
+
+    def remove(self, partition_key: str, row_key: str):
+        index = self._indexes.get(partition_key)
+        if index is not None:
+            index.remove(row_key)
+
+    def stats(self) -> dict:
+        """적중률, 조회 지연(ms), 벡터 행렬 크기"""
+        total = self.hits + self.near_hits + self.misses
+        latencies = sorted(self._lookup_seconds)
+        if latencies:
+            lookup_ms = {
+                "avg": round(sum(latencies) / len(latencies) * 1000, 3),
+                "p50": round(latencies[len(latencies) // 2] * 1000, 3),
+                "p95": round(latencies[int(len(latencies) * 0.95)] * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3),
+            }
+        else:
+            lookup_ms = {"avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        indexes = list(self._indexes.values())
+        return {
+            "threshold": self.threshold,
+            "partitions": len(indexes),
+            "vectors": sum(index.size for index in indexes),
+            "matrix_bytes": sum(index.nbytes for index in indexes),
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.near_hits) / total, 3) if total else 0.0,
+            "lookup_ms": lookup_ms,
+        }
@@ -0,0 +1,158 @@
+"""
+응답 압축 (brotli / gzip)
+
+프리젠테이션 HTML(40~100KB), 긴 생성 교재 등 API 응답을 Accept-Encoding에 맞춰
+압축합니다. brotli 패키지가 없으면 gzip만 사용합니다.
+
+- COMPRESSION_MIN_BYTES보다 작은 본문은 그대로 보냅니다. (압축 이득보다 비용이 큼)
+- 본문이 한 번에 오는 응답(JSONResponse 등)만 압축하고, SSE 스트림이나
+  FileResponse처럼 여러 조각으로 나뉘는 응답은 건드리지 않습니다.
+- 이미 Content-Encoding이 있는 응답(미리 압축된 정적 파일)은 그대로 통과합니다.
+- 압축하면 강한 ETag를 약한 ETag(W/)로 바꿉니다. 인코딩이 달라도 같은 내용이므로
+  If-None-Match 비교(http_cache.etag_matches)는 그대로 맞습니다.
+"""
+
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli 미설치 - gzip만 사용
+    brotli = None
+
+MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # 동적 응답용 - 11은 너무 느림
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "application/javascript",
+    "text/javascript",
+    "image/svg+xml",
+)
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Accept-Encoding 헤더에서 허용된(q>0) 인코딩 목록"""
+    encodings = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(name)
+    return encodings
+
+
+def choose_encoding(accept_encoding: str):
+    """br > gzip 순으로 사용할 인코딩 (없으면 None)"""
+    encodings = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in encodings:
+        return "br"
+    if "gzip" in encodings:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """Accept-Encoding에 따라 응답 본문을 br/gzip으로 압축하는 ASGI 미들웨어"""
+
+    def __init__(self, app, min_bytes=MIN_BYTES):
+        self.app = app
+        self.min_bytes = min_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                if self._compressible_start(message):
+                    start = message  # 본문 첫 조각을 보고 결정
+                else:
+                    passthrough = True  # SSE 등은 헤더를 바로 보냄
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            if start is not None:
+                pending, start = start, None
+                body = message.get("body", b"")
+                if message.get("more_body", False) or len(body) < self.min_bytes:
+                    passthrough = True
+                    await send(pending)
+                    await send(message)
+                    return
+                body = compress(body, encoding)
+                await send(self._compressed_start(pending, encoding, len(body)))
+                await send({"type": "http.response.body", "body": body})
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _compressible_start(start) -> bool:
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+        content_type = ""
+        for name, value in start.get("headers", []):
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.decode("latin-1").split(";")[0].strip().lower()
+        return content_type in COMPRESSIBLE_TYPES
+
+    @staticmethod
+    def _compressed_start(start, encoding: str, length: int):
+        headers = []
+        vary = None
+        for name, value in start.get("headers", []):
+            if name == b"content-length":
+                continue
+            if name == b"etag" and not value.startswith(b"W/"):
+                value = b"W/" + value
+            if name == b"vary":
+                vary = value
+                continue
+            headers.append((name, value))
+        if vary is None:
+            vary = b"Accept-Encoding"
+        elif b"accept-encoding" not in vary.lower():
+            vary = vary + b", Accept-Encoding"
+        headers.append((b"vary", vary))
+        headers.append((b"content-encoding", encoding.encode("latin-1")))
+        headers.append((b"content-length", str(length).encode("latin-1")))
+        return {"type": "http.response.start", "status": start["status"], "headers": headers}
@@ -0,0 +1,237 @@
+"""
+워커 간 공유 캐시 (같은 호스트의 gunicorn 워커들이 함께 쓰는 L2)
+
+startup.sh는 UvicornWorker 4개를 띄우므로 프로세스 내 캐시(memory_cache)는
+워커마다 따로 데워집니다. 이 모듈은 WAL 모드 SQLite 파일 하나를 모든 워커가
+공유하게 해서, 한 워커가 Table Storage에서 가져온 자료를 다른 워커는
+로컬 디스크에서 바로 읽도록 합니다.
+
+조회 순서: L1(MemoryCache) → L2(SharedCache) → Azure Table Storage
+
+- WAL 모드라 읽기는 쓰기에 막히지 않고, 잠금 대기는 짧게 제한합니다.
+  그래도 디스크 I/O와 잠금 대기가 있으므로 async 핸들러는 TieredCache의
+  aget/aset/ainvalidate로 L2 접근을 스레드풀에서 실행합니다.
+  SQLite 오류는 캐시 실패로만 취급하고 요청은 계속 진행합니다.
+- 만료 시각은 프로세스 간에 비교할 수 있도록 벽시계(time.time) 기준입니다.
+- 큰 값은 zlib으로 압축해 저장합니다.
+- 삭제(invalidate)는 L2와 삭제를 처리한 워커의 L1만 비웁니다. 다른 워커의 L1이 지운 자료를
+  오래 내주지 않도록, L2에 함께 두는 종류는 L1에 SHARED_L1_TTL초만 둡니다.
+  (내용 주소 키처럼 바뀌지 않는 종류는 immutable_namespaces로 빼서 L1 TTL을 그대로 씀)
+"""
+
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+
+_DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "lds_teaching_cache.sqlite3")
+CACHE_PATH = os.getenv("SHARED_CACHE_PATH", _DEFAULT_PATH)  # 빈 값이면 사용 안 함
+MAX_BYTES = int(float(os.getenv("SHARED_CACHE_MAX_MB", "256")) * 1024 * 1024)
+COMPRESS_OVER = 4096
+BUSY_TIMEOUT_MS = 200
+SHARED_L1_TTL = float(os.getenv("SHARED_CACHE_L1_TTL_SECONDS", "5"))  # L2에도 두는 항목의 L1 보관 시간
+
+
+class SharedCache:
+    """WAL 모드 SQLite 기반 호스트 공용 캐시"""
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_BYTES, ttls=None, default_ttl=300):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        self._counters = {}
+        self._errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        # 연결은 스레드별, fork 후에는 새로 엶
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                ns TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                compressed INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (ns, key)
+            ) WITHOUT ROWID
+            """
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, namespace, field):
+        with self._lock:
+            counter = self._counters.setdefault(namespace, {"hits": 0, "misses": 0})
+            counter[field] += 1
+
+    def _error(self, action, e):
+        with self._lock:
+            self._errors += 1
+        print(f"⚠️ 공유 캐시 {action} 실패: {e}")
+
+    @staticmethod
+    def _key(key) -> str:
+        return json.dumps(key, ensure_ascii=False, separators=(",", ":"))
+
+    def get(self, namespace: str, key, default=None):
+        """캐시된 값 (없거나 만료되면 default)"""
+        if not self.enabled:
+            return default
+        try:
+            row = self._connect().execute(
+                "SELECT value, compressed FROM cache WHERE ns = ? AND key = ? AND expires_at > ?",
+                (namespace, self._key(key), time.time()),
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._error("조회", e)
+            return default
+        if row is None:
+            self._count(namespace, "misses")
+            return default
+        value, compressed = row
+        self._count(namespace, "hits")
+        return json.loads(zlib.decompress(value) if compressed else value)
+
+    def set(self, namespace: str, key, value, ttl=None):
+        if not self.enabled:
+            return
+        ttl = ttl if ttl is not None else self.ttls.get(namespace, self.default_ttl)
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        compressed = len(data) > COMPRESS_OVER
+        if compressed:
+            data = zlib.compress(data, 1)
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (ns, key, value, compressed, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (namespace, self._key(key), data, int(compressed), time.time() + ttl),
+            )
+            if random.random() < 0.01:
+                self._prune(conn)
+        except sqlite3.Error as e:
+            self._error("저장", e)
+
+    def invalidate(self, namespace: str, key=None):
+        """항목 하나(key 지정) 또는 네임스페이스 전체 제거 - 모든 워커에 즉시 반영"""
+        if not self.enabled:
+            return
+        try:
+            conn = self._connect()
+            if key is not None:
+                conn.execute("DELETE FROM cache WHERE ns = ? AND key = ?", (namespace, self._key(key)))
+            else:
+                conn.execute("DELETE FROM cache WHERE ns = ?", (namespace,))
+        except sqlite3.Error as e:
+            self._error("삭제", e)
+
+    def _prune(self, conn):
+        """만료 항목 삭제, 그래도 크기 상한을 넘으면 곧 만료될 항목부터 삭제"""
+        conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        size = conn.execute("SELECT COALESCE(SUM(LENGTH(value)), 0), COUNT(*) FROM cache").fetchone()
+        if size[0] > self.max_bytes and size[1]:
+            conn.execute(
+                "DELETE FROM cache WHERE (ns, key) IN (SELECT ns, key FROM cache ORDER BY expires_at LIMIT ?)",
+                (max(1, size[1] // 10),),
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            namespaces = {
+                ns: dict(c, hit_rate=round(c["hits"] / (c["hits"] + c["misses"]), 3) if c["hits"] + c["misses"] else 0.0)
+                for ns, c in self._counters.items()
+            }
+            return {"enabled": self.enabled, "path": self.path, "errors": self._errors, "namespaces": namespaces}
+
+
+class TieredCache:
+    """L1(프로세스 메모리) + L2(호스트 공유) 캐시를 하나처럼 사용
+
+    shared_namespaces에 속한 종류만 L2까지 내려갑니다.
+    (Q&A/게시판처럼 TTL이 짧고 자주 바뀌는 목록은 L1에만 둡니다.)
+    L2가 켜져 있으면 shared_namespaces의 L1 TTL은 l1_ttl로 줄여, 다른 워커에서 삭제한
+    항목은 늦어도 l1_ttl초 뒤 L2(이미 삭제됨)를 다시 보게 됩니다.
+    """
+
+    def __init__(self, memory, shared, shared_namespaces, immutable_namespaces=(), l1_ttl=SHARED_L1_TTL):
+        self.memory = memory
+        self.shared = shared
+        self.shared_namespaces = set(shared_namespaces)
+        self.immutable_namespaces = set(immutable_namespaces)
+        self.l1_ttl = l1_ttl
+
+    def _l1_ttl(self, namespace: str, ttl=None):
+        """L1에 둘 시간 - 삭제될 수 있는 공유 항목은 l1_ttl 이하"""
+        if namespace not in self.shared_namespaces or namespace in self.immutable_namespaces or not self.shared.enabled:
+            return ttl
+        if ttl is None:
+            ttl = self.memory.ttls.get(namespace, self.memory.default_ttl)
+        return min(ttl, self.l1_ttl)
+
+    def get(self, namespace: str, key, default=None):
+        value = self.memory.get(namespace, key)
+        if value is not None:
+            return value
+        if namespace in self.shared_namespaces:
+            value = self.shared.get(namespace, key)
+            if value is not None:
+                self.memory.set(namespace, key, value, self._l1_ttl(namespace))
+                return value
+        return default
+
+    def set(self, namespace: str, key, value, ttl=None):
+        self.memory.set(namespace, key, value, self._l1_ttl(namespace, ttl))
+        if namespace in self.shared_namespaces:
+            self.shared.set(namespace, key, value, ttl)
+
+    def invalidate(self, namespace: str, key=None):
+        self.memory.invalidate(namespace, key)
+        if namespace in self.shared_namespaces:
+            self.shared.invalidate(namespace, key)
+
+    # === async 핸들러용 - L1은 바로, L2(SQLite)는 스레드풀에서 ===
+
+    def _uses_l2(self, namespace: str) -> bool:
+        return namespace in self.shared_namespaces and self.shared.enabled
+
+    async def aget(self, namespace: str, key, default=None):
+        value = self.memory.get(namespace, key)
+        if value is not None:
+            return value
+        if self._uses_l2(namespace):
+            value = await asyncio.to_thread(self.shared.get, namespace, key)
+            if value is not None:
+                self.memory.set(namespace, key, value, self._l1_ttl(namespace))
+                return value
+        return default
+
+    async def aset(self, namespace: str, key, value, ttl=None):
+        self.memory.set(namespace, key, value, self._l1_ttl(namespace, ttl))
+        if self._uses_l2(namespace):
+            await asyncio.to_thread(self.shared.set, namespace, key, value, ttl)
+
+    async def ainvalidate(self, namespace: str, key=None):
+        self.memory.invalidate(namespace, key)
+        if self._uses_l2(namespace):
+            await asyncio.to_thread(self.shared.invalidate, namespace, key)
+
+    def stats(self) -> dict:
+        return {"l1": self.memory.stats(), "l2": self.shared.stats()}
@@ -0,0 +1,128 @@
+"""
+동시 생성 요청 합치기 (single-flight)
+
+같은 키(PartitionKey + LessonTitle)에 대한 생성 요청이 동시에 여러 개 들어오면
+한 요청(리더)만 LLM을 호출하고 나머지는 그 결과를 기다렸다가 함께 받습니다.
+
+- 워커 내부: 같은 이벤트 루프의 요청들이 진행 중인 호출을 공유합니다.
+- 워커 간(gunicorn): 키별 잠금 파일(fcntl.flock)로 리더끼리 직렬화합니다.
+  잠금을 얻은 리더는 반드시 캐시를 다시 확인해야 하며, 다른 워커가
+  먼저 저장한 결과가 있으면 그것을 사용합니다.
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경 - 워커 내부 합치기만 사용
+    fcntl = None
+
+
+class LeaderAbandoned(Exception):
+    """리더가 결과 없이 종료됨 (예: 스트리밍 클라이언트 연결 끊김)"""
+
+
+class _Call:
+    def __init__(self):
+        self.done = asyncio.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """키 단위로 진행 중인 작업을 공유하는 합치기 도우미"""
+
+    def __init__(self, lock_dir=None, wait_timeout=600, lock_timeout=600):
+        self.lock_dir = lock_dir or os.path.join(tempfile.gettempdir(), "lds_teaching_locks")
+        self.wait_timeout = wait_timeout
+        self.lock_timeout = lock_timeout
+        self._calls = {}
+
+    def acquire(self, key):
+        """(call, is_leader) 반환. 리더는 finish/fail 중 하나를 반드시 호출해야 합니다."""
+        call = self._calls.get(key)
+        if call is not None:
+            return call, False
+        call = _Call()
+        self._calls[key] = call
+        return call, True
+
+    def finish(self, key, call, result):
+        self._complete(key, call, result=result)
+
+    def fail(self, key, call, error):
+        self._complete(key, call, error=error)
+
+    def _complete(self, key, call, result=None, error=None):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        call.result = result
+        call.error = error
+        call.done.set()
+
+    async def wait(self, call):
+        """리더의 결과를 기다림"""
+        try:
+            await asyncio.wait_for(call.done.wait(), self.wait_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError("동일한 자료 생성이 너무 오래 걸리고 있습니다.")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def do(self, key, fn):
+        """await fn()을 키당 한 번만 실행하고 (결과, 공유 여부)를 반환
+
+        리더가 결과 없이 사라지면 대기자 중 하나가 다시 리더가 됩니다.
+        """
+        while True:
+            call, is_leader = self.acquire(key)
+            if not is_leader:
+                try:
+                    return await self.wait(call), True
+                except LeaderAbandoned:
+                    continue
+
+            try:
+                async with self.process_lock(key):
+                    result = await fn()
+            except BaseException as e:
+                self.fail(key, call, e if isinstance(e, Exception) else LeaderAbandoned())
+                raise
+            self.finish(key, call, result)
+            return result, False
+
+    @asynccontextmanager
+    async def process_lock(self, key):
+        """같은 호스트의 다른 워커 프로세스와 공유하는 키별 잠금"""
+        if fcntl is None:
+            yield
+            return
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        path = os.path.join(self.lock_dir, f"{digest}.lock")
+        with open(path, "a+") as f:
+            deadline = time.monotonic() + self.lock_timeout
+            locked = False
+            while True:
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    locked = True
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        # 다른 워커가 비정상적으로 오래 잡고 있으면 잠금 없이 진행
+                        print(f"⚠️ 잠금 대기 시간 초과, 잠금 없이 진행: {key}")
+                        break
+                    await asyncio.sleep(0.2)
+            try:
+                yield
+            finally:
+                if locked:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
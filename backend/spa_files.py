@@ -0,0 +1,107 @@
+"""
+Vue SPA 정적 파일 서빙 (frontend/dist)
+
+시작 시 dist 디렉토리를 한 번 훑어 파일 색인을 만들고, 요청마다
+os.path.exists/isfile을 호출하지 않고 색인에서 바로 찾습니다.
+
+- 배포 시 precompress_static.py가 만든 .br/.gz 형제 파일이 있으면
+  Accept-Encoding에 맞춰 미리 압축된 파일을 그대로 보냅니다.
+- 해시가 붙은 /assets/* 파일은 내용이 바뀌면 이름도 바뀌므로 1년 immutable 캐싱,
+  index.html 등 나머지는 매번 재검증(no-cache)합니다.
+- ETag는 원본 파일 기준으로 색인 때 한 번 만들고, If-None-Match가 맞으면 304를 보냅니다.
+  미리 압축된 변형은 같은 ETag를 약한 ETag(W/)로 붙입니다.
+"""
+
+import hashlib
+import mimetypes
+import os
+
+from fastapi.responses import FileResponse, Response
+
+try:
+    from response_compression import accepted_encodings
+    from http_cache import etag_matches
+except ImportError:
+    from backend.response_compression import accepted_encodings
+    from backend.http_cache import etag_matches
+
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+
+# 미리 압축된 형제 파일 (선호 순)
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+def file_etag(path: str) -> str:
+    """Starlette FileResponse와 같은 방식(수정 시각 + 크기)의 ETag"""
+    stat = os.stat(path)
+    return '"' + hashlib.md5(f"{stat.st_mtime}-{stat.st_size}".encode()).hexdigest() + '"'
+
+
+class _StaticFile:
+    __slots__ = ("path", "media_type", "cache_control", "variants", "etag")
+
+    def __init__(self, path, media_type, cache_control, variants, etag):
+        self.path = path
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.variants = variants  # [(encoding, path)]
+        self.etag = etag
+
+
+class SpaFiles:
+    """dist 파일 색인 + 미리 압축된 변형 선택"""
+
+    def __init__(self, static_dir: str, assets_prefix: str = "assets/"):
+        self.static_dir = static_dir
+        self.assets_prefix = assets_prefix
+        self.files = {}
+        self.build_index()
+
+    def build_index(self):
+        """dist 디렉토리를 훑어 상대 경로 → 파일 정보 색인 생성"""
+        files = {}
+        all_paths = set()
+        for root, _, names in os.walk(self.static_dir):
+            for name in names:
+                all_paths.add(os.path.join(root, name))
+
+        for path in all_paths:
+            if path.endswith((".br", ".gz")) and path[:-3] in all_paths:
+                continue  # 원본 파일의 압축 변형
+            rel = os.path.relpath(path, self.static_dir).replace(os.sep, "/")
+            media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            cache_control = CACHE_IMMUTABLE if rel.startswith(self.assets_prefix) else CACHE_REVALIDATE
+            variants = [
+                (encoding, path + suffix)
+                for encoding, suffix in PRECOMPRESSED
+                if path + suffix in all_paths
+            ]
+            files[rel] = _StaticFile(path, media_type, cache_control, variants, file_etag(path))
+
+        self.files = files
+        compressed = sum(1 for f in files.values() if f.variants)
+        print(f"📁 정적 파일 색인: {len(files)}개 (미리 압축 {compressed}개)")
+
+    def lookup(self, full_path: str):
+        """요청 경로의 파일 (없으면 None)"""
+        return self.files.get(full_path)
+
+    def response(self, static_file: _StaticFile, accept_encoding: str, if_none_match: str = "") -> Response:
+        """Accept-Encoding에 맞는 변형으로 FileResponse 생성 (If-None-Match가 맞으면 304)"""
+        headers = {"Cache-Control": static_file.cache_control, "ETag": static_file.etag}
+        path = static_file.path
+        if static_file.variants:
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(accept_encoding)
+            for encoding, variant_path in static_file.variants:
+                if encoding in accepted:
+                    headers["Content-Encoding"] = encoding
+                    headers["ETag"] = "W/" + static_file.etag
+                    path = variant_path
+                    break
+
+        if etag_matches(if_none_match, static_file.etag):
+            headers.pop("Content-Encoding", None)
+            return Response(status_code=304, headers=headers)
+        return FileResponse(path, media_type=static_file.media_type, headers=headers)
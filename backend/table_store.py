@@ -0,0 +1,83 @@
+"""
+비동기 Azure Table Storage 데이터 접근 계층
+
+async 엔드포인트에서 동기 azure.data.tables SDK를 호출하면 저장소 왕복 동안
+이벤트 루프 전체가 멈춥니다. 이 모듈은 azure.data.tables.aio 기반의
+클라이언트를 테이블마다 하나씩 만들어 재사용하고, 모든 클라이언트가
+keep-alive aiohttp 연결 풀 하나를 공유합니다.
+
+클라이언트와 세션은 이벤트 루프에 묶여 있으므로, 다른 루프(새 워커 프로세스,
+테스트 클라이언트 등)에서 처음 호출되면 풀을 새로 만듭니다.
+"""
+
+import asyncio
+import os
+from typing import List, Optional
+
+from azure.core.exceptions import ResourceNotFoundError
+from azure.data.tables import UpdateMode
+from azure.data.tables.aio import TableClient as AsyncTableClient
+
+POOL_LIMIT = int(os.getenv("AZURE_TABLE_POOL_MAXSIZE", "32"))
+
+
+class AsyncTableStore:
+    """테이블별 장수명 비동기 클라이언트와 공용 연결 풀"""
+
+    def __init__(self, connection_string: str):
+        self.connection_string = connection_string
+        self._loop = None
+        self._session = None
+        self._clients = {}
+
+    def _transport(self):
+        import aiohttp
+        from azure.core.pipeline.transport import AioHttpTransport
+
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=POOL_LIMIT, keepalive_timeout=60, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector)
+        # 세션은 저장소가 소유 - 개별 클라이언트가 닫아도 연결 풀은 유지
+        return AioHttpTransport(session=self._session, session_owner=False)
+
+    def client(self, table_name: str) -> AsyncTableClient:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._session = None
+            self._clients = {}
+        client = self._clients.get(table_name)
+        if client is None:
+            client = AsyncTableClient.from_connection_string(
+                self.connection_string, table_name, transport=self._transport()
+            )
+            self._clients[table_name] = client
+        return client
+
+    async def get_entity(self, table_name: str, partition_key: str, row_key: str) -> Optional[dict]:
+        """단건 조회 - 없으면 None"""
+        try:
+            return await self.client(table_name).get_entity(partition_key=partition_key, row_key=row_key)
+        except ResourceNotFoundError:
+            return None
+
+    async def query_entities(self, table_name: str, query_filter: str, parameters: Optional[dict] = None) -> List[dict]:
+        """필터 조회 - @name 형태의 파라미터 바인딩 사용"""
+        entities = self.client(table_name).query_entities(query_filter, parameters=parameters)
+        return [entity async for entity in entities]
+
+    async def upsert_entity(self, table_name: str, entity: dict, mode: UpdateMode = UpdateMode.MERGE):
+        return await self.client(table_name).upsert_entity(entity, mode=mode)
+
+    async def delete_entity(self, table_name: str, partition_key: str, row_key: str):
+        return await self.client(table_name).delete_entity(partition_key=partition_key, row_key=row_key)
+
+    async def close(self):
+        """앱 종료 시 클라이언트와 연결 풀 정리"""
+        for client in self._clients.values():
+            await client.close()
+        if self._session is not None:
+            await self._session.close()
+        self._clients = {}
+        self._session = None
+        self._loop = None
@@ -0,0 +1,287 @@
+"""
+프로세스 공용 주차 달력
+
+/api/weeks, /api/weeks/current, /api/curriculum이 요청마다 CurriculumScraper를
+새로 만들면 WeeklyCurriculumManager 생성(테이블 create_table 2회),
+ensure_year_data(상태 조회), 파티션 전체 조회가 매번 반복됩니다.
+주차 데이터는 1년에 한 번 바뀌므로, 연도별로 한 번만 읽어
+날짜를 date로 미리 파싱·정렬해 두고 "날짜 X가 속한 주"는 bisect로 찾습니다.
+
+백그라운드 작업이 주기적으로 다시 읽어 통째로 교체합니다.
+저장소에서 읽은 목록은 워커 공유 캐시(L2, "weeks")에도 올려, 같은 호스트의 다른 워커는
+저장소 대신 L2에서 읽습니다. 동기화/본문 미리 가져오기 뒤에는 저장소에서 다시 읽어 L2를 덮어씁니다.
+별도 작업이 WEEK_SYNC_HOURS마다 웹사이트 주차 목록과 저장된 주차를 비교해
+바뀐 주차만 저장소에 반영하고(sync_year), 바뀐 것이 있으면 달력을 다시 읽습니다.
+동기화는 같은 호스트의 워커 중 잠금 파일(fcntl.flock)을 얻은 하나만 실행합니다.
+"""
+
+import asyncio
+import bisect
+import os
+import tempfile
+import threading
+from datetime import date, datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경 - 워커마다 동기화
+    fcntl = None
+
+REFRESH_SECONDS = float(os.getenv("WEEK_CALENDAR_REFRESH_SECONDS", "3600"))
+SYNC_HOURS = float(os.getenv("WEEK_SYNC_HOURS", "24"))
+SYNC_START_DELAY = 60  # 시작 직후 요청/초기 로드와 겹치지 않도록 첫 동기화를 늦춤
+SHARED_NAMESPACE = "weeks"
+SYNC_LOCK_PATH = os.path.join(tempfile.gettempdir(), "lds-week-sync.lock")
+
+
+class _YearWeeks:
+    """한 해의 주차 목록 스냅샷 (읽기 전용으로 교체만 함)"""
+
+    def __init__(self, weeks):
+        parsed = []
+        for week in weeks:
+            try:
+                start = datetime.strptime(week['start_date'], '%Y-%m-%d').date()
+                end = datetime.strptime(week['end_date'], '%Y-%m-%d').date()
+            except (KeyError, TypeError, ValueError):
+                continue
+            parsed.append((start, end, week))
+        parsed.sort(key=lambda item: (item[0], item[1]))
+
+        self.starts = [start for start, _, _ in parsed]
+        self.ends = [end for _, end, _ in parsed]
+        self.weeks = [week for _, _, week in parsed]
+        self.available = None  # /api/weeks 응답 형식 (처음 요청 시 생성)
+        self.available_body = None  # 직렬화된 /api/weeks 응답 바이트와 ETag
+        self.available_etag = None
+
+    def find(self, day: date):
+        """day가 속한 주의 (index, week) - 없으면 None"""
+        i = bisect.bisect_right(self.starts, day) - 1
+        if i >= 0 and day <= self.ends[i]:
+            return i, self.weeks[i]
+        return None
+
+
+class WeekCalendar:
+    """연도별 주차 데이터를 메모리에 두고 공유하는 서비스"""
+
+    def __init__(self, refresh_seconds=REFRESH_SECONDS, sync_hours=SYNC_HOURS, shared=None):
+        self.refresh_seconds = refresh_seconds
+        self.sync_hours = sync_hours
+        self.shared = shared  # 워커 공유 캐시 (SharedCache) - 없으면 워커마다 저장소에서 읽음
+        self._years = {}
+        self._lock = threading.Lock()
+        self._manager = None
+        self._scraper = None
+        self._build_lock = threading.RLock()  # 매니저/스크래퍼를 한 번만 생성 (scraper가 manager를 재진입)
+        self._refresh_task = None
+        self._sync_task = None
+        self._sync_lock = None  # 동기화를 맡은 워커가 열어 두는 잠금 파일
+
+    # === 공유 매니저/스크래퍼 (프로세스당 하나) ===
+
+    # 생성 시 create_table 등 저장소 왕복이 있으므로 이벤트 루프에서는 ensure_scraper()로 받습니다.
+
+    @property
+    def manager(self):
+        if self._manager is None:
+            with self._build_lock:
+                if self._manager is None:
+                    from weekly_curriculum_manager import WeeklyCurriculumManager
+                    self._manager = WeeklyCurriculumManager()
+        return self._manager
+
+    @property
+    def scraper(self):
+        if self._scraper is None:
+            with self._build_lock:
+                if self._scraper is None:
+                    from curriculum_scraper import CurriculumScraper
+                    self._scraper = CurriculumScraper(manager=self.manager)
+        return self._scraper
+
+    # === 로드 (동기 - 스레드풀에서 실행) ===
+
+    def load(self, year: int, fresh: bool = False) -> _YearWeeks:
+        """연도 데이터를 읽어 스냅샷 교체
+
+        다른 워커가 L2에 올려 둔 목록이 있으면 그것을 쓰고, 없거나 fresh=True면
+        저장소에서 읽어 L2에 올립니다.
+        """
+        weeks = None
+        if self.shared is not None and not fresh:
+            weeks = self.shared.get(SHARED_NAMESPACE, year)
+        source = "공유 캐시"
+        if weeks is None:
+            manager = self.manager
+            manager.ensure_year_data(year)
+            weeks = manager.get_weekly_data_from_db(year)
+            source = "저장소"
+            if weeks and self.shared is not None:
+                self.shared.set(SHARED_NAMESPACE, year, weeks)
+        snapshot = _YearWeeks(weeks)
+        self._years[year] = snapshot
+        print(f"📅 {year}년 주차 달력 로드 ({source}): {len(snapshot.weeks)}주")
+        return snapshot
+
+    def year(self, year: int) -> _YearWeeks:
+        """연도 스냅샷 (없으면 로드 - 동시 요청은 한 번만 로드)"""
+        snapshot = self._years.get(year)
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            snapshot = self._years.get(year)
+            if snapshot is None:
+                snapshot = self.load(year)
+            return snapshot
+
+    def weeks_for_year(self, year: int) -> list:
+        """DB 형식의 주차 목록 (시작일 순)"""
+        return self.year(year).weeks
+
+    def available_weeks(self, year: int) -> list:
+        """/api/weeks 응답 형식의 주차 목록"""
+        snapshot = self.year(year)
+        if snapshot.available is None:
+            from curriculum_scraper import to_available_week
+            snapshot.available = [to_available_week(week) for week in snapshot.weeks]
+        return snapshot.available
+
+    def available_weeks_body(self, year: int):
+        """직렬화된 /api/weeks 응답 (body, etag) - 스냅샷당 한 번 직렬화"""
+        snapshot = self.year(year)
+        if snapshot.available_body is None:
+            try:
+                from http_cache import dumps, body_etag
+            except ImportError:
+                from backend.http_cache import dumps, body_etag
+            body = dumps(self.available_weeks(year))
+            snapshot.available_etag = body_etag(body)
+            snapshot.available_body = body
+        return snapshot.available_body, snapshot.available_etag
+
+    def find(self, day):
+        """day가 속한 주의 (index, week) - 없으면 None"""
+        if isinstance(day, datetime):
+            day = day.date()
+        return self.year(day.year).find(day)
+
+    def lesson_contents(self):
+        """읽혀 있는 모든 주차의 공과 본문 (lesson_id 역조회용)"""
+        for snapshot in list(self._years.values()):
+            for week in snapshot.weeks:
+                content = week.get('lesson_content')
+                if content:
+                    yield content
+
+    def get_curriculum(self, day) -> dict:
+        """day가 속한 주의 공과 정보 (/api/curriculum 응답)"""
+        found = self.find(day)
+        if found is None:
+            return self.scraper.week_not_found(day)
+        return self.scraper.get_curriculum_for_week(found[1], day.year)
+
+    # === async 진입점 ===
+
+    async def ensure_scraper(self):
+        """공유 스크래퍼 (처음이면 스레드풀에서 매니저와 함께 생성)"""
+        if self._scraper is not None:
+            return self._scraper
+        return await asyncio.to_thread(lambda: self.scraper)
+
+    async def ensure(self, year: int) -> _YearWeeks:
+        snapshot = self._years.get(year)
+        if snapshot is not None:
+            return snapshot
+        return await asyncio.to_thread(self.year, year)
+
+    def start_refresh(self):
+        """현재 연도를 백그라운드에서 미리 읽고, 이후 주기적으로 다시 읽음"""
+        if self._refresh_task is None and self.refresh_seconds > 0:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        first = True
+        while True:
+            years = set(self._years) | {datetime.now().year}
+            for year in sorted(years):
+                if first and year in self._years:
+                    continue  # 시작 시 이미 읽은 연도는 다음 주기부터 갱신
+                try:
+                    await asyncio.to_thread(self.load, year)
+                except Exception as e:
+                    print(f"⚠️ {year}년 주차 달력 갱신 실패: {e}")
+            first = False
+            await asyncio.sleep(self.refresh_seconds)
+
+    async def sync(self, year: int):
+        """웹사이트와 주차 목록 증분 동기화 - 바뀐 주차가 있으면 달력을 다시 읽음
+
+        저장에 실패하면(False) 달력과 L2를 그대로 두고 False를 돌려줍니다. (on_change도 호출 안 됨)
+        """
+        summary = await asyncio.to_thread(self.manager.sync_year, year)
+        if summary is False:
+            print(f"⚠️ {year}년 주차 동기화 저장 실패 - 달력을 다시 읽지 않음")
+            return summary
+        if summary and (summary["added"] or summary["updated"] or summary["removed"]):
+            print(f"🔄 {year}년 주차 동기화: {summary}")
+            await asyncio.to_thread(self.load, year, True)
+        return summary
+
+    def start_sync(self, on_change=None):
+        """WEEK_SYNC_HOURS마다 백그라운드 동기화 (on_change: 바뀐 주차가 있을 때 async (year) 호출)"""
+        if self._sync_task is None and self.sync_hours > 0:
+            self._sync_task = asyncio.create_task(self._sync_loop(on_change))
+
+    def _hold_sync_lock(self) -> bool:
+        """이 워커가 동기화를 맡는지 - 잠금을 얻으면 종료할 때까지 유지
+
+        lesson_prefetch.prefetch_year_once와 같은 flock 방식입니다. 맡은 워커가 끝나면
+        OS가 잠금을 풀고, 다음 주기에 다른 워커가 이어받습니다.
+        """
+        if fcntl is None or self._sync_lock is not None:
+            return True
+        lock_file = open(SYNC_LOCK_PATH, "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._sync_lock = lock_file
+        return True
+
+    def _release_sync_lock(self):
+        if self._sync_lock is not None:
+            fcntl.flock(self._sync_lock, fcntl.LOCK_UN)
+            self._sync_lock.close()
+            self._sync_lock = None
+
+    async def _sync_loop(self, on_change):
+        await asyncio.sleep(SYNC_START_DELAY)
+        while True:
+            year = datetime.now().year
+            if not self._hold_sync_lock():
+                print("⏭️ 다른 워커가 주차 동기화를 맡고 있어 건너뜀")
+                await asyncio.sleep(self.sync_hours * 3600)
+                continue
+            try:
+                summary = await self.sync(year)
+                if on_change is not None and summary and (summary["added"] or summary["updated"]):
+                    await on_change(year)
+            except Exception as e:
+                print(f"⚠️ {year}년 주차 동기화 실패: {e}")
+            await asyncio.sleep(self.sync_hours * 3600)
+
+    async def stop(self):
+        for task in (self._refresh_task, self._sync_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._refresh_task = None
+        self._sync_task = None
+        self._release_sync_lock()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+HTML 추출 마이크로 벤치마크
+
+저장된 공과 페이지(cfm-2026-lesson10-genesis24-33.html)로 두 가지 추출을 비교합니다.
+
+- lesson: get_lesson_content의 본문 추출 (첫 h1/h2 + 앞 60개 p/li)
+- index:  extract_weekly_data_from_website의 공과 링크 추출.
+  연간 목록 페이지는 저장본이 없어, 같은 페이지에 52주 공과 링크 목록을 붙인 합성 페이지를 씁니다.
+
+방식:
+- before:   BeautifulSoup(html, 'html.parser') 전체 트리 + find_all
+- strainer: BeautifulSoup(html.parser) + SoupStrainer (lxml 미설치 시 경로)
+- after:    html_extract (lxml + XPath)
+
+페이지당 CPU 시간(time.process_time), 추출 중 파이썬 힙 최대 사용량(tracemalloc),
+파싱한 트리 하나가 차지하는 메모리를 측정합니다. tracemalloc은 libxml2가 C에서
+할당하는 메모리를 세지 않으므로, 트리 크기는 하위 프로세스에서 트리 TREES개를
+살려 둔 채 늘어난 RSS(/proc/self/statm)를 개수로 나눠 구합니다. (Linux 기준)
+세 방식의 추출 결과가 같은지도 확인합니다.
+
+사용법: python benchmarks/bench_html_extraction.py [반복 횟수]
+"""
+
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+import html_extract
+
+FIXTURE = os.path.join(ROOT, "cfm-2026-lesson10-genesis24-33.html")
+YEAR = 2026
+TREES = 20
+
+
+def load_pages():
+    with open(FIXTURE, "rb") as f:
+        lesson = f.read()
+    links = "".join(
+        f'<li><a href="/study/manual/come-follow-me-for-home-and-church-old-testament-{YEAR}/{i + 1:02d}?lang=kor">'
+        f'<p class="title">{1 + i // 4}월 {1 + (i % 4) * 7}일~{7 + (i % 4) * 7}일: 창세기 {i + 1}장</p></a></li>'
+        for i in range(52)
+    )
+    index = lesson.replace(b"</body>", f"<nav><ul>{links}</ul></nav></body>".encode("utf-8"))
+    return {"lesson": lesson, "index": index}
+
+
+# === before: 기존 구현 그대로 ===
+
+def lesson_before(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    content_sections = []
+    for tag in ['h1', 'h2']:
+        el = soup.find(tag)
+        if el: content_sections.append(el.get_text(strip=True))
+    paragraphs = soup.find_all(['p', 'li'])
+    for p in paragraphs[:60]:
+        text = p.get_text(strip=True)
+        if len(text) > 20: content_sections.append(text)
+    return content_sections
+
+
+def index_before(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    links = []
+    for link in soup.find_all('a', href=True):
+        href = link.get('href', '')
+        if 'come-follow-me' in href and str(YEAR) in href:
+            links.append((href, link.get_text(strip=True)))
+    return links
+
+
+def with_strainer(function):
+    """lxml 없이 실행 (SoupStrainer 경로)"""
+    def run(html):
+        saved = html_extract.lxml_html
+        html_extract.lxml_html = None
+        try:
+            return function(html)
+        finally:
+            html_extract.lxml_html = saved
+    return run
+
+
+VARIANTS = {
+    "lesson": [
+        ("before", lesson_before),
+        ("strainer", with_strainer(html_extract.lesson_sections)),
+        ("after", html_extract.lesson_sections),
+    ],
+    "index": [
+        ("before", index_before),
+        ("strainer", with_strainer(lambda html: html_extract.lesson_links(html, YEAR))),
+        ("after", lambda html: html_extract.lesson_links(html, YEAR)),
+    ],
+}
+
+
+def cpu_ms(function, html, iterations):
+    for _ in range(5):  # 워밍업
+        function(html)
+    started = time.process_time()
+    for _ in range(iterations):
+        function(html)
+    return (time.process_time() - started) / iterations * 1000
+
+
+def heap_kib(function, html):
+    tracemalloc.start()
+    function(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+# 각 방식이 만드는 파싱 트리
+STRAINERS = {
+    "lesson": SoupStrainer(["h1", "h2", "p", "li"]),
+    "index": SoupStrainer("a", href=True),
+}
+PARSERS = {
+    "before": lambda html, kind: BeautifulSoup(html, 'html.parser'),
+    "strainer": lambda html, kind: BeautifulSoup(html, 'html.parser', parse_only=STRAINERS[kind]),
+    "after": lambda html, kind: html_extract._parse(html),
+}
+
+
+def tree_kib(kind, name):
+    """하위 프로세스에서 잰 파싱 트리 하나의 메모리 (KiB)"""
+    result = subprocess.run(
+        [sys.executable, __file__, "--tree", kind, name],
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip())
+
+
+def rss_kib() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+
+
+def measure_tree(kind, name):
+    html = load_pages()[kind]
+    parse = PARSERS[name]
+    parse(html, kind)  # 워밍업 (모듈/파서 초기화)
+    baseline = rss_kib()
+    trees = [parse(html, kind) for _ in range(TREES)]
+    print((rss_kib() - baseline) / len(trees))
+
+
+def main(iterations):
+    pages = load_pages()
+    print(f"lxml: {'사용' if html_extract.lxml_html is not None else '미설치'}, 반복 {iterations}회")
+    for kind, variants in VARIANTS.items():
+        html = pages[kind]
+        expected = variants[0][1](html)
+        print(f"\n[{kind}] {len(html):,} bytes, 추출 {len(expected)}건")
+        print(f"{'variant':<10} {'ms/page':>9} {'heap KiB':>10} {'tree KiB':>9} {'speedup':>8} {'same':>5}")
+        base_ms = None
+        for name, function in variants:
+            ms = cpu_ms(function, html, iterations)
+            base_ms = base_ms or ms
+            same = function(html) == expected
+            print(f"{name:<10} {ms:>9.2f} {heap_kib(function, html):>10,.0f} "
+                  f"{tree_kib(kind, name):>9,.0f} {base_ms / ms:>7.1f}x {str(same):>5}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--tree"]:
+        measure_tree(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
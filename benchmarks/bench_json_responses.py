@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+JSON 응답 경로 마이크로 벤치마크
+
+/api/weeks, /api/qa, /api/board 모양의 데이터를 두 방식으로 응답하며
+요청당 CPU 시간(time.process_time)을 비교합니다.
+
+- before: dict 목록 반환 → response_model(Pydantic) 검증 → jsonable_encoder → json.dumps
+- after:  캐시에 둔 직렬화 바이트(http_cache.conditional_body)를 그대로 전송
+- after (orjson): 캐시 없이 FastJSONResponse(orjson)로 직렬화만 교체
+
+HTTP 클라이언트 없이 ASGI 앱을 직접 호출하므로 라우팅 + 검증 + 인코딩 비용만 측정됩니다.
+
+사용법: python benchmarks/bench_json_responses.py [반복 횟수]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from fastapi import FastAPI, Request
+from pydantic import BaseModel
+
+from http_cache import FastJSONResponse, conditional_body, dumps, body_etag, orjson
+
+
+class WeekInfo(BaseModel):
+    week_range: str
+    title_keywords: str
+    start_date: str
+    end_date: str
+    section: str
+    display_text: str
+
+
+class QAItem(BaseModel):
+    question: str
+    answer: str
+    created_at: str
+    row_key: str
+
+
+def make_weeks():
+    return [
+        {
+            "week_range": f"{m}월{d}일~{d + 6}일",
+            "title_keywords": "창세기 24~33장",
+            "start_date": f"2026-{m:02d}-{d:02d}",
+            "end_date": f"2026-{m:02d}-{d + 6:02d}",
+            "section": f"{m}월",
+            "display_text": f"{m}월{d}일~{d + 6}일 (창세기 24~33장)",
+        }
+        for m in range(1, 13) for d in (1, 8, 15, 22)
+    ]
+
+
+def make_qa():
+    return [
+        {
+            "question": f"이 공과에서 아브라함의 신앙에 대해 어떻게 가르칠 수 있을까요? {i}",
+            "answer": "아브라함은 " + "하나님을 신뢰하고 순종했습니다. " * 40,
+            "created_at": f"2026-03-{i % 28 + 1:02d}T10:00:00",
+            "row_key": f"{i:08d}-0000-0000-0000-000000000000",
+        }
+        for i in range(30)
+    ]
+
+
+def make_board():
+    return [
+        {
+            "row_key": f"{i:08d}",
+            "author": "홍길동",
+            "title": f"공과 준비 나눔 {i}",
+            "category": "나눔",
+            "content": "이번 주 공과를 준비하며 느낀 점을 나눕니다. " * 20,
+            "created_at": f"2026-03-{i % 28 + 1:02d}T10:00:00",
+            "updated_at": "",
+        }
+        for i in range(100)
+    ]
+
+
+DATA = {"weeks": make_weeks(), "qa": make_qa(), "board": make_board()}
+MODELS = {"weeks": List[WeekInfo], "qa": List[QAItem], "board": None}
+BODIES = {name: dumps(value) for name, value in DATA.items()}
+ETAGS = {name: body_etag(body) for name, body in BODIES.items()}
+
+
+def build_before():
+    app = FastAPI()
+    for name in DATA:
+        async def endpoint(name=name):
+            return DATA[name]
+        app.get(f"/{name}", response_model=MODELS[name])(endpoint)
+    return app
+
+
+def build_orjson():
+    app = FastAPI(default_response_class=FastJSONResponse)
+    for name in DATA:
+        async def endpoint(name=name):
+            return DATA[name]
+        app.get(f"/{name}", response_model=MODELS[name])(endpoint)
+    return app
+
+
+def build_after():
+    app = FastAPI(default_response_class=FastJSONResponse)
+    for name in DATA:
+        async def endpoint(request: Request, name=name):
+            return conditional_body(request, BODIES[name], ETAGS[name], "no-cache")
+        app.get(f"/{name}", response_model=MODELS[name])(endpoint)
+    return app
+
+
+async def call(app, path):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent
+
+
+async def measure(app, path, iterations):
+    for _ in range(50):  # 워밍업
+        await call(app, path)
+    started = time.process_time()
+    for _ in range(iterations):
+        await call(app, path)
+    return (time.process_time() - started) / iterations * 1e6
+
+
+async def main(iterations):
+    apps = [("before", build_before()), ("orjson", build_orjson()), ("after", build_after())]
+    print(f"orjson: {'사용' if orjson is not None else '미설치 (표준 json)'}, 반복 {iterations}회")
+    print(f"{'endpoint':<8} {'bytes':>8} " + " ".join(f"{name + ' µs':>12}" for name, _ in apps) + f" {'speedup':>8}")
+    for name in DATA:
+        results = [await measure(app, f"/{name}", iterations) for _, app in apps]
+        print(f"{name:<8} {len(BODIES[name]):>8,} " + " ".join(f"{r:>12.1f}" for r in results)
+              + f" {results[0] / results[-1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
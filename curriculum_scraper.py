@@ -5,16 +5,51 @@ import re
 import json
 import os
 from weekly_curriculum_manager import WeeklyCurriculumManager
+from http_page_cache import page_cache as default_page_cache
+from html_extract import lesson_sections
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+LESSON_FETCH_TIMEOUT = 15
+LESSON_RESULT = "lesson_content:v1"  # 페이지 캐시에 저장하는 추출 결과 이름 (추출 방식이 바뀌면 올림)
+
+
+def extract_lesson_content(html):
+    """공과 페이지 HTML에서 제목/부제목과 본문 문단을 추출 (없으면 빈 문자열)"""
+    return "\n\n".join(lesson_sections(html))
+
+
+def lesson_content_from_page(cache, page):
+    """페이지 본문이 바뀌지 않았으면 저장된 추출 결과, 아니면 추출 후 저장"""
+    content = page.cached_result(LESSON_RESULT)
+    if content is None:
+        content = extract_lesson_content(page.body)
+        cache.save_result(page, LESSON_RESULT, content)
+    return content
+
+
+def to_available_week(week_info):
+    """DB 주차 데이터를 /api/weeks 응답 형식으로 변환"""
+    title_clean = week_info.get('title_keywords', '')
+    formatted_week_range = week_info['week_range'].replace('일-', '일~')
+    return {
+        'week_range': week_info['week_range'],
+        'title_keywords': week_info.get('title_keywords', ''),
+        'start_date': week_info['start_date'],
+        'end_date': week_info['end_date'],
+        'section': week_info['section'],
+        'display_text': f"{formatted_week_range} ({title_clean})" if title_clean else formatted_week_range
+    }
+
 
 class CurriculumScraper:
-    def __init__(self):
+    def __init__(self, manager=None, page_cache=None):
         self.base_url = "https://www.churchofjesuschrist.org"
         self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        # 매니저 초기화 (Azure 연결 문자열 포함)
-        self.manager = WeeklyCurriculumManager()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        # 조건부 GET 디스크 캐시 (304면 HTML 파싱 생략)
+        self.page_cache = page_cache or default_page_cache
+        # 매니저 초기화 (Azure 연결 문자열 포함) - 공유 매니저를 넘기면 재사용
+        self.manager = manager or WeeklyCurriculumManager()
 
     def get_current_week_curriculum(self):
         """현재 주의 공과 정보를 가져옵니다."""
@@ -39,48 +74,62 @@ class CurriculumScraper:
                     break
             
             if target_week:
-                # 1. 이미 캐시된 내용이 있는지 확인
-                cached_content = target_week.get('lesson_content')
-                
-                # lesson_url 확인
-                lesson_url = target_week.get('lesson_url')
-                if not lesson_url:
-                    lesson_url = self.generate_direct_url(target_week, year)
-                
-                lesson_title = f"{target_week['week_range']}: {target_week['title_keywords']}"
+                return self.get_curriculum_for_week(target_week, year)
+            return self.week_not_found(target_date)
                 
-                if cached_content and len(cached_content) > 100:
-                    print(f"📦 저장된 공과 내용을 사용합니다: {target_week['week_range']}")
-                    lesson_content = cached_content
-                else:
-                    # 2. 캐시가 없으면 스크래핑 시도
-                    print(f"🌐 실시간 스크래핑 시도: {lesson_url}")
-                    lesson_content = self.get_lesson_content(lesson_url)
-                    
-                    # 3. 스크래핑 성공 시 캐시 업데이트
-                    if lesson_content and "가져올 수 없습니다" not in lesson_content:
-                        self.manager.update_lesson_content(year, target_week['week_range'], lesson_content)
+        except Exception as e:
+            print(f"공과 정보 가져오기 중 오류: {e}")
+            return self.curriculum_error()
+
+    def get_curriculum_for_week(self, target_week, year):
+        """주차 정보(DB 데이터)로 공과 제목/내용을 구성합니다."""
+        try:
+            # 1. 이미 캐시된 내용이 있는지 확인
+            cached_content = target_week.get('lesson_content')
+            
+            # lesson_url 확인
+            lesson_url = target_week.get('lesson_url')
+            if not lesson_url:
+                lesson_url = self.generate_direct_url(target_week, year)
+            
+            lesson_title = f"{target_week['week_range']}: {target_week['title_keywords']}"
+            
+            if cached_content and len(cached_content) > 100:
+                print(f"📦 저장된 공과 내용을 사용합니다: {target_week['week_range']}")
+                lesson_content = cached_content
+            else:
+                # 2. 캐시가 없으면 스크래핑 시도
+                print(f"🌐 실시간 스크래핑 시도: {lesson_url}")
+                lesson_content = self.get_lesson_content(lesson_url)
                 
-                return {
-                    "title": lesson_title,
-                    "content": lesson_content,
-                    "url": lesson_url,
-                    "week_info": target_week
-                }
+                # 3. 스크래핑 성공 시 캐시 업데이트 (메모리의 주차 정보에도 반영)
+                if lesson_content and "가져올 수 없습니다" not in lesson_content:
+                    self.manager.update_lesson_content(year, target_week['week_range'], lesson_content)
+                    target_week['lesson_content'] = lesson_content
             
             return {
-                "title": f"{year}년 {target_date.strftime('%m월 %d일')} 주차 공과",
-                "content": "해당 날짜의 공과 정보를 찾을 수 없습니다.",
-                "url": f"{self.base_url}/study/manual/come-follow-me-for-home-and-church?lang=kor"
+                "title": lesson_title,
+                "content": lesson_content,
+                "url": lesson_url,
+                "week_info": target_week
             }
-                
         except Exception as e:
             print(f"공과 정보 가져오기 중 오류: {e}")
-            return {
-                "title": "공과 정보 오류",
-                "content": "공과 정보를 가져오는 중 시스템 오류가 발생했습니다.",
-                "url": ""
-            }
+            return self.curriculum_error()
+
+    def week_not_found(self, target_date):
+        return {
+            "title": f"{target_date.year}년 {target_date.strftime('%m월 %d일')} 주차 공과",
+            "content": "해당 날짜의 공과 정보를 찾을 수 없습니다.",
+            "url": f"{self.base_url}/study/manual/come-follow-me-for-home-and-church?lang=kor"
+        }
+
+    def curriculum_error(self):
+        return {
+            "title": "공과 정보 오류",
+            "content": "공과 정보를 가져오는 중 시스템 오류가 발생했습니다.",
+            "url": ""
+        }
     
     def get_available_weeks(self):
         """사용 가능한 주차 목록을 반환합니다."""
@@ -89,29 +138,20 @@ class CurriculumScraper:
         available_weeks = []
         
         for week_info in week_mapping:
-            title_clean = week_info.get('title_keywords', '')
-            formatted_week_range = week_info['week_range'].replace('일-', '일~')
-
-            available_weeks.append({
-                'week_range': week_info['week_range'],
-                'title_keywords': week_info.get('title_keywords', ''),
-                'start_date': week_info['start_date'],
-                'end_date': week_info['end_date'],
-                'section': week_info['section'],
-                'display_text': f"{formatted_week_range} ({title_clean})" if title_clean else formatted_week_range
-            })
+            available_weeks.append(to_available_week(week_info))
         
         available_weeks.sort(key=lambda x: x['end_date'])
         return available_weeks
 
-    def generate_direct_url(self, week_info, year):
-        """주차 정보를 바탕으로 직접 URL 생성"""
+    def generate_direct_url(self, week_info, year, all_weeks=None):
+        """주차 정보를 바탕으로 직접 URL 생성 (all_weeks: 이미 읽은 연도 주차 목록)"""
         known_mappings = {2025: 'doctrine-and-covenants', 2026: 'old-testament'}
         scripture_type = known_mappings.get(year, 'doctrine-and-covenants')
         base_url = f"https://www.churchofjesuschrist.org/study/manual/come-follow-me-for-home-and-church-{scripture_type}-{year}"
         
         try:
-            all_weeks = self.manager.get_weekly_data_from_db(year)
+            if all_weeks is None:
+                all_weeks = self.manager.get_weekly_data_from_db(year)
             week_index = None
             for i, week in enumerate(all_weeks):
                 if week.get('week_range') == week_info.get('week_range'):
@@ -127,26 +167,13 @@ class CurriculumScraper:
     def get_lesson_content(self, lesson_url):
         """특정 주의 상세 내용을 가져옵니다."""
         try:
-            response = self.session.get(lesson_url, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            content_sections = []
-            # 제목/부제목
-            for tag in ['h1', 'h2']:
-                el = soup.find(tag)
-                if el: content_sections.append(el.get_text(strip=True))
-            
-            # 본문
-            paragraphs = soup.find_all(['p', 'li'])
-            for p in paragraphs[:60]:
-                text = p.get_text(strip=True)
-                if len(text) > 20: content_sections.append(text)
+            page = self.page_cache.fetch(self.session, lesson_url, timeout=LESSON_FETCH_TIMEOUT)
+            content = lesson_content_from_page(self.page_cache, page)
             
-            if not content_sections:
+            if not content:
                 return "이번 주 공과의 상세 내용을 가져올 수 없습니다. (웹사이트 구조 변경 또는 접근 제한)"
             
-            return "\n\n".join(content_sections)
+            return content
         except Exception as e:
             print(f"상세 내용 가져오기 실패: {e}")
             return "이번 주 공과의 상세 내용을 가져올 수 없습니다. (웹사이트 접속 불가)"
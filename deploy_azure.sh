@@ -12,6 +12,9 @@ npm install
 npm run build
 cd ..
 
+# .br/.gz 형제 파일 생성 (서버가 요청마다 압축하지 않도록)
+python precompress_static.py frontend/dist
+
 # 2. 빌드 결과 확인
 if [ ! -d "frontend/dist" ]; then
     echo "❌ 프론트엔드 빌드 실패"
@@ -47,6 +47,53 @@ export async function generateMaterial(data) {
   return response.data
 }
 
+/**
+ * 공과 자료 스트리밍 생성 (Server-Sent Events)
+ * axios는 브라우저에서 응답 스트림을 읽을 수 없으므로 fetch를 사용합니다.
+ * onDelta(text)는 새 조각이 도착할 때마다 호출되고, 완료 시 { is_cached }를 반환합니다.
+ */
+export async function streamMaterial(data, onDelta, { signal } = {}) {
+  const response = await fetch(`${API_BASE_URL}/generate-material/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify(data),
+    signal
+  })
+  if (!response.ok || !response.body) {
+    const error = new Error(`스트리밍 요청 실패 (${response.status})`)
+    error.status = response.status
+    throw error
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder('utf-8')
+  let buffer = ''
+
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const rawEvent = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      const dataLine = rawEvent.split('\n').find(line => line.startsWith('data: '))
+      if (!dataLine) continue
+
+      const event = JSON.parse(dataLine.slice(6))
+      if (event.type === 'delta') {
+        onDelta(event.content)
+      } else if (event.type === 'done') {
+        return { is_cached: event.is_cached }
+      } else if (event.type === 'error') {
+        throw new Error(event.detail)
+      }
+    }
+  }
+  throw new Error('스트림이 완료 전에 종료되었습니다.')
+}
+
 /**
  * 채팅 응답 생성
  */
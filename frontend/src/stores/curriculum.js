@@ -41,6 +41,23 @@ export const useCurriculumStore = defineStore('curriculum', () => {
   const weekRange = computed(() => selectedWeek.value?.week_range || '')
   const isAdminPath = computed(() => window.location.pathname === '/admin')
 
+  // 공과 본문 참조 - 서버가 준 lesson_id가 있으면 본문 대신 id만 전송
+  function lessonRef() {
+    if (lessonData.value.lesson_id) return { lesson_id: lessonData.value.lesson_id }
+    return { lesson_content: lessonData.value.content }
+  }
+
+  // 서버가 lesson_id를 찾지 못하면(404) 본문을 담아 한 번 더 요청
+  async function withLesson(request, data) {
+    try {
+      return await request({ ...data, ...lessonRef() })
+    } catch (err) {
+      const status = err.response?.status ?? err.status
+      if (status !== 404 || !lessonData.value.lesson_id) throw err
+      return await request({ ...data, lesson_content: lessonData.value.content })
+    }
+  }
+
   // Actions
   async function loadInitialData() {
     isLoading.value = true
@@ -94,8 +111,7 @@ export const useCurriculumStore = defineStore('curriculum', () => {
         const requestData = {
           week_range: weekRange.value,
           target_audience: targetAudience.value,
-          lesson_title: lessonData.value.title,
-          lesson_content: lessonData.value.content
+          lesson_title: lessonData.value.title
         }
         generatePresentationInBackground(requestData)
       }
@@ -180,14 +196,15 @@ export const useCurriculumStore = defineStore('curriculum', () => {
     try {
       const requestData = {
         lesson_title: lessonData.value.title,
-        lesson_content: lessonData.value.content,
         target_audience: targetAudience.value,
         week_range: weekRange.value
       }
 
-      // 공과 자료 생성 (이것만 await - 타임아웃 없이 완료까지 대기)
-      const result = await api.generateMaterial(requestData)
-      generatedMaterial.value = result.material
+      // 공과 자료 스트리밍 생성 - 첫 토큰부터 바로 화면에 표시
+      generatedMaterial.value = ''
+      const result = await withLesson((data) => api.streamMaterial(data, (delta) => {
+        generatedMaterial.value += delta
+      }), requestData)
       isCachedMaterial.value = result.is_cached
 
       // 프리젠테이션은 완전히 독립 백그라운드로 - UI를 막지 않음
@@ -208,7 +225,7 @@ export const useCurriculumStore = defineStore('curriculum', () => {
 
     try {
       console.log('🎨 발표자료 백그라운드 생성 시작...')
-      const result = await api.generatePresentation(requestData)
+      const result = await withLesson(api.generatePresentation, requestData)
       if (result && result.html) {
         presentationHtml.value = result.html
         console.log('✅ 발표자료 생성 완료')
@@ -234,19 +251,18 @@ export const useCurriculumStore = defineStore('curriculum', () => {
     })
 
     try {
-      const result = await api.sendChatMessage({
+      const result = await withLesson(api.sendChatMessage, {
         lesson_title: lessonData.value.title,
-        lesson_content: lessonData.value.content,
-        reference_material: generatedMaterial.value,
         user_question: question,
         week_range: weekRange.value,
         target_audience: targetAudience.value
       })
 
-      // AI 응답 추가
+      // AI 응답 추가 (is_cached: 같은 질문의 이전 답변)
       chatHistory.value.push({
         role: 'assistant',
-        content: result.answer
+        content: result.answer,
+        isCached: !!result.is_cached
       })
 
       // Q&A 목록 새로고침
@@ -0,0 +1,86 @@
+"""
+교회 웹사이트 HTML에서 필요한 부분만 추출
+
+공과 페이지/연간 목록 페이지 전체를 BeautifulSoup(html.parser) 트리로 만든 뒤
+find_all로 훑으면 페이지마다 수만 개의 파이썬 객체가 생깁니다.
+lxml(C 파서)로 파싱하고 XPath로 필요한 요소(제목, 본문 문단, 공과 링크)만 꺼내
+파이썬 객체는 그 요소들의 텍스트에 대해서만 만듭니다.
+
+lxml이 없으면 BeautifulSoup + SoupStrainer로 필요한 태그만 트리에 올립니다.
+결과는 두 경우 모두 기존 추출 방식(get_text(strip=True))과 같습니다.
+"""
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    etree = None
+    lxml_html = None
+
+MAX_BLOCKS = 60  # 본문 문단/목록 항목을 앞에서부터 이만큼만 봄
+MIN_BLOCK_LENGTH = 20  # 이보다 짧은 문단(메뉴, 버튼 등)은 버림
+
+if lxml_html is not None:
+    # 교회 웹사이트는 UTF-8 - 바이트를 그대로 넘겨 디코딩 단계도 C에서 처리
+    _PARSER = lxml_html.HTMLParser(encoding="utf-8")
+    _TEXT = etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+    _FIRST_H1 = etree.XPath("(//h1)[1]")
+    _FIRST_H2 = etree.XPath("(//h2)[1]")
+    _BLOCKS = etree.XPath("//p | //li")
+    _LESSON_LINKS = etree.XPath("//a[@href and contains(@href, 'come-follow-me') and contains(@href, $year)]")
+
+
+def _parse(html):
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+    try:
+        return lxml_html.document_fromstring(html, parser=_PARSER)
+    except etree.ParserError:  # 빈 문서
+        return None
+
+
+def _text(element) -> str:
+    """BeautifulSoup get_text(strip=True)와 같은 결과"""
+    return "".join(piece.strip() for piece in _TEXT(element))
+
+
+def lesson_sections(html) -> list:
+    """공과 페이지의 첫 h1/h2 제목과 본문 문단(p, li) 텍스트"""
+    sections = []
+    if lxml_html is not None:
+        root = _parse(html)
+        if root is None:
+            return sections
+        for heading in (_FIRST_H1, _FIRST_H2):
+            found = heading(root)
+            if found:
+                sections.append(_text(found[0]))
+        blocks = _BLOCKS(root)[:MAX_BLOCKS]
+        texts = (_text(block) for block in blocks)
+    else:
+        soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer(["h1", "h2", "p", "li"]))
+        for tag in ("h1", "h2"):
+            el = soup.find(tag)
+            if el:
+                sections.append(el.get_text(strip=True))
+        texts = (block.get_text(strip=True) for block in soup.find_all(["p", "li"])[:MAX_BLOCKS])
+    sections.extend(text for text in texts if len(text) > MIN_BLOCK_LENGTH)
+    return sections
+
+
+def lesson_links(html, year) -> list:
+    """연간 목록 페이지에서 해당 연도 공과로 가는 링크들의 (href, 텍스트)"""
+    if lxml_html is not None:
+        root = _parse(html)
+        if root is None:
+            return []
+        return [(link.get("href", ""), _text(link)) for link in _LESSON_LINKS(root, year=str(year))]
+
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("a", href=True))
+    return [
+        (link.get("href", ""), link.get_text(strip=True))
+        for link in soup.find_all("a", href=True)
+        if "come-follow-me" in link["href"] and str(year) in link["href"]
+    ]
@@ -0,0 +1,161 @@
+"""
+교회 웹사이트 페이지용 디스크 HTTP 캐시 (조건부 GET)
+
+연간 주차 목록(extract_weekly_data_from_website)과 공과 본문(get_lesson_content)은
+같은 페이지를 다시 받아도 거의 바뀌지 않습니다. 받은 HTML을 ETag/Last-Modified와
+함께 파일로 두고, 다음 요청은 If-None-Match/If-Modified-Since로 재검증합니다.
+
+- 304(또는 내용이 같은 200)면 본문이 바뀌지 않은 것이므로, 함께 저장해 둔
+  파싱 결과(derived)를 그대로 쓰고 HTML 파싱을 건너뜁니다.
+- 네트워크 오류 시 저장된 사본이 있으면 그것을 씁니다.
+- PAGE_CACHE_OFFLINE=1이면 네트워크 없이 캐시된 페이지만 씁니다. (테스트/오프라인 개발용)
+- PAGE_CACHE_DIR를 빈 값으로 두면 캐시를 쓰지 않습니다.
+
+파일 하나에 메타데이터(JSON 한 줄)와 본문 바이트를 함께 두고, 임시 파일 → os.replace로
+교체하므로 여러 워커가 동시에 써도 반쯤 쓰인 파일을 읽지 않습니다.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+
+import requests
+
+CACHE_DIR = os.getenv("PAGE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "lds_page_cache"))
+OFFLINE = os.getenv("PAGE_CACHE_OFFLINE", "0") == "1"
+
+
+class PageNotCached(Exception):
+    """오프라인 모드에서 캐시에 없는 페이지를 요청함"""
+
+
+class CachedPage:
+    """가져온(또는 캐시된) 페이지 한 건"""
+
+    def __init__(self, url, body, meta, changed):
+        self.url = url
+        self.body = body
+        self.meta = meta
+        self.changed = changed  # False면 이전에 저장한 본문과 같음 (304 포함)
+
+    @property
+    def derived(self) -> dict:
+        """본문에서 만든 파싱 결과 (본문이 바뀌면 비워짐)"""
+        return self.meta.setdefault("derived", {})
+
+    def cached_result(self, name):
+        """본문이 바뀌지 않았으면 저장된 파싱 결과 - 없으면 None"""
+        if self.changed:
+            return None
+        return self.derived.get(name)
+
+
+class PageCache:
+    """URL별 본문 + 검증자(ETag/Last-Modified) + 파싱 결과를 디스크에 보관"""
+
+    def __init__(self, directory=CACHE_DIR, offline=OFFLINE):
+        self.directory = directory
+        self.offline = offline and bool(directory)
+        if directory:
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError as e:
+                print(f"⚠️ 페이지 캐시 디렉터리 생성 실패, 캐시 없이 진행: {e}")
+                self.directory = ""
+                self.offline = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".page")
+
+    def load(self, url: str):
+        """저장된 페이지 (없으면 None)"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(url), "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return CachedPage(url, body, meta, changed=False)
+
+    def _write(self, page: CachedPage):
+        if not self.enabled:
+            return
+        path = self._path(page.url)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(page.meta, ensure_ascii=False).encode("utf-8") + b"\n")
+                f.write(page.body)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ 페이지 캐시 저장 실패: {e}")
+
+    @staticmethod
+    def request_headers(cached) -> dict:
+        """재검증용 조건부 요청 헤더"""
+        headers = {}
+        if cached is not None:
+            if cached.meta.get("etag"):
+                headers["If-None-Match"] = cached.meta["etag"]
+            if cached.meta.get("last_modified"):
+                headers["If-Modified-Since"] = cached.meta["last_modified"]
+        return headers
+
+    @staticmethod
+    def revalidated(cached: CachedPage) -> CachedPage:
+        """304 응답 - 저장된 본문과 파싱 결과를 그대로 씀"""
+        return cached
+
+    def store(self, url: str, body: bytes, headers, cached=None) -> CachedPage:
+        """200 응답 저장 - 본문이 이전과 같으면 파싱 결과를 유지"""
+        digest = hashlib.sha256(body).hexdigest()
+        changed = cached is None or cached.meta.get("sha256") != digest
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "sha256": digest,
+            "fetched_at": datetime.utcnow().isoformat(),
+            "derived": {} if changed else cached.derived,
+        }
+        page = CachedPage(url, body, meta, changed)
+        self._write(page)
+        return page
+
+    def save_result(self, page: CachedPage, name: str, value):
+        """본문에서 만든 파싱 결과를 함께 저장 (다음 304 때 재사용)"""
+        page.derived[name] = value
+        self._write(page)
+
+    def fetch(self, session, url: str, timeout=15) -> CachedPage:
+        """requests 세션으로 조건부 GET"""
+        cached = self.load(url)
+        if self.offline:
+            if cached is None:
+                raise PageNotCached(url)
+            return cached
+
+        try:
+            response = session.get(url, timeout=timeout, headers=self.request_headers(cached))
+        except requests.RequestException as e:
+            if cached is None:
+                raise
+            print(f"⚠️ 페이지 요청 실패, 저장된 사본 사용: {url} ({e})")
+            return cached
+
+        if response.status_code == 304 and cached is not None:
+            return self.revalidated(cached)
+        response.raise_for_status()
+        return self.store(url, response.content, response.headers, cached)
+
+
+# 프로세스 공용 인스턴스 (주차 목록/공과 본문 스크래핑이 함께 사용)
+page_cache = PageCache()
@@ -0,0 +1,204 @@
+"""
+연간 공과 본문 일괄 미리 가져오기
+
+/api/curriculum은 주차의 lesson_content가 비어 있으면 요청 중에 공과 페이지를
+직접 스크래핑합니다. (최대 15초) 그 주의 첫 방문자가 기다리지 않도록,
+한 해 주차(약 52개)의 공과 URL을 aiohttp로 동시에 가져와 본문을 추출하고
+한 번의 일괄 쓰기(update_lesson_contents)로 저장합니다.
+
+- 호스트별 동시 요청 상한(LESSON_PREFETCH_PER_HOST)과 요청 시작 간격
+  (LESSON_PREFETCH_INTERVAL_SECONDS)으로 교회 웹사이트에 부담을 주지 않습니다.
+- 429/5xx 응답은 Retry-After(없으면 점증 대기)만큼 쉬었다가 다시 시도합니다.
+- 이미 본문이 있는 주차는 건너뜁니다. (--force면 모두 다시 가져옴)
+- 페이지 캐시(http_page_cache)로 조건부 요청을 보내, 304면 저장된 추출 결과를 씁니다.
+
+사용법:
+    python lesson_prefetch.py             # 올해
+    python lesson_prefetch.py 2026        # 특정 연도
+    python lesson_prefetch.py 2026 --force
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import aiohttp
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from curriculum_scraper import CurriculumScraper, lesson_content_from_page, USER_AGENT, LESSON_FETCH_TIMEOUT
+
+PER_HOST_LIMIT = int(os.getenv("LESSON_PREFETCH_PER_HOST", "4"))
+MIN_INTERVAL = float(os.getenv("LESSON_PREFETCH_INTERVAL_SECONDS", "0.25"))
+RETRIES = 2
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MIN_CONTENT_LENGTH = 100  # get_curriculum_for_week가 저장된 본문으로 인정하는 길이
+
+
+class HostRateLimiter:
+    """호스트별 동시 요청 상한 + 요청 시작 간격"""
+
+    def __init__(self, per_host=PER_HOST_LIMIT, interval=MIN_INTERVAL):
+        self.per_host = per_host
+        self.interval = interval
+        self._semaphores = {}
+        self._locks = {}
+        self._next_start = {}
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with semaphore:
+            async with lock:
+                delay = self._next_start.get(host, 0) - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._next_start[host] = time.monotonic() + self.interval
+            yield
+
+    def pause(self, host: str, seconds: float):
+        """서버가 요청한 만큼 이 호스트의 다음 요청을 늦춤"""
+        self._next_start[host] = max(self._next_start.get(host, 0), time.monotonic() + seconds)
+
+
+def _retry_after(response, attempt: int) -> float:
+    try:
+        return min(float(response.headers.get("Retry-After", "")), 60.0)
+    except ValueError:
+        return 2.0 * (attempt + 1)
+
+
+async def fetch_page(session, limiter, cache, url: str):
+    """공과 페이지 하나를 조건부 GET (실패하면 None)"""
+    cached = await asyncio.to_thread(cache.load, url)
+    if cache.offline:
+        return cached
+
+    host = urlsplit(url).netloc
+    for attempt in range(RETRIES + 1):
+        try:
+            async with limiter.slot(host):
+                async with session.get(url, headers=cache.request_headers(cached)) as response:
+                    if response.status == 304 and cached is not None:
+                        return cache.revalidated(cached)
+                    if response.status in RETRY_STATUSES and attempt < RETRIES:
+                        limiter.pause(host, _retry_after(response, attempt))
+                        continue
+                    response.raise_for_status()
+                    html = await response.read()
+                    headers = response.headers
+        except aiohttp.ClientResponseError as e:
+            print(f"⚠️ 공과 페이지 응답 오류: {url} ({e.status})")
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt < RETRIES:
+                continue
+            print(f"⚠️ 공과 페이지 가져오기 실패: {url} ({e})")
+            return cached
+        return await asyncio.to_thread(cache.store, url, html, headers, cached)
+    return None
+
+
+async def fetch_lesson(session, limiter, cache, url: str):
+    """공과 페이지 하나를 가져와 본문 추출 (실패하면 None)"""
+    page = await fetch_page(session, limiter, cache, url)
+    if page is None:
+        return None
+    # HTML 파싱은 CPU 작업 - 이벤트 루프를 막지 않도록 스레드에서
+    content = await asyncio.to_thread(lesson_content_from_page, cache, page)
+    return content or None
+
+
+async def prefetch_year(year: int, scraper=None, force: bool = False) -> dict:
+    """연도의 모든 주차 공과 본문을 동시에 가져와 한 번에 저장
+
+    반환: {"weeks", "fetched", "persisted", "failed", "write_failed", "missing", "skipped", "seconds"}
+    (fetched는 가져온 주 수, persisted/write_failed는 저장소에 실제로 쓴/못 쓴 주 수,
+    missing은 그 사이 동기화로 지워져 쓰지 않은 주 수)
+    """
+    scraper = scraper or CurriculumScraper()
+    manager = scraper.manager
+    started = time.monotonic()
+
+    await asyncio.to_thread(manager.ensure_year_data, year)
+    weeks = await asyncio.to_thread(manager.get_weekly_data_from_db, year)
+    targets = [
+        week for week in weeks
+        if force or len(week.get('lesson_content') or '') <= MIN_CONTENT_LENGTH
+    ]
+
+    contents = {}
+    failed = 0
+    written = {"persisted": 0, "failed": 0, "missing": 0}
+    if targets:
+        print(f"🌐 {year}년 공과 본문 미리 가져오기: {len(targets)}/{len(weeks)}주")
+        limiter = HostRateLimiter()
+        connector = aiohttp.TCPConnector(limit_per_host=limiter.per_host, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=LESSON_FETCH_TIMEOUT)
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout, headers={"User-Agent": USER_AGENT}
+        ) as session:
+            results = await asyncio.gather(*[
+                fetch_lesson(
+                    session, limiter, scraper.page_cache,
+                    week.get('lesson_url') or scraper.generate_direct_url(week, year, all_weeks=weeks)
+                )
+                for week in targets
+            ])
+        for week, content in zip(targets, results):
+            if content:
+                contents[week['week_range']] = content
+            else:
+                failed += 1
+
+        if contents:
+            written = await asyncio.to_thread(manager.update_lesson_contents, year, contents)
+
+    summary = {
+        "weeks": len(weeks),
+        "fetched": len(contents),
+        "persisted": written["persisted"],
+        "failed": failed,
+        "write_failed": written["failed"],
+        "missing": written["missing"],
+        "skipped": len(weeks) - len(targets),
+        "seconds": round(time.monotonic() - started, 2),
+    }
+    status = "⚠️" if summary["write_failed"] else "✅"
+    print(f"{status} {year}년 공과 본문 미리 가져오기 완료: {summary}")
+    return summary
+
+
+async def prefetch_year_once(year: int, scraper=None, force: bool = False):
+    """같은 호스트의 여러 워커 중 하나만 실행 (잠금을 못 얻으면 None)"""
+    if fcntl is None:
+        return await prefetch_year(year, scraper, force)
+    lock_path = os.path.join(tempfile.gettempdir(), f"lds-lesson-prefetch-{year}.lock")
+    with open(lock_path, "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            print(f"⏭️ 다른 워커가 {year}년 공과 본문을 가져오는 중")
+            return None
+        try:
+            return await prefetch_year(year, scraper, force)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    target_year = int(args[0]) if args else datetime.now().year
+    asyncio.run(prefetch_year(target_year, force="--force" in sys.argv))
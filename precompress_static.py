@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+정적 파일 미리 압축 (배포 시 실행)
+
+frontend/dist의 텍스트 파일마다 .br / .gz 형제 파일을 최고 압축률로 만듭니다.
+app_azure.py의 SPA 서빙(backend/spa_files.py)이 요청마다 압축하지 않고
+이 파일들을 그대로 보냅니다.
+
+사용법: python precompress_static.py [dist 경로]
+"""
+
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+EXTENSIONS = (".html", ".js", ".mjs", ".css", ".svg", ".json", ".txt", ".map")
+MIN_BYTES = 512
+
+
+def precompress(static_dir: str):
+    written = 0
+    saved = 0
+    for root, _, names in os.walk(static_dir):
+        for name in names:
+            if not name.endswith(EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < MIN_BYTES:
+                continue
+
+            variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append((".br", brotli.compress(data, quality=11)))
+
+            for suffix, compressed in variants:
+                if len(compressed) >= len(data):
+                    continue
+                with open(path + suffix, "wb") as f:
+                    f.write(compressed)
+                written += 1
+                saved += len(data) - len(compressed)
+            print(f"  {os.path.relpath(path, static_dir)}: {len(data):,} → "
+                  + ", ".join(f"{suffix} {len(c):,}" for suffix, c in variants))
+
+    if brotli is None:
+        print("⚠️ brotli 패키지가 없어 .gz만 생성했습니다.")
+    print(f"✅ 미리 압축 완료: {written}개 파일, {saved:,} bytes 절약")
+
+
+if __name__ == "__main__":
+    default_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "dist")
+    target = sys.argv[1] if len(sys.argv) > 1 else default_dir
+    if not os.path.isdir(target):
+        print(f"❌ 디렉토리가 없습니다: {target}")
+        sys.exit(1)
+    print(f"📦 정적 파일 미리 압축: {target}")
+    precompress(target)
@@ -0,0 +1,113 @@
+"""
+Azure Table Storage 일괄 쓰기 (엔티티 그룹 트랜잭션)
+
+같은 PartitionKey의 쓰기/삭제를 submit_transaction 한 번에 묶어 왕복 횟수를 줄입니다.
+트랜잭션 한도에 맞춰 배치를 나눕니다.
+
+- 배치당 최대 100개 작업, 요청 본문 4 MiB - 공과 본문처럼 큰 속성이 있으면
+  추정 크기(MAX_BATCH_BYTES)로 먼저 나누고, 그래도 413이면 반으로 나눠 다시 보냅니다.
+- 같은 RowKey는 한 트랜잭션에 두 번 들어갈 수 없으므로 새 배치로 넘깁니다.
+- 일시적 오류(408/429/5xx, 연결 오류)는 점증 대기 후 다시 시도합니다.
+- 배치가 끝내 실패하면 같은 파티션의 나머지 배치는 보내지 않습니다.
+  (마이그레이션의 "새 행 쓰기 → 이전 행 삭제"에서 쓰기가 실패했는데 삭제만 되는 일이 없도록)
+
+operations는 submit_transaction 형식 그대로입니다: ("upsert", entity, {"mode": ...}), ("delete", entity) 등
+"""
+
+import base64
+import json
+import os
+import time
+
+from azure.core.exceptions import HttpResponseError, ServiceRequestError, ServiceResponseError
+from azure.data.tables import RequestTooLargeError
+
+MAX_BATCH_OPERATIONS = 100
+MAX_BATCH_BYTES = int(os.getenv("TABLE_BATCH_MAX_BYTES", str(3 * 1024 * 1024)))  # 한도 4 MiB에 여유를 둠
+OPERATION_OVERHEAD = 512  # 작업마다 붙는 multipart 헤더/URL
+RETRIES = 3
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+def _value_bytes(value) -> int:
+    if isinstance(value, (bytes, bytearray)):
+        return len(base64.b64encode(value)) + 40  # base64 + odata.type 표기
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value, default=str)) + 40
+
+
+def operation_bytes(operation) -> int:
+    """요청 본문에서 작업 하나가 차지하는 대략의 크기"""
+    entity = operation[1]
+    return OPERATION_OVERHEAD + sum(len(key) + 6 + _value_bytes(value) for key, value in entity.items())
+
+
+def split_batches(operations, max_operations=MAX_BATCH_OPERATIONS, max_bytes=MAX_BATCH_BYTES):
+    """작업 목록을 파티션별 트랜잭션 배치들로 나눔 (파티션 안의 순서 유지)"""
+    partitions = {}
+    for operation in operations:
+        partitions.setdefault(operation[1]["PartitionKey"], []).append(operation)
+
+    batches = []
+    for partition_key, items in partitions.items():
+        batch, size, row_keys = [], 0, set()
+        for operation in items:
+            cost = operation_bytes(operation)
+            row_key = operation[1]["RowKey"]
+            if batch and (len(batch) >= max_operations or size + cost > max_bytes or row_key in row_keys):
+                batches.append((partition_key, batch))
+                batch, size, row_keys = [], 0, set()
+            batch.append(operation)
+            size += cost
+            row_keys.add(row_key)
+        if batch:
+            batches.append((partition_key, batch))
+    return batches
+
+
+def _is_transient(error) -> bool:
+    if isinstance(error, (ServiceRequestError, ServiceResponseError)):
+        return True
+    return isinstance(error, HttpResponseError) and error.status_code in RETRY_STATUSES
+
+
+def _submit(table_client, batch):
+    """배치 하나 전송 (일시적 오류 재시도, 413이면 반으로 나눔)"""
+    for attempt in range(RETRIES + 1):
+        try:
+            table_client.submit_transaction(batch)
+            return
+        except RequestTooLargeError:
+            if len(batch) == 1:
+                raise
+            middle = len(batch) // 2
+            _submit(table_client, batch[:middle])
+            _submit(table_client, batch[middle:])
+            return
+        except Exception as e:
+            if attempt == RETRIES or not _is_transient(e):
+                raise
+            time.sleep(0.5 * 2 ** attempt)
+
+
+def submit_batches(table_client, operations, **limits) -> dict:
+    """작업들을 트랜잭션 배치로 나눠 전송
+
+    반환: {"operations", "batches", "failed"} - failed는 보내지 못한 작업 수
+    """
+    operations = list(operations)
+    batches = split_batches(operations, **limits)
+    failed = 0
+    failed_partitions = set()
+    for partition_key, batch in batches:
+        if partition_key in failed_partitions:
+            failed += len(batch)
+            continue
+        try:
+            _submit(table_client, batch)
+        except Exception as e:
+            print(f"❌ 트랜잭션 실패 ({partition_key}, {len(batch)}건): {e}")
+            failed_partitions.add(partition_key)
+            failed += len(batch)
+    return {"operations": len(operations), "batches": len(batches), "failed": failed}
@@ -0,0 +1,5 @@
+import os
+
+# backend.main은 import 시 Azure OpenAI 클라이언트를 만듦 - 테스트에서는 호출하지 않는 더미 값
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com")
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "test")
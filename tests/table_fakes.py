@@ -0,0 +1,61 @@
+"""azure.data.tables.TableClient 대역 (메모리 행 + 전송한 트랜잭션 기록)"""
+
+import re
+
+from azure.core.exceptions import ResourceNotFoundError
+from azure.data.tables import UpdateMode
+
+_PARTITION_FILTER = re.compile(r"PartitionKey eq '([^']*)'")
+
+
+class FakeTableClient:
+    def __init__(self, rows=None):
+        self.rows = {}
+        self.transactions = []
+        for entity in rows or []:
+            self.rows[(entity["PartitionKey"], entity["RowKey"])] = dict(entity)
+
+    def entities(self, partition_key=None):
+        return [dict(e) for (pk, _), e in sorted(self.rows.items()) if partition_key in (None, pk)]
+
+    def list_entities(self, **kwargs):
+        return self.entities()
+
+    def query_entities(self, query_filter, select=None, **kwargs):
+        match = _PARTITION_FILTER.search(query_filter or "")
+        entities = self.entities(match.group(1) if match else None)
+        if select:
+            entities = [{k: v for k, v in e.items() if k in select} for e in entities]
+        return entities
+
+    def get_entity(self, partition_key, row_key, **kwargs):
+        try:
+            return dict(self.rows[(partition_key, row_key)])
+        except KeyError:
+            raise ResourceNotFoundError("not found")
+
+    def _write(self, kind, entity, mode=UpdateMode.MERGE):
+        key = (entity["PartitionKey"], entity["RowKey"])
+        if kind == "delete":
+            self.rows.pop(key, None)
+            return
+        if kind == "update" and key not in self.rows:
+            raise ResourceNotFoundError("not found")
+        base = self.rows.get(key, {}) if mode == UpdateMode.MERGE else {}
+        self.rows[key] = dict(base, **entity)
+
+    def upsert_entity(self, entity, mode=UpdateMode.MERGE, **kwargs):
+        self._write("upsert", entity, mode)
+
+    def submit_transaction(self, operations, **kwargs):
+        operations = list(operations)
+        assert len({op[1]["PartitionKey"] for op in operations}) == 1, "파티션이 섞인 트랜잭션"
+        assert len({op[1]["RowKey"] for op in operations}) == len(operations), "같은 RowKey가 두 번"
+        self.transactions.append(operations)
+        for op in operations:  # 원자성: 하나라도 실패하면 아무것도 반영하지 않음
+            if op[0] == "update" and (op[1]["PartitionKey"], op[1]["RowKey"]) not in self.rows:
+                raise ResourceNotFoundError("not found")
+        for op in operations:
+            mode = op[2].get("mode", UpdateMode.MERGE) if len(op) > 2 else UpdateMode.MERGE
+            self._write(op[0], op[1], mode)
+        return []
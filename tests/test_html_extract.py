@@ -0,0 +1,94 @@
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+import html_extract
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE = os.path.join(ROOT, "cfm-2026-lesson10-genesis24-33.html")
+YEAR = 2026
+
+requires_lxml = pytest.mark.skipif(html_extract.lxml_html is None, reason="lxml 미설치")
+
+
+@pytest.fixture(scope="module")
+def lesson_page():
+    with open(FIXTURE, "rb") as f:
+        return f.read()
+
+
+@pytest.fixture(scope="module")
+def index_page(lesson_page):
+    """공과 페이지에 52주 공과 링크 목록을 붙인 연간 목록 페이지 (benchmarks와 같은 합성 페이지)"""
+    links = "".join(
+        f'<li><a href="/study/manual/come-follow-me-for-home-and-church-old-testament-{YEAR}/{i + 1:02d}?lang=kor">'
+        f'<p class="title">{1 + i // 4}월 {1 + (i % 4) * 7}일~{7 + (i % 4) * 7}일: 창세기 {i + 1}장</p></a></li>'
+        for i in range(52)
+    )
+    return lesson_page.replace(b"</body>", f"<nav><ul>{links}</ul></nav></body>".encode("utf-8"))
+
+
+@pytest.fixture
+def without_lxml(monkeypatch):
+    """SoupStrainer 경로 (lxml 미설치 환경)"""
+    monkeypatch.setattr(html_extract, "lxml_html", None)
+
+
+# === 기준: 이전 구현 (BeautifulSoup 전체 트리) ===
+
+def baseline_sections(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    sections = []
+    for tag in ['h1', 'h2']:
+        el = soup.find(tag)
+        if el:
+            sections.append(el.get_text(strip=True))
+    for p in soup.find_all(['p', 'li'])[:60]:
+        text = p.get_text(strip=True)
+        if len(text) > 20:
+            sections.append(text)
+    return sections
+
+
+def baseline_links(html, year):
+    soup = BeautifulSoup(html, 'html.parser')
+    return [
+        (link.get('href', ''), link.get_text(strip=True))
+        for link in soup.find_all('a', href=True)
+        if 'come-follow-me' in link.get('href', '') and str(year) in link.get('href', '')
+    ]
+
+
+@requires_lxml
+def test_lxml_sections_match_baseline(lesson_page):
+    expected = baseline_sections(lesson_page)
+    assert len(expected) > 10
+    assert html_extract.lesson_sections(lesson_page) == expected
+
+
+@requires_lxml
+def test_lxml_links_match_baseline(index_page):
+    expected = baseline_links(index_page, YEAR)
+    assert len(expected) >= 52
+    assert html_extract.lesson_links(index_page, YEAR) == expected
+
+
+@requires_lxml
+def test_lxml_accepts_text(lesson_page):
+    text = lesson_page.decode("utf-8")
+    assert html_extract.lesson_sections(text) == baseline_sections(text)
+
+
+def test_strainer_sections_match_baseline(lesson_page, without_lxml):
+    assert html_extract.lesson_sections(lesson_page) == baseline_sections(lesson_page)
+
+
+def test_strainer_links_match_baseline(index_page, without_lxml):
+    assert html_extract.lesson_links(index_page, YEAR) == baseline_links(index_page, YEAR)
+
+
+@pytest.mark.parametrize("html", [b"", "", b"<html></html>"])
+def test_empty_page(html):
+    assert html_extract.lesson_sections(html) == []
+    assert html_extract.lesson_links(html, YEAR) == []
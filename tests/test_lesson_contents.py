@@ -0,0 +1,57 @@
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+
+import weekly_curriculum_manager as wcm
+from table_fakes import FakeTableClient
+from weekly_curriculum_manager import WeeklyCurriculumManager, week_row_key
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.delenv("AZURE_STORAGE_CONNECTION_STRING", raising=False)
+    manager = WeeklyCurriculumManager(db_path=str(tmp_path / "curriculum.db"))
+    manager.check_year_data_exists(2026)
+    return manager
+
+
+def week_entity(week_range):
+    return {
+        "PartitionKey": "2026", "RowKey": week_row_key(week_range),
+        "StartDate": "2026-01-05", "EndDate": "2026-01-11", "WeekRange": week_range,
+    }
+
+
+def test_update_lesson_contents_skips_missing_weeks(manager, monkeypatch):
+    client = FakeTableClient([week_entity("1월 5일~11일")])
+    monkeypatch.setattr(wcm, "get_table_client", lambda name, conn: client)
+    manager.connection_string = "UseDevelopmentStorage=true"
+
+    result = manager.update_lesson_contents(2026, {"1월 5일~11일": "본문", "1월 12일~18일": "지워진 주차 본문"})
+    assert result == {"persisted": 1, "failed": 0, "missing": 1}
+    assert list(client.rows) == [("2026", week_row_key("1월 5일~11일"))]  # 날짜 없는 행을 만들지 않음
+    assert client.rows[("2026", week_row_key("1월 5일~11일"))]["StartDate"] == "2026-01-05"
+    assert client.rows[("2026", week_row_key("1월 5일~11일"))]["LessonContent"] == "본문"
+    assert all(op[0] == "update" for batch in client.transactions for op in batch)
+
+
+def test_update_lesson_contents_reports_failures(manager, monkeypatch):
+    client = FakeTableClient([week_entity("1월 5일~11일")])
+
+    def deleted_meanwhile(operations):
+        raise ResourceNotFoundError("not found")
+
+    client.submit_transaction = deleted_meanwhile
+    monkeypatch.setattr(wcm, "get_table_client", lambda name, conn: client)
+    manager.connection_string = "UseDevelopmentStorage=true"
+
+    assert manager.update_lesson_contents(2026, {"1월 5일~11일": "본문"}) == {"persisted": 0, "failed": 1, "missing": 0}
+
+
+def test_dateless_rows_are_ignored_on_read(manager, monkeypatch):
+    client = FakeTableClient([
+        dict(week_entity("1월 5일~11일"), LessonTitle="창세기 1~2장"),
+        {"PartitionKey": "2026", "RowKey": "stray", "LessonContent": "본문"},
+    ])
+    monkeypatch.setattr(wcm, "get_table_client", lambda name, conn: client)
+    manager.connection_string = "UseDevelopmentStorage=true"
+    assert [w["week_range"] for w in manager.get_weekly_data_from_db(2026)] == ["1월 5일~11일"]
@@ -0,0 +1,154 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.llm_service import GenerationService, QueueFullError
+
+
+class FakeCompletions:
+    """chat.completions 대역 - release가 set될 때까지 응답을 붙잡아 둠"""
+
+    def __init__(self, error=None):
+        self.release = asyncio.Event()
+        self.started = 0
+        self.error = error
+
+    async def create(self, model, messages, stream=False, **kwargs):
+        self.started += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        if stream:
+            return FakeStream()
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="자료"))], usage=usage)
+
+
+class FakeStream:
+    def __init__(self):
+        self.closed = False
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for piece in ("공", "과"):
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+            await asyncio.sleep(0)
+
+    async def close(self):
+        self.closed = True
+
+
+def service(completions, **kwargs):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return GenerationService(client, default_deployment="gpt", **kwargs)
+
+
+MESSAGES = [{"role": "user", "content": "질문"}]
+
+
+def lane(svc):
+    return svc.stats()["gpt"]
+
+
+def test_full_queue_rejects_with_429_and_retry_after():
+    async def main():
+        completions = FakeCompletions()
+        svc = service(completions, max_concurrency=1, max_queue=1)
+        running = asyncio.create_task(svc.complete(MESSAGES))
+        queued = asyncio.create_task(svc.complete(MESSAGES))
+        await asyncio.sleep(0.01)
+        assert (lane(svc)["in_flight"], lane(svc)["queue_depth"]) == (1, 1)
+
+        with pytest.raises(QueueFullError) as rejected:
+            await svc.complete(MESSAGES)
+        completions.release.set()
+        await asyncio.gather(running, queued)
+        return svc, rejected.value
+
+    svc, error = asyncio.run(main())
+    assert error.status_code == 429
+    assert error.retry_after >= 1
+    assert lane(svc)["rejected"] == 1 and lane(svc)["completed"] == 2
+
+
+def test_queue_timeout_rejects_with_503():
+    async def main():
+        completions = FakeCompletions()
+        svc = service(completions, max_concurrency=1, max_queue=5, queue_timeout=0.05)
+        running = asyncio.create_task(svc.complete(MESSAGES))
+        await asyncio.sleep(0.01)
+        with pytest.raises(QueueFullError) as timed_out:
+            await svc.complete(MESSAGES)
+        completions.release.set()
+        await running
+        return svc, timed_out.value
+
+    svc, error = asyncio.run(main())
+    assert error.status_code == 503
+    assert lane(svc)["queue_depth"] == 0
+
+
+def test_slot_released_on_error():
+    async def main():
+        completions = FakeCompletions(error=RuntimeError("Azure 오류"))
+        completions.release.set()
+        svc = service(completions, max_concurrency=1, max_queue=0)
+        for _ in range(3):  # 슬롯이 새면 두 번째 호출부터 429
+            with pytest.raises(RuntimeError):
+                await svc.complete(MESSAGES)
+        return svc
+
+    svc = asyncio.run(main())
+    assert lane(svc)["in_flight"] == 0 and lane(svc)["rejected"] == 0
+
+
+def test_slot_released_on_cancellation():
+    async def main():
+        completions = FakeCompletions()
+        svc = service(completions, max_concurrency=1, max_queue=1)
+        running = asyncio.create_task(svc.complete(MESSAGES))
+        queued = asyncio.create_task(svc.complete(MESSAGES))
+        await asyncio.sleep(0.01)
+        queued.cancel()  # 대기 중 취소
+        running.cancel()  # 실행 중 취소
+        await asyncio.gather(running, queued, return_exceptions=True)
+        assert (lane(svc)["in_flight"], lane(svc)["queue_depth"]) == (0, 0)
+
+        completions.release.set()
+        return await svc.complete(MESSAGES)
+
+    assert asyncio.run(main()).choices[0].message.content == "자료"
+
+
+def test_stream_closed_early_releases_slot():
+    async def main():
+        completions = FakeCompletions()
+        completions.release.set()
+        svc = service(completions, max_concurrency=1, max_queue=0)
+        stream = svc.stream(MESSAGES)
+        await stream.__anext__()
+        assert lane(svc)["in_flight"] == 1
+        await stream.aclose()  # 클라이언트 연결 끊김
+        assert lane(svc)["in_flight"] == 0
+        return [chunk async for chunk in svc.stream(MESSAGES)]
+
+    assert len(asyncio.run(main())) == 2
+
+
+def test_generate_endpoint_returns_429_with_retry_after(monkeypatch):
+    from backend import main
+
+    svc = service(FakeCompletions(), max_concurrency=1, max_queue=0)
+    asyncio.run(svc._lane("gpt").semaphore.acquire())  # 실행 슬롯을 모두 점유
+    monkeypatch.setattr(main, "generation_service", svc)
+
+    response = TestClient(main.app).post("/api/generate-material", json={
+        "lesson_title": "창세기 1~2장", "lesson_content": "본문",
+        "target_audience": "성인", "week_range": "1월 5일~11일",
+    })
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+import pytest
+
+from backend import memory_cache
+from backend.memory_cache import MemoryCache, estimate_size
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """memory_cache가 보는 시계를 손으로 돌림"""
+    now = [1000.0]
+    monkeypatch.setattr(memory_cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+VALUE = "가" * 100
+SIZE = estimate_size(VALUE)
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = MemoryCache(max_bytes=SIZE * 3)
+    for key in "abc":
+        cache.set("material", key, VALUE)
+    cache.get("material", "a")  # a를 최근 사용으로 올림
+    cache.set("material", "d", VALUE)
+
+    assert cache.get("material", "b") is None  # 가장 오래 안 쓴 항목
+    assert [cache.get("material", key) for key in "acd"] == [VALUE] * 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] <= stats["max_bytes"]
+
+
+def test_large_value_evicts_several_entries():
+    cache = MemoryCache(max_bytes=SIZE * 3)
+    for key in "abc":
+        cache.set("material", key, VALUE)
+    big = "가" * 200  # 항목 두 개 분량
+    cache.set("material", "big", big)
+
+    assert cache.get("material", "a") is None and cache.get("material", "b") is None
+    assert cache.get("material", "c") == VALUE and cache.get("material", "big") == big
+    assert cache.stats()["evictions"] == 2
+
+
+def test_value_over_budget_is_not_stored():
+    cache = MemoryCache(max_bytes=SIZE * 3)
+    cache.set("material", "a", VALUE)
+    cache.set("material", "huge", "가" * 1000)
+    assert cache.get("material", "huge") is None
+    assert cache.get("material", "a") == VALUE
+
+
+def test_overwrite_replaces_size():
+    cache = MemoryCache(max_bytes=SIZE * 3)
+    cache.set("material", "a", VALUE)
+    cache.set("material", "a", "짧음")
+    assert cache.stats()["bytes"] == estimate_size("짧음")
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = MemoryCache(ttls={"qa": 60})
+    cache.set("qa", "q", "답변")
+    clock[0] += 59
+    assert cache.get("qa", "q") == "답변"
+    clock[0] += 1
+    assert cache.get("qa", "q") is None
+    assert cache.stats()["bytes"] == 0  # 만료 항목은 조회 시 제거
+
+
+def test_namespace_ttls_and_overrides(clock):
+    cache = MemoryCache(ttls={"board": 30, "lesson": 86400}, default_ttl=300)
+    cache.set("board", "k", 1)
+    cache.set("lesson", "k", 2)
+    cache.set("unknown", "k", 3)  # 등록 안 된 네임스페이스는 default_ttl
+    cache.set("lesson", "short", 4, ttl=10)  # 호출별 TTL이 네임스페이스 TTL보다 우선
+
+    clock[0] += 31
+    assert cache.get("board", "k") is None
+    assert cache.get("lesson", "short") is None
+    assert cache.get("unknown", "k") == 3
+    clock[0] += 300
+    assert cache.get("unknown", "k") is None
+    assert cache.get("lesson", "k") == 2
+
+
+def test_invalidate_key_and_namespace():
+    cache = MemoryCache()
+    cache.set("material", "a", 1)
+    cache.set("material", "b", 2)
+    cache.set("presentation", "a", 3)
+
+    cache.invalidate("material", "a")
+    assert cache.get("material", "a") is None and cache.get("material", "b") == 2
+    cache.invalidate("material")
+    assert cache.get("material", "b") is None
+    assert cache.get("presentation", "a") == 3
+    assert cache.stats()["bytes"] == estimate_size(3)
+
+
+def test_stats_counts_hits_and_misses():
+    cache = MemoryCache()
+    cache.set("config", "pw", "hash")
+    cache.get("config", "pw")
+    cache.get("config", "pw")
+    cache.get("config", "missing")
+    assert cache.stats()["namespaces"]["config"] == {"hits": 2, "misses": 1, "hit_rate": 0.667}
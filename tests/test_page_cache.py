@@ -0,0 +1,126 @@
+import pytest
+import requests
+
+import curriculum_scraper
+from http_page_cache import PageCache, PageNotCached
+
+URL = "https://www.churchofjesuschrist.org/study/manual/come-follow-me-2026/10?lang=kor"
+ETAG = '"v1"'
+LAST_MODIFIED = "Mon, 02 Mar 2026 00:00:00 GMT"
+HTML = "<html><body><h1>창세기 24~33장</h1><p>이삭과 리브가의 혼인 이야기를 공부합니다.</p></body></html>".encode("utf-8")
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}")
+
+
+class FakeSession:
+    """요청 헤더를 기록하고 정해 둔 응답(또는 예외)을 차례로 돌려줌"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def get(self, url, timeout=None, headers=None):
+        self.sent.append(headers or {})
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def ok(body=HTML, etag=ETAG):
+    return FakeResponse(200, body, {"ETag": etag, "Last-Modified": LAST_MODIFIED})
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PageCache(directory=str(tmp_path), offline=False)
+
+
+def test_first_fetch_persists_validators(cache, tmp_path):
+    session = FakeSession(ok())
+    page = cache.fetch(session, URL)
+    assert session.sent == [{}]  # 처음에는 조건부 헤더 없음
+    assert page.changed and page.body == HTML
+
+    # 다른 워커(새 인스턴스)도 디스크에서 같은 검증자를 읽음
+    stored = PageCache(directory=str(tmp_path), offline=False).load(URL)
+    assert stored.body == HTML
+    assert stored.meta["etag"] == ETAG and stored.meta["last_modified"] == LAST_MODIFIED
+    assert PageCache.request_headers(stored) == {"If-None-Match": ETAG, "If-Modified-Since": LAST_MODIFIED}
+
+
+def test_304_reuses_body_and_derived_result(cache, monkeypatch):
+    first = cache.fetch(FakeSession(ok()), URL)
+    content = curriculum_scraper.lesson_content_from_page(cache, first)
+    assert "창세기 24~33장" in content
+
+    def fail(html):
+        raise AssertionError("304인데 다시 파싱함")
+
+    monkeypatch.setattr(curriculum_scraper, "extract_lesson_content", fail)
+    session = FakeSession(FakeResponse(304))
+    page = cache.fetch(session, URL)
+    assert session.sent == [{"If-None-Match": ETAG, "If-Modified-Since": LAST_MODIFIED}]
+    assert not page.changed and page.body == HTML
+    assert curriculum_scraper.lesson_content_from_page(cache, page) == content
+
+
+def test_same_body_200_keeps_derived_and_updates_etag(cache):
+    first = cache.fetch(FakeSession(ok()), URL)
+    cache.save_result(first, "links", ["a"])
+
+    page = cache.fetch(FakeSession(ok(etag='"v2"')), URL)  # 서버가 ETag만 바꿈
+    assert not page.changed
+    assert page.cached_result("links") == ["a"]
+    assert cache.load(URL).meta["etag"] == '"v2"'
+
+
+def test_changed_body_clears_derived(cache):
+    first = cache.fetch(FakeSession(ok()), URL)
+    cache.save_result(first, "links", ["a"])
+
+    page = cache.fetch(FakeSession(ok(body=HTML + b"<p>new</p>", etag='"v2"')), URL)
+    assert page.changed
+    assert page.cached_result("links") is None
+    assert cache.load(URL).meta["derived"] == {}
+
+
+def test_network_error_falls_back_to_stored_copy(cache):
+    cache.fetch(FakeSession(ok()), URL)
+    page = cache.fetch(FakeSession(requests.ConnectionError("down")), URL)
+    assert page.body == HTML
+
+    with pytest.raises(requests.ConnectionError):
+        cache.fetch(FakeSession(requests.ConnectionError("down")), URL + "&other")
+
+
+def test_http_error_raises(cache):
+    with pytest.raises(requests.HTTPError):
+        cache.fetch(FakeSession(FakeResponse(500)), URL)
+    assert cache.load(URL) is None
+
+
+def test_offline_serves_only_cached_pages(cache, tmp_path):
+    cache.fetch(FakeSession(ok()), URL)
+    offline = PageCache(directory=str(tmp_path), offline=True)
+    assert offline.fetch(FakeSession(), URL).body == HTML
+    with pytest.raises(PageNotCached):
+        offline.fetch(FakeSession(), URL + "&other")
+
+
+def test_disabled_cache_always_fetches():
+    cache = PageCache(directory="", offline=True)
+    assert not cache.enabled and not cache.offline
+    session = FakeSession(ok(), ok())
+    cache.fetch(session, URL)
+    page = cache.fetch(session, URL)
+    assert session.sent == [{}, {}] and page.changed
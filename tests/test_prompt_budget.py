@@ -0,0 +1,83 @@
+import pytest
+
+from backend.prompt_budget import (
+    SECTION_MAX_TOKENS, bm25_scores, budget_chat_context, estimate_tokens, select_sections,
+    split_sections, tokenize,
+)
+
+FILLER = "이 문단은 공과 준비를 위한 일반적인 안내와 배경 설명을 담고 있습니다. "
+
+
+def section(title, topic, repeat=6):
+    return f"## {title}\n{topic}\n\n" + FILLER * repeat
+
+
+MATERIAL = "\n\n".join([
+    "# 개요\n" + FILLER * 4,
+    section("창조", "하나님께서 엿새 동안 하늘과 땅을 창조하셨습니다. 창조의 순서를 살펴봅니다."),
+    section("안식일", "일곱째 날 안식일을 거룩하게 하셨습니다. 안식일 준수의 의미를 토론합니다."),
+    section("아담과 이브", "에덴동산에서 아담과 이브가 선악을 알게 하는 나무 열매를 먹었습니다."),
+    section("노아", "노아가 방주를 짓고 홍수에서 가족을 구했습니다."),
+    section("바벨탑", "사람들이 하늘에 닿는 탑을 쌓으려 했습니다."),
+])
+
+
+@pytest.mark.parametrize("budget", [50, 120, 200, 400, 700])
+def test_selection_fits_budget(budget):
+    selected = select_sections(MATERIAL, "안식일을 어떻게 지키나요?", budget)
+    assert estimate_tokens(selected) <= budget
+
+
+def test_short_text_returned_unchanged():
+    assert select_sections("짧은 본문", "질문", 100) == "짧은 본문"
+    assert select_sections("", "질문", 100) == ""
+
+
+def test_most_relevant_section_selected_first():
+    budget = estimate_tokens(split_sections(MATERIAL)[2]) + 5  # 섹션 하나 분량
+    selected = select_sections(MATERIAL, "안식일을 거룩하게 지키는 의미", budget)
+    assert selected.startswith("## 안식일")
+    assert "## 창조" not in selected and "# 개요" not in selected
+
+
+def test_selected_sections_keep_document_order():
+    sections = split_sections(MATERIAL)
+    budget = estimate_tokens(sections[2]) + estimate_tokens(sections[4]) + 10
+    selected = select_sections(MATERIAL, "노아의 방주와 안식일", budget)
+    assert selected.index("## 안식일") < selected.index("## 노아")
+
+
+def test_bm25_ranks_by_relevance():
+    documents = [tokenize(text) for text in (
+        "노아가 방주를 지었습니다",
+        "안식일에 쉬었습니다",
+        "노아의 방주와 홍수, 노아의 가족",
+        "에덴동산 이야기",
+    )]
+    scores = bm25_scores(tokenize("노아 방주"), documents)
+    ranking = sorted(range(len(scores)), key=lambda i: -scores[i])
+    assert ranking[:2] == [2, 0]
+    assert scores[1] == scores[3] == 0
+
+
+def test_hangul_bigrams_match_words_with_particles():
+    # "안식일에"와 "안식일을"은 단어는 다르지만 2-gram으로 맞음
+    scores = bm25_scores(tokenize("안식일을"), [tokenize("안식일에 쉬었다"), tokenize("홍수가 났다")])
+    assert scores[0] > 0 and scores[1] == 0
+
+
+def test_long_section_split_under_limit():
+    long_text = "## 긴 섹션\n" + "\n\n".join(FILLER * 10 for _ in range(10))
+    sections = split_sections(long_text)
+    assert len(sections) > 1
+    assert all(section.startswith("## 긴 섹션") for section in sections)
+    assert all(estimate_tokens(section) <= SECTION_MAX_TOKENS + estimate_tokens("## 긴 섹션") for section in sections)
+
+
+def test_chat_context_fits_budget_and_shares_leftover():
+    lesson = "짧은 공과 내용"
+    lesson_out, material_out = budget_chat_context(lesson, MATERIAL, "노아", budget_tokens=300)
+    assert lesson_out == lesson  # 몫보다 짧으면 그대로
+    assert estimate_tokens(lesson_out) + estimate_tokens(material_out) <= 300
+    # 공과가 쓰지 않은 몫을 교재가 씀
+    assert estimate_tokens(material_out) > 300 * 0.6
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from backend.qa_cache import SIMILARITY, ChatAnswerCache, _PartitionIndex, normalize_question
+
+CACHED = [
+    "이 공과를 아이들에게 어떻게 가르칠 수 있을까요?",
+    "이 공과의 핵심 원리는 무엇인가요?",
+    "창세기 24장에서 리브가는 어떤 사람이었나요?",
+    "이 공과를 청소년에게 가르칠 때 활동을 추천해 주세요",
+]
+
+# 한 단어만 달라 글자 n-gram 유사도는 높지만 뜻이 다른 질문 - 캐시 답변을 주면 안 됨
+NEAR_MISSES = [
+    "이 공과를 어른들에게 어떻게 가르칠 수 있을까요?",
+    "이 공과를 청소년에게 어떻게 가르칠 수 있을까요?",
+    "이 공과의 핵심 교리는 무엇인가요?",
+    "창세기 25장에서 리브가는 어떤 사람이었나요?",
+]
+
+
+def build_index():
+    index = _PartitionIndex()
+    for i, question in enumerate(CACHED):
+        index.add(question, f"답변 {i}", f"row{i}")
+    return index
+
+
+def test_default_threshold_is_strict():
+    assert SIMILARITY >= 0.9
+
+
+@pytest.mark.parametrize("question", NEAR_MISSES)
+def test_near_miss_not_served_at_default(question):
+    assert build_index().lookup(question, SIMILARITY) is None
+
+
+@pytest.mark.parametrize("question", NEAR_MISSES)
+def test_near_miss_not_served_at_lowest_recommended_threshold(question):
+    assert build_index().lookup(question, 0.9) is None
+
+
+def test_different_chapter_never_matches():
+    index = build_index()
+    question = "창세기 25장에서 리브가는 어떤 사람이었나요?"
+    assert index.lookup(question, 0.5) is None
+    assert index.lookup("창세기 24장에서 리브가는 어떤 사람이었나요", 0.5)["exact"]
+
+
+@pytest.mark.parametrize("question", [
+    "이 공과의 핵심 원리는 무엇인가요",
+    "이 공과의  핵심원리는 무엇인가요?!",
+    "이 공과의 핵심 원리는 무엇인가요？",  # 전각 물음표
+])
+def test_normalized_question_is_exact_hit(question):
+    match = build_index().lookup(question, SIMILARITY)
+    assert match is not None and match["exact"]
+    assert match["answer"] == "답변 1"
+
+
+def test_normalize_question():
+    assert normalize_question(" 핵심  원리는?? ") == "핵심원리는"
+
+
+def test_removed_answer_is_not_served():
+    index = build_index()
+    index.remove("row1")
+    assert index.lookup(CACHED[1], SIMILARITY) is None
+
+
+def test_cache_counts_hits_and_misses():
+    async def load(partition_key):
+        return [{"Question": q, "Answer": "답", "RowKey": f"r{i}", "CreatedAt": str(i)} for i, q in enumerate(CACHED)]
+
+    async def main():
+        cache = ChatAnswerCache(load)
+        await cache.lookup("p", CACHED[0])
+        await cache.lookup("p", NEAR_MISSES[0])
+        return cache.stats()
+
+    stats = asyncio.run(main())
+    assert (stats["hits"], stats["near_hits"], stats["misses"]) == (1, 0, 1)
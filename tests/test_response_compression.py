@@ -0,0 +1,99 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend import response_compression
+from backend.response_compression import CompressionMiddleware, accepted_encodings
+
+BIG = {"text": "공과 자료 " * 200}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, min_bytes=512)
+
+    @app.get("/big")
+    def big():
+        return JSONResponse(BIG, headers={"ETag": '"abc"'})
+
+    @app.get("/small")
+    def small():
+        return JSONResponse({"ok": True}, headers={"ETag": '"small"'})
+
+    @app.get("/weak")
+    def weak():
+        return JSONResponse(BIG, headers={"ETag": 'W/"weak"'})
+
+    @app.get("/sse")
+    def sse():
+        async def events():
+            for i in range(3):
+                yield f"data: {'x' * 600}{i}\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/not-modified")
+    def not_modified():
+        return Response(status_code=304, headers={"ETag": '"abc"'})
+
+    return TestClient(app)
+
+
+def get(client, path, encoding="gzip"):
+    return client.get(path, headers={"Accept-Encoding": encoding})
+
+
+def test_large_body_is_compressed_and_etag_weakened(client):
+    response = get(client, "/big")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"abc"'
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert response.json() == BIG
+
+
+def test_weak_etag_is_not_weakened_twice(client):
+    assert get(client, "/weak").headers["etag"] == 'W/"weak"'
+
+
+def test_body_below_threshold_passes_through(client):
+    response = get(client, "/small")
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"small"'
+    assert response.json() == {"ok": True}
+
+
+def test_no_accepted_encoding_passes_through(client):
+    response = get(client, "/big", encoding="identity")
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"abc"'
+
+
+def test_sse_stream_is_not_compressed(client):
+    response = get(client, "/sse")
+    assert "content-encoding" not in response.headers
+    assert response.text.count("data: ") == 3
+
+
+def test_not_modified_passes_through(client):
+    response = get(client, "/not-modified")
+    assert response.status_code == 304
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"abc"'
+
+
+@pytest.mark.skipif(response_compression.brotli is None, reason="brotli 미설치")
+def test_brotli_preferred_when_accepted(client):
+    response = get(client, "/big", encoding="gzip, br")
+    assert response.headers["content-encoding"] == "br"
+
+
+def test_gzip_round_trip_size():
+    body = ("공과 " * 1000).encode("utf-8")
+    assert gzip.decompress(response_compression.compress(body, "gzip")) == body
+
+
+def test_accepted_encodings_ignores_q_zero():
+    assert accepted_encodings("gzip;q=0, br;q=0.5, identity") == {"br", "identity"}
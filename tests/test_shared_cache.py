@@ -0,0 +1,134 @@
+import asyncio
+import subprocess
+import sys
+import time
+
+import pytest
+
+from backend.memory_cache import MemoryCache
+from backend.shared_cache import SharedCache, TieredCache
+
+KEY = ("2026-10-19|청소년", "material_row")
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "shared.sqlite3")
+
+
+def worker(path, l1_ttl=0.2):
+    """같은 L2 파일을 쓰는 워커 하나의 캐시"""
+    return TieredCache(
+        MemoryCache(), SharedCache(path=path, default_ttl=60),
+        shared_namespaces={"material", "lesson"}, immutable_namespaces={"lesson"}, l1_ttl=l1_ttl,
+    )
+
+
+def test_delete_in_one_worker_reaches_another(path):
+    deleting, serving = worker(path), worker(path)
+    deleting.set("material", KEY, "자료")
+    assert serving.get("material", KEY) == "자료"  # L2에서 읽어 L1에 올림
+
+    deleting.invalidate("material", KEY)
+    assert deleting.get("material", KEY) is None
+    time.sleep(0.25)  # 다른 워커의 L1은 l1_ttl 안에 만료
+    assert serving.get("material", KEY) is None
+
+
+def test_immutable_namespace_keeps_l1_ttl(path):
+    cache = worker(path)
+    cache.set("lesson", "abc", "본문")
+    cache.shared.invalidate("lesson", "abc")
+    time.sleep(0.25)
+    assert cache.get("lesson", "abc") == "본문"
+
+
+def test_l1_only_namespace_keeps_ttl(path):
+    cache = worker(path)
+    cache.set("qa", "p", {"body": "목록"})
+    time.sleep(0.25)
+    assert cache.get("qa", "p") == {"body": "목록"}
+    assert cache.shared.get("qa", "p") is None
+
+
+def test_l1_ttl_not_capped_without_l2():
+    cache = TieredCache(MemoryCache(), SharedCache(path=""), shared_namespaces={"material"}, l1_ttl=0.01)
+    cache.set("material", KEY, "자료")
+    time.sleep(0.05)
+    assert cache.get("material", KEY) == "자료"
+
+
+# === SharedCache ===
+
+def test_shared_expiry(path):
+    shared = SharedCache(path=path)
+    shared.set("material", KEY, "자료", ttl=0.1)
+    assert shared.get("material", KEY) == "자료"
+    time.sleep(0.15)
+    assert shared.get("material", KEY) is None
+
+
+def test_shared_per_namespace_ttl(path):
+    shared = SharedCache(path=path, ttls={"board": 0.1}, default_ttl=60)
+    shared.set("board", "posts", [1])
+    shared.set("material", KEY, "자료")
+    time.sleep(0.15)
+    assert shared.get("board", "posts") is None
+    assert shared.get("material", KEY) == "자료"
+
+
+def test_shared_large_value_round_trip(path):
+    shared = SharedCache(path=path)
+    value = {"html": "<p>공과</p>" * 5000}
+    shared.set("presentation", KEY, value)
+    assert SharedCache(path=path).get("presentation", KEY) == value
+
+
+def test_shared_delete_key_and_namespace(path):
+    shared = SharedCache(path=path)
+    shared.set("material", "a", 1)
+    shared.set("material", "b", 2)
+    shared.set("presentation", "a", 3)
+    shared.invalidate("material", "a")
+    assert shared.get("material", "a") is None and shared.get("material", "b") == 2
+    shared.invalidate("material")
+    assert shared.get("material", "b") is None
+    assert shared.get("presentation", "a") == 3
+
+
+def run_in_other_process(path, code):
+    script = f"from backend.shared_cache import SharedCache; shared = SharedCache(path={path!r}); {code}"
+    return subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout.strip()
+
+
+def test_cross_process_visibility(path):
+    shared = SharedCache(path=path)
+    run_in_other_process(path, "shared.set('material', ['p', 'r'], '다른 워커')")
+    assert shared.get("material", ["p", "r"]) == "다른 워커"
+
+    shared.set("material", ["p", "r"], "이 워커")
+    assert run_in_other_process(path, "print(shared.get('material', ['p', 'r']))") == "이 워커"
+
+    run_in_other_process(path, "shared.invalidate('material', ['p', 'r'])")
+    assert shared.get("material", ["p", "r"]) is None
+
+
+def test_disabled_shared_cache_is_noop():
+    shared = SharedCache(path="")
+    shared.set("material", KEY, "자료")
+    assert shared.get("material", KEY, "없음") == "없음"
+
+
+# === TieredCache async ===
+
+def test_async_access_matches_sync(path):
+    writer, reader = worker(path), worker(path)
+
+    async def main():
+        await writer.aset("material", KEY, "자료")
+        first = await reader.aget("material", KEY)
+        await writer.ainvalidate("material", KEY)
+        await asyncio.sleep(0.25)
+        return first, await reader.aget("material", KEY, "없음")
+
+    assert asyncio.run(main()) == ("자료", "없음")
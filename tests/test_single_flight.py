@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from backend.single_flight import SingleFlight
+
+
+@pytest.fixture
+def flight(tmp_path):
+    return SingleFlight(lock_dir=str(tmp_path), wait_timeout=5, lock_timeout=5)
+
+
+def test_concurrent_calls_run_once(flight):
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "자료"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("2026|창세기", work) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert [result for result, _ in results] == ["자료"] * 5
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert flight._calls == {}
+
+
+def test_error_reaches_every_waiter(flight):
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        raise ValueError("생성 실패")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(4)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight._calls == {}
+
+
+def test_key_cleared_after_finish_and_fail(flight):
+    call, is_leader = flight.acquire("key")
+    assert is_leader
+    assert flight.acquire("key") == (call, False)
+    flight.finish("key", call, "결과")
+    assert flight._calls == {}
+    assert asyncio.run(flight.wait(call)) == "결과"
+
+    call, is_leader = flight.acquire("key")
+    assert is_leader
+    flight.fail("key", call, RuntimeError("x"))
+    assert flight._calls == {}
+    with pytest.raises(RuntimeError):
+        asyncio.run(flight.wait(call))
+
+
+def test_waiter_takes_over_when_leader_cancelled(flight):
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    async def main():
+        leader = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(main()) == (2, False)
+    assert flight._calls == {}
+
+
+def test_process_lock_times_out_and_proceeds(tmp_path):
+    holder = SingleFlight(lock_dir=str(tmp_path), lock_timeout=5)
+    other = SingleFlight(lock_dir=str(tmp_path), lock_timeout=0.3)
+
+    async def main():
+        async with holder.process_lock("key"):
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            async with other.process_lock("key"):
+                return loop.time() - started
+
+    assert asyncio.run(main()) >= 0.3
+
+
+def test_process_lock_released_after_exit(tmp_path):
+    first = SingleFlight(lock_dir=str(tmp_path), lock_timeout=5)
+    second = SingleFlight(lock_dir=str(tmp_path), lock_timeout=5)
+
+    async def main():
+        async with first.process_lock("key"):
+            pass
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        async with second.process_lock("key"):
+            return loop.time() - started
+
+    assert asyncio.run(main()) < 0.2
@@ -0,0 +1,53 @@
+import gzip
+
+import pytest
+
+from backend.spa_files import CACHE_IMMUTABLE, CACHE_REVALIDATE, SpaFiles
+
+
+@pytest.fixture
+def spa(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<html>공과</html>", encoding="utf-8")
+    js = b"console.log('x');" * 100
+    (tmp_path / "assets" / "app.123.js").write_bytes(js)
+    (tmp_path / "assets" / "app.123.js.gz").write_bytes(gzip.compress(js))
+    return SpaFiles(str(tmp_path))
+
+
+def test_index_skips_compressed_siblings(spa):
+    assert set(spa.files) == {"index.html", "assets/app.123.js"}
+    assert spa.lookup("index.html").cache_control == CACHE_REVALIDATE
+    assert spa.lookup("assets/app.123.js").cache_control == CACHE_IMMUTABLE
+
+
+def test_precompressed_variant_gets_weak_etag(spa):
+    static_file = spa.lookup("assets/app.123.js")
+    response = spa.response(static_file, "gzip, deflate")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == "W/" + static_file.etag
+    assert response.path.endswith(".gz")
+
+    plain = spa.response(static_file, "")
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] == static_file.etag
+
+
+def test_matching_if_none_match_returns_304(spa):
+    static_file = spa.lookup("index.html")
+    response = spa.response(static_file, "", static_file.etag)
+    assert response.status_code == 304
+    assert response.headers["etag"] == static_file.etag
+    assert response.headers["cache-control"] == CACHE_REVALIDATE
+
+
+def test_weak_etag_from_compressed_variant_revalidates(spa):
+    static_file = spa.lookup("assets/app.123.js")
+    response = spa.response(static_file, "gzip", "W/" + static_file.etag)
+    assert response.status_code == 304
+    assert "content-encoding" not in response.headers
+
+
+def test_stale_etag_returns_file(spa):
+    static_file = spa.lookup("index.html")
+    assert spa.response(static_file, "", '"stale"').status_code == 200
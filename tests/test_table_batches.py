@@ -0,0 +1,121 @@
+import pytest
+from azure.core.exceptions import HttpResponseError
+from azure.data.tables import RequestTooLargeError, UpdateMode
+
+import table_batches
+from table_batches import operation_bytes, split_batches, submit_batches
+from table_fakes import FakeTableClient
+
+
+def upsert(row_key, partition_key="2026", **fields):
+    return ("upsert", dict({"PartitionKey": partition_key, "RowKey": row_key}, **fields), {"mode": UpdateMode.MERGE})
+
+
+def http_error(status):
+    error = HttpResponseError(message=f"status {status}")
+    error.status_code = status
+    return error
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(table_batches.time, "sleep", lambda seconds: None)
+
+
+# === split_batches ===
+
+def test_split_at_operation_cap():
+    batches = split_batches([upsert(f"r{i:03d}") for i in range(250)])
+    assert [len(batch) for _, batch in batches] == [100, 100, 50]
+
+
+def test_split_by_partition_keeps_order():
+    operations = [upsert("a", "2025"), upsert("b", "2026"), upsert("c", "2025")]
+    assert [(pk, [op[1]["RowKey"] for op in batch]) for pk, batch in split_batches(operations)] == [
+        ("2025", ["a", "c"]), ("2026", ["b"]),
+    ]
+
+
+def test_split_at_byte_cap():
+    content = "가" * 40000  # 120,000 bytes (UTF-8)
+    operations = [upsert(f"r{i}", LessonContent=content) for i in range(10)]
+    max_bytes = 3 * operation_bytes(operations[0])
+    batches = split_batches(operations, max_bytes=max_bytes)
+    assert [len(batch) for _, batch in batches] == [3, 3, 3, 1]
+    assert all(sum(operation_bytes(op) for op in batch) <= max_bytes for _, batch in batches)
+
+
+def test_oversized_single_operation_gets_own_batch():
+    operations = [upsert("small"), upsert("big", LessonContent="x" * 1000), upsert("small2")]
+    batches = split_batches(operations, max_bytes=operation_bytes(operations[1]) - 1)
+    assert [len(batch) for _, batch in batches] == [1, 1, 1]
+
+
+def test_split_on_repeated_row_key():
+    operations = [upsert("a"), upsert("b"), ("delete", {"PartitionKey": "2026", "RowKey": "a"}), upsert("c")]
+    batches = split_batches(operations)
+    assert [[op[1]["RowKey"] for op in batch] for _, batch in batches] == [["a", "b"], ["a", "c"]]
+
+
+# === submit_batches ===
+
+class TooLargeTableClient(FakeTableClient):
+    """max_operations건보다 큰 트랜잭션은 413"""
+
+    def __init__(self, max_operations, **kwargs):
+        super().__init__(**kwargs)
+        self.max_operations = max_operations
+        self.attempts = []
+
+    def submit_transaction(self, operations, **kwargs):
+        self.attempts.append(len(operations))
+        if len(operations) > self.max_operations:
+            raise RequestTooLargeError(message="413")
+        return super().submit_transaction(operations)
+
+
+def test_bisect_on_request_too_large():
+    client = TooLargeTableClient(max_operations=30)
+    result = submit_batches(client, [upsert(f"r{i:03d}") for i in range(100)])
+    assert result == {"operations": 100, "batches": 1, "failed": 0}
+    assert client.attempts[:3] == [100, 50, 25]
+    assert all(len(batch) <= 30 for batch in client.transactions)
+    assert len(client.rows) == 100
+
+
+def test_single_operation_too_large_fails():
+    client = TooLargeTableClient(max_operations=0)
+    assert submit_batches(client, [upsert("r")])["failed"] == 1
+    assert client.rows == {}
+
+
+def test_transient_error_is_retried():
+    client = FakeTableClient()
+    errors = [http_error(503), http_error(429)]
+    submit = client.submit_transaction
+
+    def flaky(operations):
+        if errors:
+            raise errors.pop(0)
+        return submit(operations)
+
+    client.submit_transaction = flaky
+    assert submit_batches(client, [upsert("r")]) == {"operations": 1, "batches": 1, "failed": 0}
+    assert ("2026", "r") in client.rows
+
+
+def test_permanent_failure_skips_rest_of_partition():
+    client = FakeTableClient()
+    submit = client.submit_transaction
+
+    def fail_first_2026(operations):
+        if operations[0][1]["PartitionKey"] == "2026" and not client.transactions:
+            client.transactions.append(operations)
+            raise http_error(400)
+        return submit(operations)
+
+    client.submit_transaction = fail_first_2026
+    operations = [upsert(f"r{i:03d}") for i in range(150)] + [upsert("other", "2025")]
+    result = submit_batches(client, operations)
+    assert result == {"operations": 151, "batches": 3, "failed": 150}
+    assert list(client.rows) == [("2025", "other")]
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+from datetime import date, datetime
+
+import pytest
+
+from backend.week_calendar import WeekCalendar, _YearWeeks
+
+
+def week(start, end, title):
+    return {"start_date": start, "end_date": end, "lesson_title": title}
+
+
+# 2025년 마지막 주가 2026년으로 넘어가고, 1월 19일~25일은 비어 있는 목록 (입력은 정렬 안 됨)
+WEEKS = [
+    week("2026-01-26", "2026-02-01", "창세기 6~11장"),
+    week("2026-01-05", "2026-01-11", "창세기 1~2장"),
+    week("2025-12-29", "2026-01-04", "신년"),
+    week("2026-01-12", "2026-01-18", "창세기 3~5장"),
+    week("2026-12-28", "2027-01-03", "연말"),
+]
+
+
+def title(found):
+    return None if found is None else found[1]["lesson_title"]
+
+
+@pytest.mark.parametrize("day, expected", [
+    (date(2025, 12, 28), None),  # 첫 주 이전
+    (date(2025, 12, 29), "신년"),  # 시작일 포함
+    (date(2026, 1, 1), "신년"),  # 해를 넘긴 주
+    (date(2026, 1, 4), "신년"),  # 종료일 포함
+    (date(2026, 1, 5), "창세기 1~2장"),
+    (date(2026, 1, 18), "창세기 3~5장"),
+    (date(2026, 1, 19), None),  # 빈 주
+    (date(2026, 1, 25), None),
+    (date(2026, 1, 26), "창세기 6~11장"),
+    (date(2026, 6, 1), None),  # 주 사이 긴 공백
+    (date(2027, 1, 3), "연말"),  # 다음 해로 넘어간 마지막 주
+    (date(2027, 1, 4), None),  # 마지막 주 이후
+])
+def test_find_week(day, expected):
+    assert title(_YearWeeks(WEEKS).find(day)) == expected
+
+
+def test_snapshot_sorted_and_skips_bad_rows():
+    weeks = WEEKS + [{"start_date": "2026-13-01", "end_date": "x"}, {"lesson_title": "날짜 없음"}]
+    snapshot = _YearWeeks(weeks)
+    assert [w["start_date"] for w in snapshot.weeks] == sorted(w["start_date"] for w in WEEKS)
+    index, _ = snapshot.find(date(2026, 1, 12))
+    assert index == 2
+
+
+def test_empty_year():
+    assert _YearWeeks([]).find(date(2026, 1, 1)) is None
+
+
+class FakeManager:
+    """연도별 주차 목록을 돌려주는 WeeklyCurriculumManager 대역"""
+
+    created = 0
+
+    def __init__(self):
+        FakeManager.created += 1
+        time.sleep(0.05)  # 생성 중 create_table 왕복 흉내
+        self.years = {2025: WEEKS[2:3], 2026: WEEKS}
+
+    def ensure_year_data(self, year):
+        pass
+
+    def get_weekly_data_from_db(self, year):
+        return self.years.get(year, [])
+
+
+def test_calendar_looks_up_by_day_year(monkeypatch):
+    import weekly_curriculum_manager
+    monkeypatch.setattr(weekly_curriculum_manager, "WeeklyCurriculumManager", FakeManager)
+    calendar = WeekCalendar(refresh_seconds=0, sync_hours=0)
+
+    # 12월 30일은 2025년 목록에서 찾음
+    assert title(calendar.find(datetime(2025, 12, 30, 9, 0))) == "신년"
+    assert title(calendar.find(date(2026, 1, 2))) == "신년"
+    assert title(calendar.find(date(2026, 1, 20))) is None
+    assert set(calendar._years) == {2025, 2026}
+
+
+def test_manager_built_once_across_threads(monkeypatch):
+    import weekly_curriculum_manager
+    monkeypatch.setattr(weekly_curriculum_manager, "WeeklyCurriculumManager", FakeManager)
+    FakeManager.created = 0
+    calendar = WeekCalendar(refresh_seconds=0, sync_hours=0)
+
+    managers = []
+    threads = [threading.Thread(target=lambda: managers.append(calendar.manager)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert FakeManager.created == 1
+    assert all(manager is managers[0] for manager in managers)
+
+
+def test_ensure_scraper_builds_off_loop(monkeypatch):
+    import curriculum_scraper
+    import weekly_curriculum_manager
+    monkeypatch.setattr(weekly_curriculum_manager, "WeeklyCurriculumManager", FakeManager)
+    built_on = []
+
+    class FakeScraper:
+        def __init__(self, manager):
+            built_on.append(threading.get_ident())
+            self.manager = manager
+
+    monkeypatch.setattr(curriculum_scraper, "CurriculumScraper", FakeScraper)
+    calendar = WeekCalendar(refresh_seconds=0, sync_hours=0)
+
+    async def main():
+        loop_thread = threading.get_ident()
+        first = await calendar.ensure_scraper()
+        second = await calendar.ensure_scraper()
+        return loop_thread, first, second
+
+    loop_thread, first, second = asyncio.run(main())
+    assert first is second and isinstance(first.manager, FakeManager)
+    assert built_on and built_on[0] != loop_thread
@@ -0,0 +1,234 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import weekly_curriculum_manager as wcm
+from backend import week_calendar
+from backend.week_calendar import WeekCalendar
+from table_fakes import FakeTableClient
+from weekly_curriculum_manager import WeeklyCurriculumManager, week_row_key
+
+YEAR = 2026
+
+
+def week(start, end, week_range, title, url=None, content=None):
+    return {
+        "start_date": start, "end_date": end, "week_range": week_range,
+        "scripture_range": title, "lesson_title": title,
+        "lesson_url": url or f"https://example.org/{week_range}", "section": "구약전서",
+        "lesson_content": content,
+    }
+
+
+W1 = week("2026-01-05", "2026-01-11", "1월 5일~11일", "창세기 1~2장")
+W2 = week("2026-01-12", "2026-01-18", "1월 12일~18일", "창세기 3~4장")
+W3 = week("2026-01-19", "2026-01-25", "1월 19일~25일", "창세기 5장")
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.delenv("AZURE_STORAGE_CONNECTION_STRING", raising=False)
+    manager = WeeklyCurriculumManager(db_path=str(tmp_path / "curriculum.db"))
+    manager.check_year_data_exists(YEAR)  # SQLite 테이블 생성
+    return manager
+
+
+# === diff_weeks ===
+
+def test_diff_unchanged(manager):
+    upserts, superseded, unchanged = manager.diff_weeks([W1, W2], [dict(W1, lesson_content="본문"), W2])
+    assert (upserts, superseded, unchanged) == ([], [], 2)
+
+
+def test_diff_changed_keeps_stored_content(manager):
+    stored = dict(W2, lesson_content="저장된 본문")
+    changed = dict(W2, lesson_title="창세기 3~5장")
+    upserts, superseded, unchanged = manager.diff_weeks([W1, changed], [W1, stored])
+    assert superseded == [] and unchanged == 1
+    [(new, old)] = upserts
+    assert old is stored
+    assert new["lesson_title"] == "창세기 3~5장"
+    assert new["lesson_content"] == "저장된 본문"
+
+
+def test_diff_added(manager):
+    upserts, superseded, unchanged = manager.diff_weeks([W1, W2, W3], [W1, W2])
+    assert upserts == [(W3, None)] and superseded == [] and unchanged == 2
+
+
+def test_diff_removed_only_when_overlapping(manager):
+    # 같은 기간을 새 주차 둘이 대신함 -> 이전 주차 삭제
+    split_a = week("2026-01-12", "2026-01-14", "1월 12일~14일", "창세기 3장")
+    split_b = week("2026-01-15", "2026-01-18", "1월 15일~18일", "창세기 4장")
+    upserts, superseded, unchanged = manager.diff_weeks([W1, split_a, split_b], [W1, W2])
+    assert superseded == [W2]
+    assert [old for _, old in upserts] == [None, None]
+
+    # 웹사이트 목록에서 빠졌지만 겹치는 새 주차가 없음 -> 보존 (일부만 읽힌 경우)
+    upserts, superseded, unchanged = manager.diff_weeks([W1], [W1, W3])
+    assert (upserts, superseded, unchanged) == ([], [], 1)
+
+
+def test_diff_moved_week_pairs_by_url(manager):
+    stored = dict(W2, lesson_content="저장된 본문")
+    moved = dict(W2, start_date="2026-01-13", end_date="2026-01-19", week_range="1월 13일~19일")
+    upserts, superseded, unchanged = manager.diff_weeks([moved], [stored])
+    assert superseded == []
+    [(new, old)] = upserts
+    assert old is stored and new["lesson_content"] == "저장된 본문"
+
+
+def test_diff_empty_scrape_removes_nothing(manager):
+    assert manager.diff_weeks([], [W1, W2]) == ([], [], 0)
+
+
+# === save_weekly_data_to_db (SQLite) ===
+
+def test_save_sqlite_incremental(manager):
+    assert manager.save_weekly_data_to_db([W1, W2], YEAR) == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0}
+    manager.update_lesson_contents(YEAR, {W2["week_range"]: "가져온 본문"})
+
+    changed = dict(W2, lesson_title="창세기 3~5장")
+    summary = manager.save_weekly_data_to_db([W1, changed, W3], YEAR)
+    assert summary == {"added": 1, "updated": 1, "removed": 0, "unchanged": 1}
+
+    weeks = {w["week_range"]: w for w in manager.get_weekly_data_from_db(YEAR)}
+    assert list(weeks) == [W1["week_range"], W2["week_range"], W3["week_range"]]
+    assert weeks[W2["week_range"]]["lesson_title"] == "창세기 3~5장"
+    assert weeks[W2["week_range"]]["lesson_content"] == "가져온 본문"
+
+
+def test_save_empty_scrape_deletes_nothing(manager):
+    manager.save_weekly_data_to_db([W1, W2], YEAR)
+    assert manager.save_weekly_data_to_db([], YEAR) is False
+    assert len(manager.get_weekly_data_from_db(YEAR)) == 2
+
+
+# === save_weekly_data_to_db (Azure) ===
+
+@pytest.fixture
+def azure_manager(manager, monkeypatch):
+    tables = {}
+    monkeypatch.setattr(wcm, "get_table_client", lambda name, conn: tables.setdefault(name, FakeTableClient()))
+    manager.connection_string = "UseDevelopmentStorage=true"
+    manager.tables = tables
+    return manager
+
+
+def test_save_azure_writes_only_changes(azure_manager):
+    azure_manager.save_weekly_data_to_db([W1, W2], YEAR)
+    weekly = azure_manager.tables[azure_manager.TABLE_WEEKLY]
+    assert len(weekly.transactions) == 1
+    weekly.rows[(str(YEAR), week_row_key(W2["week_range"]))]["LessonContent"] = "가져온 본문"
+
+    assert azure_manager.save_weekly_data_to_db([W1, W2], YEAR)["unchanged"] == 2
+    assert len(weekly.transactions) == 1  # 바뀐 것이 없으면 쓰지 않음
+
+    changed = dict(W2, lesson_title="창세기 3~5장")
+    azure_manager.save_weekly_data_to_db([W1, changed], YEAR)
+    [operation] = weekly.transactions[-1]
+    assert operation[0] == "upsert" and operation[1]["RowKey"] == week_row_key(W2["week_range"])
+    assert "LessonContent" not in operation[1]  # merge - 저장된 본문 유지
+    assert weekly.rows[(str(YEAR), week_row_key(W2["week_range"]))]["LessonContent"] == "가져온 본문"
+
+
+def test_save_azure_moves_row_and_deletes_superseded(azure_manager):
+    azure_manager.save_weekly_data_to_db([W1, W2], YEAR)
+    weekly = azure_manager.tables[azure_manager.TABLE_WEEKLY]
+    weekly.rows[(str(YEAR), week_row_key(W2["week_range"]))]["LessonContent"] = "가져온 본문"
+
+    moved = dict(W2, start_date="2026-01-13", end_date="2026-01-19", week_range="1월 13일~19일")
+    summary = azure_manager.save_weekly_data_to_db([W1, moved], YEAR)
+    assert summary == {"added": 0, "updated": 1, "removed": 0, "unchanged": 1}
+    assert set(weekly.rows) == {(str(YEAR), week_row_key(W1["week_range"])), (str(YEAR), week_row_key(moved["week_range"]))}
+    assert weekly.rows[(str(YEAR), week_row_key(moved["week_range"]))]["LessonContent"] == "가져온 본문"
+
+
+def test_save_azure_empty_scrape_deletes_nothing(azure_manager):
+    azure_manager.save_weekly_data_to_db([W1, W2], YEAR)
+    weekly = azure_manager.tables[azure_manager.TABLE_WEEKLY]
+    assert azure_manager.save_weekly_data_to_db([], YEAR) is False
+    assert len(weekly.rows) == 2 and len(weekly.transactions) == 1
+
+
+def test_save_azure_batch_failure_returns_false(azure_manager):
+    weekly = azure_manager.tables[azure_manager.TABLE_WEEKLY] = FakeTableClient()
+
+    def unavailable(operations, **kwargs):
+        raise RuntimeError("503 Server Busy")
+
+    weekly.submit_transaction = unavailable
+    assert azure_manager.save_weekly_data_to_db([W1, W2], YEAR) is False
+    assert azure_manager.TABLE_STATUS not in azure_manager.tables  # 완료 상태를 남기지 않음
+    azure_manager.connection_string = None
+    assert azure_manager.get_weekly_data_from_db(YEAR) == []  # SQLite에도 쓰지 않음
+
+    # 다음 동기화에서 같은 변경을 다시 씀
+    azure_manager.connection_string = "UseDevelopmentStorage=true"
+    del weekly.submit_transaction
+    assert azure_manager.save_weekly_data_to_db([W1, W2], YEAR)["added"] == 2
+
+
+# === 동기화 후 다시 읽기 ===
+
+class SyncManager:
+    def __init__(self, summary):
+        self.summary = summary
+
+    def sync_year(self, year):
+        return self.summary
+
+
+def run_sync_loop(calendar, monkeypatch):
+    """_sync_loop 한 주기를 돌리고 on_change 호출 연도 목록을 돌려줌"""
+    monkeypatch.setattr(week_calendar, "SYNC_START_DELAY", 0)
+    monkeypatch.setattr(calendar, "_hold_sync_lock", lambda: True)
+    changed = []
+
+    async def on_change(year):
+        changed.append(year)
+
+    async def main():
+        task = asyncio.create_task(calendar._sync_loop(on_change))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(main())
+    return changed
+
+
+def test_failed_sync_skips_reload_and_prefetch(monkeypatch):
+    calendar = WeekCalendar(refresh_seconds=0, sync_hours=1)
+    calendar._manager = SyncManager(False)
+    reloads = []
+    monkeypatch.setattr(calendar, "load", lambda year, fresh=False: reloads.append(year))
+
+    assert asyncio.run(calendar.sync(YEAR)) is False
+    assert run_sync_loop(calendar, monkeypatch) == []
+    assert reloads == []
+
+
+def test_changed_sync_reloads_and_prefetches(monkeypatch):
+    calendar = WeekCalendar(refresh_seconds=0, sync_hours=1)
+    calendar._manager = SyncManager({"added": 1, "updated": 0, "removed": 0, "unchanged": 2})
+    reloads = []
+    monkeypatch.setattr(calendar, "load", lambda year, fresh=False: reloads.append((year, fresh)))
+
+    assert run_sync_loop(calendar, monkeypatch) == [datetime.now().year]
+    assert reloads == [(datetime.now().year, True)]
+
+
+# === 동기화 워커 잠금 ===
+
+def test_only_one_worker_holds_sync_lock(tmp_path, monkeypatch):
+    monkeypatch.setattr(week_calendar, "SYNC_LOCK_PATH", str(tmp_path / "week-sync.lock"))
+    first, second = WeekCalendar(), WeekCalendar()
+    assert first._hold_sync_lock()
+    assert first._hold_sync_lock()  # 이미 잡은 워커는 계속 담당
+    assert not second._hold_sync_lock()
+
+    asyncio.run(first.stop())
+    assert second._hold_sync_lock()
+    second._release_sync_lock()
@@ -1,19 +1,31 @@
 import sqlite3
 import requests
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
 import time
 import os
-from azure.data.tables import TableServiceClient, TableClient
 from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.data.tables import UpdateMode
+from azure_table_pool import get_table_client, get_service_client
+from http_page_cache import page_cache as default_page_cache
+from html_extract import lesson_links
+from table_batches import submit_batches
+
+WEEKLY_DATA_RESULT = "weekly_data:v1"  # 페이지 캐시에 저장하는 주차 목록 파싱 결과 이름
+WEEK_FIELDS = ('week_range', 'scripture_range', 'lesson_title', 'lesson_url', 'section')  # 변경 여부 비교 필드
+
+
+def week_row_key(week_range):
+    """주차 범위 → Azure RowKey ('~', 공백, 한글 제거)"""
+    return week_range.replace('~', '-').replace(' ', '_').replace('월', 'M').replace('일', 'D')
 
 
 class WeeklyCurriculumManager:
     """주차별 경전 범위를 관리하는 클래스 (Azure/SQLite 지원)"""
     
-    def __init__(self, db_path='curriculum_data.db', connection_string=None):
+    def __init__(self, db_path='curriculum_data.db', connection_string=None, page_cache=None):
         self.db_path = db_path
+        self.page_cache = page_cache or default_page_cache
         self.base_url = "https://www.churchofjesuschrist.org"
         self.connection_string = connection_string or os.getenv("AZURE_STORAGE_CONNECTION_STRING")
         
@@ -28,7 +40,7 @@ class WeeklyCurriculumManager:
     def _init_azure_tables(self):
         """Azure Table Storage 초기화"""
         try:
-            service_client = TableServiceClient.from_connection_string(self.connection_string)
+            service_client = get_service_client(self.connection_string)
             for table_name in [self.TABLE_WEEKLY, self.TABLE_STATUS]:
                 try:
                     service_client.create_table(table_name)
@@ -42,7 +54,7 @@ class WeeklyCurriculumManager:
         """해당 연도의 데이터가 DB/Storage에 있는지 확인"""
         if self.connection_string:
             try:
-                table_client = TableClient.from_connection_string(self.connection_string, self.TABLE_STATUS)
+                table_client = get_table_client(self.TABLE_STATUS, self.connection_string)
                 entity = table_client.get_entity(partition_key="status", row_key=str(year))
                 if entity.get('Status') == 'completed' and entity.get('TotalWeeks', 0) > 0:
                     return True
@@ -125,27 +137,24 @@ class WeeklyCurriculumManager:
             headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
             session = requests.Session()
             session.headers.update(headers)
-            response = session.get(url, timeout=15)
-            response.raise_for_status()
+            page = self.page_cache.fetch(session, url, timeout=15)
+            cached_data = page.cached_result(WEEKLY_DATA_RESULT)
+            if cached_data is not None:
+                print(f"📦 {year}년 주차 목록 페이지 변경 없음 (파싱 생략)")
+                return cached_data
             
-            soup = BeautifulSoup(response.content, 'html.parser')
             weekly_data = []
-            
-            all_links = soup.find_all('a', href=True)
-            for link in all_links:
-                href = link.get('href', '')
-                if 'come-follow-me' in href and str(year) in href:
-                    lesson_data = self.parse_lesson_link_improved(link, year)
-                    if lesson_data:
-                        weekly_data.append(lesson_data)
+            for href, text in lesson_links(page.body, year):
+                lesson_data = self.parse_lesson_link_improved(href, text, year)
+                if lesson_data:
+                    weekly_data.append(lesson_data)
+            self.page_cache.save_result(page, WEEKLY_DATA_RESULT, weekly_data)
             return weekly_data
         except Exception as e:
             print(f"웹사이트 추출 오류: {e}")
             return self.get_fallback_data(year)
     
-    def parse_lesson_link_improved(self, link, year):
-        href = link.get('href', '')
-        text = link.get_text(strip=True)
+    def parse_lesson_link_improved(self, href, text, year):
         if not text: return None
         
         date_pattern = r'(\d{1,2}월\s*\d{1,2}일)\s*[~\-–\\]+\s*(\d{1,2}월\s*\d{1,2}일|\d{1,2}일)'
@@ -187,57 +196,145 @@ class WeeklyCurriculumManager:
             return None, None
         except: return None, None
 
+    def diff_weeks(self, scraped, stored):
+        """새로 읽은 주차 목록과 저장된 주차를 (start_date, end_date)로 비교
+
+        반환: (upserts, superseded, unchanged)
+        - upserts: 추가/변경할 (주차, 저장된 이전 주차 또는 None) - 저장된 lesson_content 유지
+        - superseded: 날짜가 겹치는 새 주차로 대체되어 지울 저장된 주차
+        - unchanged: 그대로인 주차 수
+
+        날짜만 바뀐 주차(같은 lesson_url)는 추가 + 삭제가 아니라 이전 행의 변경으로 봅니다.
+        """
+        stored_by_dates = {(w['start_date'], w['end_date']): w for w in stored}
+        scraped_by_dates = {(w['start_date'], w['end_date']): w for w in scraped}  # 같은 링크 중복 제거
+
+        # 웹사이트에서 빠진 주차는 새 주차와 날짜가 겹칠 때만 대체된 것으로 봄 (일부만 읽힌 경우 보존)
+        stale = {
+            dates: old for dates, old in stored_by_dates.items()
+            if dates not in scraped_by_dates and any(
+                old['start_date'] <= end and start <= old['end_date'] for start, end in scraped_by_dates
+            )
+        }
+        stale_by_url = {old['lesson_url']: dates for dates, old in stale.items() if old.get('lesson_url')}
+
+        upserts, unchanged = [], 0
+        for dates, week in scraped_by_dates.items():
+            old = stored_by_dates.get(dates)
+            if old is None and week.get('lesson_url') in stale_by_url:
+                old = stale.pop(stale_by_url.pop(week['lesson_url']))
+            if old is None:
+                upserts.append((week, None))
+            elif old['start_date'] != week['start_date'] or old['end_date'] != week['end_date'] or any(
+                (old.get(field) or '') != (week.get(field) or '') for field in WEEK_FIELDS
+            ):
+                upserts.append((dict(week, lesson_content=old.get('lesson_content') or week.get('lesson_content')), old))
+            else:
+                unchanged += 1
+        return upserts, list(stale.values()), unchanged
+
     def save_weekly_data_to_db(self, weekly_data, year):
+        """읽어 온 주차 목록을 저장 - 바뀐 주차만 쓰고 이미 가져온 lesson_content는 유지
+
+        반환: {"added", "updated", "removed", "unchanged"}
+        (목록이 비었거나 Azure 주차 쓰기가 일부라도 실패하면 False - 다음 동기화에서 다시 비교해 씀)
+        """
         if not weekly_data: return False
+
+        stored = self.get_weekly_data_from_db(year)
+        upserts, superseded, unchanged = self.diff_weeks(weekly_data, stored)
+        summary = {
+            "added": sum(1 for _, old in upserts if old is None),
+            "updated": sum(1 for _, old in upserts if old is not None),
+            "removed": len(superseded),
+            "unchanged": unchanged,
+        }
+        if not upserts and not superseded:
+            return summary
+
+        replaced = superseded + [old for _, old in upserts if old is not None]
+        kept_dates = {(w['start_date'], w['end_date']) for w in stored} - {(w['start_date'], w['end_date']) for w in replaced}
+        total_weeks = len(kept_dates | {(w['start_date'], w['end_date']) for w in weekly_data})
+        now = datetime.utcnow().isoformat()
         
-        # 1. Azure Table Storage
+        # 1. Azure Table Storage (연도 파티션 - merge upsert/삭제를 트랜잭션으로 묶음)
         if self.connection_string:
             try:
-                table_client = TableClient.from_connection_string(self.connection_string, self.TABLE_WEEKLY)
-                for data in weekly_data:
-                    row_key = data['week_range'].replace('~', '-').replace(' ', '_').replace('월', 'M').replace('일', 'D')
+                operations = []
+                for data, old in upserts:
                     entity = {
                         "PartitionKey": str(year),
-                        "RowKey": row_key,
+                        "RowKey": week_row_key(data['week_range']),
                         "StartDate": data['start_date'],
                         "EndDate": data['end_date'],
                         "WeekRange": data['week_range'],
                         "ScriptureRange": data.get('scripture_range', ''),
                         "LessonTitle": data['lesson_title'],
                         "LessonUrl": data['lesson_url'],
-                        "LessonContent": data.get('lesson_content', '') or "",
                         "Section": data['section'],
-                        "CreatedAt": datetime.utcnow().isoformat()
+                        "UpdatedAt": now
                     }
-                    table_client.upsert_entity(entity)
-                
-                status_client = TableClient.from_connection_string(self.connection_string, self.TABLE_STATUS)
+                    if old is None:
+                        entity["CreatedAt"] = now
+                    # merge - LessonContent를 빼면 저장된 본문이 그대로 남음 (RowKey가 바뀌면 옮겨 담음)
+                    if data.get('lesson_content') and (old is None or old['week_range'] != data['week_range']):
+                        entity["LessonContent"] = data['lesson_content']
+                    operations.append(("upsert", entity, {"mode": UpdateMode.MERGE}))
+                # 옮겨졌거나 대체된 이전 행 삭제 (같은 RowKey로 다시 쓰는 행은 제외)
+                written = {week_row_key(data['week_range']) for data, _ in upserts}
+                stale_keys = {week_row_key(old['week_range']) for old in superseded}
+                stale_keys.update(week_row_key(old['week_range']) for _, old in upserts if old is not None)
+                for row_key in sorted(stale_keys - written):
+                    operations.append(("delete", {"PartitionKey": str(year), "RowKey": row_key}))
+
+                result = submit_batches(get_table_client(self.TABLE_WEEKLY, self.connection_string), operations)
+            except Exception as e:
+                print(f"Azure 저장 오류: {e}")
+                return False
+            if result["failed"]:
+                print(f"❌ Azure 주차 저장 실패: {result['operations'] - result['failed']}건 저장, {result['failed']}건 실패")
+                return False
+
+            try:
+                status_client = get_table_client(self.TABLE_STATUS, self.connection_string)
                 status_client.upsert_entity({
                     "PartitionKey": "status", "RowKey": str(year),
-                    "LastUpdated": datetime.utcnow().isoformat(), "TotalWeeks": len(weekly_data), "Status": "completed"
+                    "LastUpdated": now, "TotalWeeks": total_weeks, "Status": "completed"
                 })
             except Exception as e:
-                print(f"Azure 저장 오류: {e}")
+                print(f"Azure 상태 저장 오류: {e}")
 
         # 2. Local SQLite
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
-            cursor.execute("DELETE FROM weekly_curriculum WHERE year = ?", (year,))
-            for data in weekly_data:
+            for data, old in upserts:
+                values = (
+                    data['start_date'], data['end_date'], data['week_range'], data.get('scripture_range', ''),
+                    data['lesson_title'], data['lesson_url'], data['section'], data.get('lesson_content')
+                )
+                previous = old or data
+                # 다른 작업(본문 미리 가져오기)이 그 사이 저장한 본문을 덮어쓰지 않도록 COALESCE
                 cursor.execute("""
-                    INSERT INTO weekly_curriculum 
-                    (year, start_date, end_date, week_range, scripture_range, lesson_title, lesson_url, lesson_content, section) 
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    data['year'], data['start_date'], data['end_date'],
-                    data['week_range'], data.get('scripture_range', ''),
-                    data['lesson_title'], data['lesson_url'], data.get('lesson_content'), data['section']
-                ))
-            cursor.execute("INSERT OR REPLACE INTO curriculum_status (year, last_updated, total_weeks, status) VALUES (?, ?, ?, ?)", (year, datetime.now(), len(weekly_data), 'completed'))
+                    UPDATE weekly_curriculum
+                    SET start_date = ?, end_date = ?, week_range = ?, scripture_range = ?, lesson_title = ?,
+                        lesson_url = ?, section = ?, lesson_content = COALESCE(lesson_content, ?)
+                    WHERE year = ? AND start_date = ? AND end_date = ?
+                """, values + (year, previous['start_date'], previous['end_date']))
+                if cursor.rowcount == 0:
+                    cursor.execute("""
+                        INSERT INTO weekly_curriculum 
+                        (start_date, end_date, week_range, scripture_range, lesson_title, lesson_url, section, lesson_content, year) 
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, values + (year,))
+            cursor.executemany(
+                "DELETE FROM weekly_curriculum WHERE year = ? AND start_date = ? AND end_date = ?",
+                [(year, old['start_date'], old['end_date']) for old in superseded]
+            )
+            cursor.execute("INSERT OR REPLACE INTO curriculum_status (year, last_updated, total_weeks, status) VALUES (?, ?, ?, ?)", (year, datetime.now(), total_weeks, 'completed'))
             conn.commit()
             conn.close()
-            return True
+            return summary
         except Exception as e:
             print(f"로컬 저장 오류: {e}")
             return False
@@ -245,10 +342,12 @@ class WeeklyCurriculumManager:
     def get_weekly_data_from_db(self, year):
         if self.connection_string:
             try:
-                table_client = TableClient.from_connection_string(self.connection_string, self.TABLE_WEEKLY)
+                table_client = get_table_client(self.TABLE_WEEKLY, self.connection_string)
                 entities = table_client.query_entities(f"PartitionKey eq '{year}'")
                 weekly_data = []
                 for e in entities:
+                    if not e.get('StartDate') or not e.get('EndDate'):
+                        continue  # 날짜 없는 행 (본문만 병합된 잔여 행) - 정렬/조회에서 제외
                     weekly_data.append({
                         'year': year, 'start_date': e.get('StartDate'), 'end_date': e.get('EndDate'),
                         'week_range': e.get('WeekRange'), 'title_keywords': e.get('ScriptureRange'),
@@ -280,9 +379,8 @@ class WeeklyCurriculumManager:
     def update_lesson_content(self, year, week_range, content):
         if self.connection_string:
             try:
-                table_client = TableClient.from_connection_string(self.connection_string, self.TABLE_WEEKLY)
-                row_key = week_range.replace('~', '-').replace(' ', '_').replace('월', 'M').replace('일', 'D')
-                entity = table_client.get_entity(partition_key=str(year), row_key=row_key)
+                table_client = get_table_client(self.TABLE_WEEKLY, self.connection_string)
+                entity = table_client.get_entity(partition_key=str(year), row_key=week_row_key(week_range))
                 entity['LessonContent'] = content
                 table_client.update_entity(entity)
             except Exception as e:
@@ -296,6 +394,65 @@ class WeeklyCurriculumManager:
             conn.close()
         except: pass
 
+    def update_lesson_contents(self, year, contents):
+        """여러 주차의 공과 본문을 한 번에 저장 (contents: week_range -> 본문)
+
+        Azure는 같은 파티션(연도) 엔티티를 트랜잭션 배치(100건/본문 크기 한도)로 병합(update, merge)하고,
+        SQLite는 executemany 한 번, 커밋 한 번으로 갱신합니다.
+        그 사이 동기화로 지워진 주차는 새로 만들지 않고 건너뜁니다. (날짜 없는 행이 생기지 않도록)
+
+        반환: {"persisted", "failed", "missing"} - Azure를 쓰면 Azure 기준, 아니면 SQLite 기준
+        """
+        if not contents: return {"persisted": 0, "failed": 0, "missing": 0}
+        items = list(contents.items())
+        persisted, failed, missing = 0, 0, 0
+
+        if self.connection_string:
+            try:
+                table_client = get_table_client(self.TABLE_WEEKLY, self.connection_string)
+                existing = {
+                    e['RowKey'] for e in table_client.query_entities(f"PartitionKey eq '{year}'", select=["RowKey"])
+                }
+                operations = [
+                    ("update", {
+                        "PartitionKey": str(year),
+                        "RowKey": week_row_key(week_range),
+                        "LessonContent": content
+                    }, {"mode": UpdateMode.MERGE})
+                    for week_range, content in items
+                    if week_row_key(week_range) in existing
+                ]
+                missing = len(items) - len(operations)
+                result = submit_batches(table_client, operations)
+                persisted, failed = result['operations'] - result['failed'], result['failed']
+                print(f"📦 Azure 공과 본문 {persisted}건을 트랜잭션 {result['batches']}번으로 저장 (실패 {failed}건, 없는 주차 {missing}건)")
+            except Exception as e:
+                print(f"Azure Content 일괄 업데이트 오류: {e}")
+                persisted, failed, missing = 0, len(items), 0
+
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.executemany(
+                "UPDATE weekly_curriculum SET lesson_content = ? WHERE year = ? AND week_range = ?",
+                [(content, year, week_range) for week_range, content in items]
+            )
+            conn.commit()
+            conn.close()
+            if not self.connection_string:
+                persisted, missing = cursor.rowcount, len(items) - cursor.rowcount
+        except Exception as e:
+            print(f"로컬 Content 일괄 업데이트 오류: {e}")
+            if not self.connection_string:
+                failed = len(items)
+        return {"persisted": persisted, "failed": failed, "missing": missing}
+
+    def sync_year(self, year):
+        """웹사이트 주차 목록을 다시 읽어 바뀐 주차만 반영 (읽지 못하면 아무것도 바꾸지 않고 None)"""
+        weekly_data = self.extract_weekly_data_from_website(year)
+        if not weekly_data: return None
+        return self.save_weekly_data_to_db(weekly_data, year)
+
     def ensure_year_data(self, year):
         if self.check_year_data_exists(year): return True
         weekly_data = self.extract_weekly_data_from_website(year)